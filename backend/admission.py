@@ -0,0 +1,133 @@
+import os
+import logging
+import threading
+
+from backend.captions import has_manual_captions
+from backend.utils import probe_duration
+from backend.spool import SpoolFullError, estimate_download_bytes, spool
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+MAX_DURATION_SECONDS = int(os.getenv("MAX_DURATION_SECONDS", 3 * 3600))
+
+# Seconds of Whisper compute per second of audio. Seeded from the env and then
+# tracked as an exponential moving average of what we actually measure.
+INITIAL_WHISPER_RTF = float(os.getenv("WHISPER_RTF", "0.5"))
+RTF_SMOOTHING = 0.2
+
+# Fixed overheads (metadata, download, FinBERT) in seconds
+CAPTION_JOB_SECONDS = 2.0
+AUDIO_JOB_OVERHEAD_SECONDS = 15.0
+
+# Fallback when ffprobe cannot read a local file's duration (128 kbps audio)
+ASSUMED_AUDIO_BYTES_PER_SECOND = 16000
+
+# How long to tell clients to wait before retrying a live/upcoming stream
+LIVE_RETRY_AFTER_SECONDS = 1800
+
+UNAVAILABLE = {"private", "premium_only", "subscriber_only", "needs_auth"}
+
+
+class AdmissionError(Exception):
+    """Raised when a video is rejected (or deferred) before any download happens."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+# ── Real-time factor tracking ─────────────────────────────────────────────────
+
+_rtf = INITIAL_WHISPER_RTF
+_rtf_lock = threading.Lock()
+
+
+def get_rtf() -> float:
+    return _rtf
+
+
+def record_transcription(audio_seconds: float, elapsed_seconds: float) -> None:
+    """Fold one measured Whisper run into the real-time factor estimate."""
+    global _rtf
+    if not audio_seconds or audio_seconds <= 0:
+        return
+    measured = elapsed_seconds / audio_seconds
+    with _rtf_lock:
+        _rtf = (1 - RTF_SMOOTHING) * _rtf + RTF_SMOOTHING * measured
+    logger.info(f"Whisper RTF measured {measured:.3f} — estimate now {_rtf:.3f}")
+
+
+def estimate_cost(info: dict) -> float:
+    """Estimated wall-clock seconds to analyze this video."""
+    if has_manual_captions(info):
+        return CAPTION_JOB_SECONDS
+    duration = info.get("duration") or MAX_DURATION_SECONDS
+    return AUDIO_JOB_OVERHEAD_SECONDS + duration * get_rtf()
+
+
+# ── Pre-flight checks ─────────────────────────────────────────────────────────
+
+def preflight(info: dict, check_spool: bool = True) -> dict:
+    """
+    Check availability, live status and duration from metadata alone.
+
+    Returns a cost estimate for admitted videos; raises AdmissionError otherwise.
+    Pass check_spool=False when another host will download the audio: its
+    own spool decides then, and a full one defers the job rather than failing it.
+    """
+    availability = info.get("availability")
+    if availability in UNAVAILABLE:
+        raise AdmissionError(403, f"Video is not publicly available ({availability})")
+
+    live_status = info.get("live_status")
+    if info.get("is_live") or live_status in ("is_live", "is_upcoming", "post_live"):
+        raise AdmissionError(
+            409,
+            f"Video is a live or upcoming stream ({live_status or 'is_live'}); retry once it has ended",
+            retry_after=LIVE_RETRY_AFTER_SECONDS,
+        )
+
+    duration = info.get("duration") or 0
+    if duration > MAX_DURATION_SECONDS:
+        raise AdmissionError(
+            413,
+            f"Video is {duration}s long; the limit is {MAX_DURATION_SECONDS}s",
+        )
+
+    # Refuse now rather than queue a download that has nowhere to go
+    if check_spool and not has_manual_captions(info):
+        try:
+            spool.check(estimate_download_bytes(duration))
+        except SpoolFullError as e:
+            raise AdmissionError(507, str(e), retry_after=e.retry_after)
+
+    return {
+        "video_id": info.get("id"),
+        "duration_seconds": duration,
+        "has_captions": has_manual_captions(info),
+        "estimated_seconds": round(estimate_cost(info), 1),
+    }
+
+
+def preflight_file(path: str) -> dict:
+    """Admission check for uploaded or server-local audio, by probed duration."""
+    duration = probe_duration(path)
+    if not duration:
+        duration = os.path.getsize(path) / ASSUMED_AUDIO_BYTES_PER_SECOND
+
+    if duration > MAX_DURATION_SECONDS:
+        raise AdmissionError(
+            413,
+            f"Audio is {int(duration)}s long; the limit is {MAX_DURATION_SECONDS}s",
+        )
+
+    return {
+        "video_id": None,
+        "duration_seconds": round(duration, 1),
+        "has_captions": False,
+        "estimated_seconds": round(AUDIO_JOB_OVERHEAD_SECONDS + duration * get_rtf(), 1),
+    }
@@ -3,9 +3,14 @@ import re
 import os
 import logging
 from functools import lru_cache
+import time
 from typing import Optional
 
-logging.basicConfig(level=logging.INFO)
+from backend.metrics import FINBERT_CHUNKS, MODEL_LOAD_SECONDS, STAGE_ERRORS, register_cache, track_stage
+from backend.minhash import NearDuplicateIndex
+from backend.profiling import torch_profiled
+from backend.telemetry import set_span_attributes
+
 logger = logging.getLogger(__name__)
 
 # ── Config ────────────────────────────────────────────────────────────────────
@@ -31,22 +36,46 @@ def _load_keywords() -> tuple:
 
 HYPE_KEYWORDS, DISCLAIMER_PHRASES = _load_keywords()
 
+EXAGGERATION_PATTERNS = [
+    r'\d+x\s*(return|profit|gain|your money)?',
+    r'\d+\s*%\s*(profit|return|gain|interest)',
+    r'\$[\d,]+\s*in\s*(one|a)\s*\w+',
+    r'(double|triple|quadruple)\s*(your)?\s*money',
+    r'(never|always)\s*(lose|fail)',
+    r'(guaranteed|promise|assure)\s*(you|returns|profit|gains)?',
+    r'(quit|leave)\s*(your)?\s*(job|work|9\s*to\s*5)',
+    r'(retire|retirement)\s*(early|at \d+|by \d+)',
+    r'made?\s*\$[\d,]+\s*in\s*(a day|one day|a week|one week|a month)',
+    r'(passive\s*income|financial\s*freedom|wealth\s*building)',
+    r'(no\s*risk|risk[\s-]free|zero\s*risk)',
+    r'(secret|they\s*don\'t\s*want\s*you\s*to\s*know)',
+    r'(once[\s-]in[\s-]a[\s-]lifetime|limited\s*time\s*offer)',
+]
+_EXAGGERATION_COMPILED = [re.compile(p) for p in EXAGGERATION_PATTERNS]
+
 # ── Lazy FinBERT loader ───────────────────────────────────────────────────────
 
+FINBERT_MODEL = os.getenv("FINBERT_MODEL", "ProsusAI/finbert")
+
 _finbert = None
+_finbert_name = None
 
 def get_finbert():
-    global _finbert
-    if _finbert is None:
+    global _finbert, _finbert_name
+    if _finbert is None or _finbert_name != FINBERT_MODEL:
         try:
             from transformers import pipeline
-            logger.info("Loading FinBERT model...")
+            logger.info(f"Loading FinBERT model ({FINBERT_MODEL})...")
+            started = time.perf_counter()
+            _finbert = None  # release the previous model before loading the next
             _finbert = pipeline(
                 "text-classification",
-                model="ProsusAI/finbert",
+                model=FINBERT_MODEL,
                 truncation=True,
                 max_length=512
             )
+            _finbert_name = FINBERT_MODEL
+            MODEL_LOAD_SECONDS.labels("finbert").set(time.perf_counter() - started)
             logger.info("FinBERT loaded!")
         except Exception as e:
             logger.error(f"Failed to load FinBERT: {e}")
@@ -55,6 +84,7 @@ def get_finbert():
 
 # ── Analysis functions ────────────────────────────────────────────────────────
 
+@track_stage("hype_keywords")
 def detect_hype_keywords(text: str) -> dict:
     if not text or not text.strip():
         return {"found_keywords": [], "total_matches": 0, "unique_matches": 0, "severity": "low"}
@@ -78,6 +108,7 @@ def detect_hype_keywords(text: str) -> dict:
     }
 
 
+@track_stage("disclaimers")
 def detect_disclaimers(text: str) -> dict:
     if not text or not text.strip():
         return {"has_disclaimer": False, "found_disclaimers": [], "missing_disclaimer": True}
@@ -92,30 +123,15 @@ def detect_disclaimers(text: str) -> dict:
     }
 
 
+@track_stage("exaggerated_claims")
 def detect_exaggerated_claims(text: str) -> dict:
     if not text or not text.strip():
         return {"exaggerated_claims": [], "total_exaggerations": 0, "severity": "low"}
 
-    patterns = [
-        r'\d+x\s*(return|profit|gain|your money)?',
-        r'\d+\s*%\s*(profit|return|gain|interest)',
-        r'\$[\d,]+\s*in\s*(one|a)\s*\w+',
-        r'(double|triple|quadruple)\s*(your)?\s*money',
-        r'(never|always)\s*(lose|fail)',
-        r'(guaranteed|promise|assure)\s*(you|returns|profit|gains)?',
-        r'(quit|leave)\s*(your)?\s*(job|work|9\s*to\s*5)',
-        r'(retire|retirement)\s*(early|at \d+|by \d+)',
-        r'made?\s*\$[\d,]+\s*in\s*(a day|one day|a week|one week|a month)',
-        r'(passive\s*income|financial\s*freedom|wealth\s*building)',
-        r'(no\s*risk|risk[\s-]free|zero\s*risk)',
-        r'(secret|they\s*don\'t\s*want\s*you\s*to\s*know)',
-        r'(once[\s-]in[\s-]a[\s-]lifetime|limited\s*time\s*offer)',
-    ]
-
     found_patterns = []
     text_lower = text.lower()
-    for pattern in patterns:
-        matches = re.findall(pattern, text_lower)
+    for pattern, compiled in zip(EXAGGERATION_PATTERNS, _EXAGGERATION_COMPILED):
+        matches = compiled.findall(text_lower)
         if matches:
             found_patterns.append({"pattern": pattern, "matches": len(matches)})
 
@@ -147,9 +163,34 @@ def _chunk_text_with_overlap(text: str, chunk_size: int = 300, overlap: int = 50
 def _cached_finbert(text_chunk: str) -> dict:
     """Cache FinBERT results for repeated chunks."""
     finbert = get_finbert()
-    return finbert(text_chunk)[0]
+    with torch_profiled("finbert"):
+        return finbert(text_chunk)[0]
+
+
+register_cache("finbert", _cached_finbert)
+
+# Chunks near-identical to one already scored (sponsor reads, intros, outros)
+# reuse its label and score instead of running FinBERT again
+FINBERT_DEDUP = os.getenv("FINBERT_DEDUP", "1").lower() not in ("0", "false", "no")
+_finbert_seen = NearDuplicateIndex()
+
+
+def _score_chunk(chunk: str) -> tuple:
+    """FinBERT result for a chunk, and whether it was reused from a near-duplicate."""
+    if not FINBERT_DEDUP:
+        return _cached_finbert(chunk), False
+
+    signature = _finbert_seen.hasher.signature(chunk)
+    reused = _finbert_seen.lookup(chunk, signature)
+    if reused is not None:
+        return reused, True
+
+    result = _cached_finbert(chunk)
+    _finbert_seen.add(chunk, result, signature)
+    return result, False
 
 
+@track_stage("finbert")
 def analyze_with_finbert(text: str) -> dict:
     if not text or not text.strip():
         return {"sentiment": "neutral", "confidence": 0.0, "positive_ratio": 0.0,
@@ -158,9 +199,14 @@ def analyze_with_finbert(text: str) -> dict:
     try:
         chunks = _chunk_text_with_overlap(text)[:5]
         results = []
+        skipped = 0
         for chunk in chunks:
-            result = _cached_finbert(chunk)
+            result, reused = _score_chunk(chunk)
+            skipped += reused
             results.append(result)
+        FINBERT_CHUNKS.labels("near_duplicate").inc(skipped)
+        FINBERT_CHUNKS.labels("inferred").inc(len(results) - skipped)
+        set_span_attributes(chunk_count=len(results), skipped_chunks=skipped)
 
         if not results:
             return {"sentiment": "neutral", "confidence": 0.0, "positive_ratio": 0.0,
@@ -186,23 +232,93 @@ def analyze_with_finbert(text: str) -> dict:
             "positive_chunks": positive,
             "negative_chunks": negative,
             "neutral_chunks": neutral,
-            "total_chunks": total
+            "total_chunks": total,
+            "skipped_chunks": skipped,
         }
 
     except Exception as e:
         logger.error(f"FinBERT analysis failed: {e}")
+        STAGE_ERRORS.labels("finbert").inc()
         return {"sentiment": "unknown", "confidence": 0.0, "positive_ratio": 0.0,
                 "positive_chunks": 0, "negative_chunks": 0, "neutral_chunks": 0,
                 "total_chunks": 0, "error": str(e)}
 
 
+# ── Highlight spans ───────────────────────────────────────────────────────────
+
+def _alternation(phrases: list) -> Optional[re.Pattern]:
+    # Longest first, so "to the moon" wins over "moon" at the same position. The
+    # first-character lookahead lets the scan skip most offsets without trying
+    # every alternative.
+    ordered = sorted(set(p for p in phrases if p), key=len, reverse=True)
+    if not ordered:
+        return None
+    first = ''.join(sorted({re.escape(p[0]) for p in ordered}))
+    return re.compile(f"(?=[{first}])(?:{'|'.join(map(re.escape, ordered))})", re.IGNORECASE)
+
+
+# Earlier kinds win ties when two hits start at the same offset with the same length
+_SPAN_PATTERNS = [
+    ("disclaimer", _alternation(DISCLAIMER_PHRASES)),
+    ("claim", re.compile('|'.join(f'(?:{p})' for p in EXAGGERATION_PATTERNS), re.IGNORECASE)),
+    ("hype", _alternation(HYPE_KEYWORDS)),
+]
+
+
+@track_stage("highlight_spans")
+def find_highlight_spans(text: str) -> list:
+    """
+    Sorted, non-overlapping [start, end, kind] character spans of detector hits.
+
+    Offsets index the original text (matching is case-insensitive rather than
+    on a lowercased copy), so clients can slice it directly.
+    """
+    if not text:
+        return []
+
+    candidates = []
+    for kind, pattern in _SPAN_PATTERNS:
+        if pattern is None:
+            continue
+        for m in pattern.finditer(text):
+            start, end = m.span()
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if end > start:
+                candidates.append((start, end, kind))
+
+    # Leftmost first, then longest; anything overlapping an accepted span is dropped
+    candidates.sort(key=lambda c: (c[0], c[0] - c[1]))
+    spans, last_end = [], 0
+    for start, end, kind in candidates:
+        if start >= last_end:
+            spans.append([start, end, kind])
+            last_end = end
+    return spans
+
+
 # ── Overall Hype/Risk Score ───────────────────────────────────────────────────
 
-def compute_hype_score(hype: dict, disclaimers: dict, exaggerations: dict, finbert_result: dict) -> dict:
+HYPE_SCORE_CONFIG = {
+    "keyword_points": 2.5,
+    "keyword_cap": 25,
+    "missing_disclaimer_points": 20,
+    "exaggeration_points": 6,
+    "exaggeration_cap": 30,
+    "finbert_positive_points": 25,
+    "max_score": 100,
+    "levels": [(80, "Very High"), (60, "High"), (30, "Medium")],
+    "default_level": "Low",
+}
+
+
+@track_stage("hype_score")
+def compute_hype_score(hype: dict, disclaimers: dict, exaggerations: dict, finbert_result: dict,
+                       config: dict = HYPE_SCORE_CONFIG) -> dict:
     """
     Produce a 0-100 hype/risk score from all signals.
 
-    Weights:
+    Weights (see HYPE_SCORE_CONFIG):
       - Hype keywords      : 25 pts
       - No disclaimer      : 20 pts
       - Exaggerated claims : 30 pts
@@ -212,40 +328,33 @@ def compute_hype_score(hype: dict, disclaimers: dict, exaggerations: dict, finbe
 
     # Hype keywords (0-25)
     kw_total = hype.get("total_matches", 0)
-    kw_score = min(kw_total * 2.5, 25)
+    kw_score = min(kw_total * config["keyword_points"], config["keyword_cap"])
     score += kw_score
 
     # Missing disclaimer (0-20)
-    if disclaimers.get("missing_disclaimer", True):
-        score += 20
+    disclaimer_score = config["missing_disclaimer_points"] if disclaimers.get("missing_disclaimer", True) else 0
+    score += disclaimer_score
 
     # Exaggerated claims (0-30)
     exag_total = exaggerations.get("total_exaggerations", 0)
-    exag_score = min(exag_total * 6, 30)
+    exag_score = min(exag_total * config["exaggeration_points"], config["exaggeration_cap"])
     score += exag_score
 
     # FinBERT positive sentiment (0-25)
     positive_ratio = finbert_result.get("positive_ratio", 0.0)
-    finbert_score = round(positive_ratio * 25, 2)
+    finbert_score = round(positive_ratio * config["finbert_positive_points"], 2)
     score += finbert_score
 
-    score = round(min(score, 100), 2)
+    score = round(min(score, config["max_score"]), 2)
 
-    if score < 30:
-        risk_level = "Low"
-    elif score < 60:
-        risk_level = "Medium"
-    elif score < 80:
-        risk_level = "High"
-    else:
-        risk_level = "Very High"
+    risk_level = next((name for minimum, name in config["levels"] if score >= minimum), config["default_level"])
 
     return {
         "hype_score": score,
         "risk_level": risk_level,
         "score_breakdown": {
             "hype_keywords_contribution": round(kw_score, 2),
-            "missing_disclaimer_contribution": 20 if disclaimers.get("missing_disclaimer") else 0,
+            "missing_disclaimer_contribution": disclaimer_score if disclaimers.get("missing_disclaimer") else 0,
             "exaggeration_contribution": round(exag_score, 2),
             "finbert_positive_contribution": finbert_score
         }
@@ -272,6 +381,7 @@ def analyze_transcript(text: str) -> dict:
             "disclaimer_analysis": disclaimers,
             "exaggeration_analysis": exaggerations,
             "finbert_analysis": finbert_result,
+            "highlights": find_highlight_spans(text),
             "transcript_length": len(text.split()),
         }
 
@@ -0,0 +1,126 @@
+"""
+Streaming audio decode.
+
+FFmpeg converts any input to 16 kHz mono s16le on a pipe, and the audio is
+read in fixed windows. Memory stays at about one window however long the
+recording is (a 10-minute window is ~38 MB of float32), instead of ~230 MB
+per hour for a whole-file decode.
+"""
+import os
+import logging
+import tempfile
+import subprocess
+
+import numpy as np
+
+from backend.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = int(os.getenv("AUDIO_WINDOW_SECONDS", 600))
+
+# Windows end at the quietest point in their last few seconds, so a cut rarely
+# lands mid-word; the remainder carries into the next window
+CUT_SEARCH_SECONDS = 5.0
+CUT_FRAME_SECONDS = 0.1
+
+SILENCE_PEAK = 1e-4
+MIN_DURATION_SECONDS = 0.5
+
+
+class AudioStats:
+    """Duration and peak amplitude accumulated as windows stream past."""
+
+    def __init__(self):
+        self.samples = 0
+        self.peak = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.samples / SAMPLE_RATE
+
+    def update(self, window: np.ndarray) -> float:
+        """Record a window; returns its own peak amplitude."""
+        peak = float(np.max(np.abs(window))) if window.size else 0.0
+        self.samples += window.size
+        self.peak = max(self.peak, peak)
+        return peak
+
+    def validate(self) -> None:
+        """Raise ValueError for audio Whisper can't use (too short or silent)."""
+        if self.duration < MIN_DURATION_SECONDS:
+            raise ValueError(f"Audio too short ({self.duration:.2f}s). Whisper needs at least 0.5s.")
+        if self.peak < SILENCE_PEAK:
+            raise ValueError(f"Audio appears silent (max amplitude: {self.peak:.6f}).")
+
+
+def _read_exactly(stream, n: int) -> bytes:
+    chunks, remaining = [], n
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def _quiet_cut(buffer: np.ndarray) -> int:
+    """Sample index of the lowest-energy frame near the end of the buffer."""
+    frame = int(CUT_FRAME_SECONDS * SAMPLE_RATE)
+    search = int(CUT_SEARCH_SECONDS * SAMPLE_RATE)
+    tail = buffer[-search:]
+    usable = (tail.size // frame) * frame
+    if usable < frame:
+        return buffer.size
+    energy = np.square(tail[:usable].reshape(-1, frame)).mean(axis=1)
+    return buffer.size - tail.size + int(np.argmin(energy)) * frame
+
+
+def stream_windows(path: str, window_seconds: float = WINDOW_SECONDS):
+    """
+    Yield (offset_seconds, float32 samples) windows of ~window_seconds each.
+
+    Raises RuntimeError if FFmpeg cannot decode the file.
+    """
+    window_bytes = int(window_seconds * SAMPLE_RATE) * 2
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(
+            ['ffmpeg', '-nostdin', '-v', 'error', '-i', path,
+             '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(SAMPLE_RATE), '-'],
+            stdout=subprocess.PIPE, stderr=stderr,
+        )
+        try:
+            offset = 0
+            carry = np.zeros(0, dtype=np.float32)
+            while True:
+                with track_stage("decode"):
+                    raw = _read_exactly(proc.stdout, window_bytes)
+                samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+                del raw
+                last = len(samples) * 2 < window_bytes
+                buffer = np.concatenate([carry, samples]) if carry.size else samples
+                del samples
+                if not buffer.size:
+                    break
+
+                cut = buffer.size if last else _quiet_cut(buffer)
+                yield offset / SAMPLE_RATE, buffer[:cut]
+                offset += cut
+                carry = buffer[cut:].copy()
+                del buffer
+                if last:
+                    break
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            returncode = proc.wait()
+
+        if returncode not in (0, -9):
+            stderr.seek(0)
+            message = stderr.read().decode(errors='replace').strip()
+            raise RuntimeError(f"FFmpeg could not decode '{path}': {message[-500:]}")
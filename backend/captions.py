@@ -0,0 +1,156 @@
+import json
+import re
+import html
+import logging
+from typing import Optional
+
+import yt_dlp
+
+from backend.segments import SegmentTable
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+# Formats we know how to parse, in order of preference
+PREFERRED_FORMATS = ["json3", "vtt"]
+
+# Below this density we assume the track is a stub (title card, lyrics only, ...)
+# and fall back to Whisper
+MIN_WORDS_PER_MINUTE = 30
+MIN_WORDS = 50
+
+_VTT_TIMESTAMP = re.compile(
+    r'(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})\s*-->\s*(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})'
+)
+_TAG = re.compile(r'<[^>]+>')
+
+
+# ── Parsers ───────────────────────────────────────────────────────────────────
+
+def _clean(text: str) -> str:
+    text = html.unescape(_TAG.sub('', text))
+    return ' '.join(text.split())
+
+
+def parse_json3(raw: str) -> list:
+    """Parse YouTube's json3 timed-text format into Whisper-style segments."""
+    data = json.loads(raw)
+    segments = []
+    for event in data.get("events", []):
+        segs = event.get("segs")
+        if not segs:
+            continue
+        text = _clean(''.join(seg.get("utf8", '') for seg in segs))
+        if not text:
+            continue
+        start = event.get("tStartMs", 0) / 1000
+        end = start + event.get("dDurationMs", 0) / 1000
+        segments.append({"id": len(segments), "start": start, "end": end, "text": text})
+    return segments
+
+
+def _vtt_seconds(h, m, s, ms) -> float:
+    return int(h or 0) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
+
+
+def parse_vtt(raw: str) -> list:
+    """Parse a WebVTT file into Whisper-style segments."""
+    segments = []
+    for block in re.split(r'\n\s*\n', raw.replace('\r\n', '\n')):
+        lines = block.strip().split('\n')
+        for i, line in enumerate(lines):
+            match = _VTT_TIMESTAMP.search(line)
+            if not match:
+                continue
+            g = match.groups()
+            text = _clean(' '.join(lines[i + 1:]))
+            if text:
+                segments.append({
+                    "id": len(segments),
+                    "start": _vtt_seconds(*g[:4]),
+                    "end": _vtt_seconds(*g[4:]),
+                    "text": text,
+                })
+            break
+    return segments
+
+
+PARSERS = {"json3": parse_json3, "vtt": parse_vtt}
+
+
+# ── Track selection ───────────────────────────────────────────────────────────
+
+def _pick_track(info: dict) -> Optional[tuple]:
+    """Pick the best manual subtitle track. Auto-generated captions are ignored."""
+    subtitles = {
+        lang: tracks for lang, tracks in (info.get("subtitles") or {}).items()
+        if lang != "live_chat" and tracks
+    }
+    if not subtitles:
+        return None
+
+    wanted = [info.get("language"), "en"]
+    lang = None
+    for want in filter(None, wanted):
+        lang = next((l for l in subtitles if l == want or l.startswith(f"{want}-")), None)
+        if lang:
+            break
+    if lang is None:
+        lang = next(iter(subtitles))
+
+    for fmt in PREFERRED_FORMATS:
+        for track in subtitles[lang]:
+            if track.get("ext") == fmt and track.get("url"):
+                return lang, track
+    return None
+
+
+def has_manual_captions(info: dict) -> bool:
+    return _pick_track(info) is not None
+
+
+def _is_good(segments: list, duration: float) -> bool:
+    words = sum(len(seg["text"].split()) for seg in segments)
+    if words < MIN_WORDS:
+        return False
+    if duration and words / (duration / 60) < MIN_WORDS_PER_MINUTE:
+        return False
+    return True
+
+
+# ── Main entry point ──────────────────────────────────────────────────────────
+
+def fetch_caption_transcript(info: dict) -> Optional[dict]:
+    """
+    Build a transcript from the video's human-made captions.
+
+    Returns the same shape as transcribe_audio(), or None when no usable
+    captions exist and the caller should fall back to Whisper.
+    """
+    picked = _pick_track(info)
+    if picked is None:
+        return None
+
+    lang, track = picked
+    try:
+        with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+            raw = ydl.urlopen(track["url"]).read().decode("utf-8")
+        segments = PARSERS[track["ext"]](raw)
+    except Exception as e:
+        logger.warning(f"Could not fetch captions ({lang}/{track['ext']}), falling back to Whisper: {e}")
+        return None
+
+    if not _is_good(segments, info.get("duration") or 0):
+        logger.info(f"Captions ({lang}) too sparse, falling back to Whisper")
+        return None
+
+    text = ' '.join(seg["text"] for seg in segments)
+    logger.info(f"Using captions — {len(text.split())} words | lang: {lang}")
+
+    return {
+        "text": text,
+        "language": lang.split('-')[0].lower(),
+        "segments": SegmentTable.from_segments(segments),
+        "source": "captions",
+    }
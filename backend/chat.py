@@ -0,0 +1,151 @@
+"""
+Transcript chat: BM25 retrieval over an analyzed video's segments.
+
+The index is built once when the video is analyzed and stored next to its
+transcript, so answering a question is a few posting-list lookups plus a
+lookup of the winning segments in the cached transcript table.
+"""
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from backend.store import chat_index_version, get_chat_index, get_result, get_segments
+from backend.metrics import register_cache
+from backend.segments import SegmentTable
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+TOP_K = 3
+INDEX_CACHE_SIZE = 64
+
+_TOKEN = re.compile(r"[a-z0-9$%]+(?:'[a-z]+)?")
+
+_STOPWORDS = frozenset("""
+a an and are as at be but by did do does for from has have he her his how i if in is it its
+me my of on or our she so that the their them they this to was we were what when where which
+who why will with you your video say said says talk about mention there any
+""".split())
+
+
+def tokenize(text: str) -> list:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+
+def build_index(segments: SegmentTable) -> dict:
+    """BM25 postings over transcript segments: {term: [[segment_idx, tf], ...]}."""
+    postings = defaultdict(list)
+    lengths = []
+    for idx, text in enumerate(segments.texts()):
+        tokens = tokenize(text)
+        lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            postings[term].append([idx, tf])
+
+    return {
+        "segments": len(lengths),
+        "avg_length": (sum(lengths) / len(lengths)) if lengths else 0.0,
+        "lengths": lengths,
+        "postings": dict(postings),
+    }
+
+
+def search(index: dict, query: str, k: int = TOP_K) -> list:
+    """Best-matching segment indexes for a query, as [(idx, score)], highest first."""
+    n = index["segments"]
+    if not n:
+        return []
+    avg = index["avg_length"] or 1.0
+    lengths = index["lengths"]
+
+    scores = defaultdict(float)
+    for term in set(tokenize(query)):
+        plist = index["postings"].get(term)
+        if not plist:
+            continue
+        idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+        for idx, tf in plist:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[idx] / avg)
+            scores[idx] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+@lru_cache(maxsize=INDEX_CACHE_SIZE)
+def _load_index(video_id: str, built_at: float) -> dict:
+    # built_at is part of the key so a re-analysis invalidates the cached copy
+    return get_chat_index(video_id)
+
+
+register_cache("chat_index", _load_index)
+
+
+def load_index(video_id: str):
+    built_at = chat_index_version(video_id)
+    return _load_index(video_id, built_at) if built_at is not None else None
+
+
+# ── Answers ───────────────────────────────────────────────────────────────────
+
+def _timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def _findings(result: dict) -> dict:
+    return {
+        "risk_score": result.get("risk_score"),
+        "risk_label": result.get("risk_label"),
+        "reasons": result.get("reasons", []),
+        "hype_keywords": [kw["keyword"] for kw in result.get("hype_keywords_found", [])],
+        "disclaimer_found": result.get("disclaimer_found"),
+        "finbert_sentiment": result.get("finbert_sentiment"),
+    }
+
+
+def answer(video_id: str, question: str, k: int = TOP_K):
+    """
+    Retrieve evidence for a question about one analyzed video.
+
+    Returns None when the video has no stored result or index.
+    """
+    result = get_result(video_id)
+    index = load_index(video_id)
+    if result is None or index is None:
+        return None
+
+    hits = search(index, question, k)
+    segments = get_segments(video_id, [idx for idx, _ in hits])
+    evidence = [
+        {**segments[idx], "timestamp": _timestamp(segments[idx]["start"]), "score": round(score, 3)}
+        for idx, score in hits if idx in segments
+    ]
+    findings = _findings(result)
+
+    lines = []
+    if evidence:
+        lines.append(f"Here is what \"{result.get('video_title', 'the video')}\" says about that:")
+        lines.extend(f"[{e['timestamp']}] \"{e['text']}\"" for e in evidence)
+    else:
+        lines.append("The transcript doesn't mention that directly.")
+
+    lines.append(f"Overall: {findings['risk_label']} ({findings['risk_score']}/10).")
+    if findings["hype_keywords"]:
+        lines.append("Hype terms flagged: " + ", ".join(findings["hype_keywords"][:8]) + ".")
+    lines.append("A disclaimer was found." if findings["disclaimer_found"] else "No disclaimer was found.")
+
+    return {
+        "video_id": video_id,
+        "reply": "\n".join(lines),
+        "evidence": evidence,
+        "findings": findings,
+    }
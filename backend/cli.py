@@ -0,0 +1,150 @@
+"""
+Bulk analysis without the API.
+
+    python -m backend.cli urls.txt -o results.jsonl --workers 4
+    cat urls.txt | python -m backend.cli - -o results.jsonl
+
+Each input line is a YouTube URL or a path to a local audio file. One JSONL
+record is written per item as it finishes, and finished items are recorded
+in a checkpoint file (<output>.ckpt by default), so re-running the same
+command after an interruption skips everything already done.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+import multiprocessing
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+
+def _process(item: str) -> dict:
+    """Run one item through the pipeline. Never raises; failures become records."""
+    # Imported here so the parent process never loads Whisper/FinBERT
+    from backend.pipeline import analyze_file, analyze_url
+    from backend.admission import AdmissionError, preflight
+    from backend.utils import extract_metadata
+    from backend.telemetry import correlation
+
+    started = time.time()
+    with correlation():
+        try:
+            if item.startswith(("http://", "https://")):
+                info = extract_metadata(item)
+                estimate = preflight(info)
+                result = analyze_url(item, info, estimate)
+            else:
+                result = analyze_file(item)
+            result.pop("full_transcript", None)
+            return {"input": item, "ok": True, "seconds": round(time.time() - started, 2), "result": result}
+
+        except AdmissionError as e:
+            return {"input": item, "ok": False, "error": e.detail, "status": e.status_code}
+        except Exception as e:
+            return {"input": item, "ok": False, "error": str(e), "traceback": traceback.format_exc()}
+
+
+def _quiet_worker() -> None:
+    # Per-item progress logs would interleave across workers; keep warnings and the summary
+    from backend.telemetry import configure_logging
+    configure_logging(level="WARNING")
+    sys.stdout = open(os.devnull, 'w')
+
+
+# ── Input / checkpoint ────────────────────────────────────────────────────────
+
+def read_items(source: str) -> list:
+    stream = sys.stdin if source == '-' else open(source)
+    try:
+        items = [line.strip() for line in stream]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    # Keep order, drop blanks, comments and duplicates
+    return list(dict.fromkeys(i for i in items if i and not i.startswith('#')))
+
+
+def load_checkpoint(path: str) -> dict:
+    """item -> 'ok' | 'err' for every item already finished."""
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                status, _, item = line.rstrip('\n').partition('\t')
+                if item:
+                    done[item] = status
+    return done
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m" if h else f"{m}m{s:02d}s"
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="file with one URL or audio path per line, or - for stdin")
+    parser.add_argument('-o', '--output', required=True, help="JSONL file to append results to")
+    parser.add_argument('-w', '--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--checkpoint', help="defaults to <output>.ckpt")
+    parser.add_argument('--retry-failed', action='store_true', help="re-run items that failed last time")
+    parser.add_argument('--max-tasks-per-worker', type=int, default=200,
+                        help="recycle worker processes to cap memory growth")
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or f"{args.output}.ckpt"
+    items = read_items(args.input)
+    done = load_checkpoint(checkpoint)
+    pending = [i for i in items if i not in done or (args.retry_failed and done[i] != 'ok')]
+
+    skipped = len(items) - len(pending)
+    print(f"{len(items)} items, {skipped} already done, {len(pending)} to process "
+          f"with {args.workers} worker(s)", file=sys.stderr)
+    if not pending:
+        return 0
+
+    # Scratch directories left by an earlier run that was killed
+    from backend.spool import spool
+    spool.collect_garbage()
+
+    ok = failed = 0
+    started = time.time()
+    ctx = multiprocessing.get_context()
+    with open(args.output, 'a') as out, open(checkpoint, 'a') as ckpt, \
+            ctx.Pool(args.workers, initializer=_quiet_worker, maxtasksperchild=args.max_tasks_per_worker) as pool:
+        try:
+            for record in pool.imap_unordered(_process, pending):
+                # Result first, then checkpoint: a crash in between re-runs the
+                # item (a duplicate line) rather than losing it
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+                ckpt.write(f"{'ok' if record['ok'] else 'err'}\t{record['input']}\n")
+                ckpt.flush()
+
+                if record['ok']:
+                    ok += 1
+                else:
+                    failed += 1
+                finished = ok + failed
+                elapsed = time.time() - started
+                rate = finished / elapsed if elapsed else 0.0
+                eta = (len(pending) - finished) / rate if rate else 0.0
+                print(f"\r[{finished}/{len(pending)}] {rate * 60:.1f} items/min | "
+                      f"{failed} failed | ETA {_format_eta(eta)}   ", end='', file=sys.stderr, flush=True)
+        except KeyboardInterrupt:
+            pool.terminate()
+            print(f"\nInterrupted — {ok + failed} finished this run; re-run to resume.", file=sys.stderr)
+            return 130
+
+    print(f"\nDone in {_format_eta(time.time() - started)}: {ok} ok, {failed} failed", file=sys.stderr)
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
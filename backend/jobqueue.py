@@ -0,0 +1,547 @@
+"""
+Shared job queue for distributed workers.
+
+    QUEUE_URL=sqlite:///data/queue.db     # one host, any number of worker processes
+    QUEUE_URL=redis://queue-host:6379/0   # worker nodes on many hosts (single-node Redis)
+
+Workers lease a job for a fixed time and must heartbeat to keep it. A lease
+that runs out (crashed or partitioned worker) puts the job back in the queue.
+Failed attempts are retried with exponential backoff up to max_attempts.
+Results and errors are written back to the job record. The API collects
+each finished result exactly once (claim_result) and persists it locally.
+"""
+import os
+import abc
+import json
+import time
+import uuid
+import random
+import sqlite3
+import logging
+import threading
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+QUEUE_URL = os.getenv("QUEUE_URL")
+
+LEASE_SECONDS = int(os.getenv("QUEUE_LEASE_SECONDS", 120))
+MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", 3))
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 600
+RESULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts`, with ±25% jitter."""
+    delay = min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.75, 1.25)
+
+
+class JobQueue(abc.ABC):
+    """
+    Interface shared by the queue backends.
+
+    Jobs are dicts with job_id, payload, state (queued | leased | done | failed),
+    stage, attempts, max_attempts, result and error. Lower priority values
+    are leased first (the API uses the estimated cost, as the local scheduler does).
+    """
+
+    @abc.abstractmethod
+    def enqueue(self, payload: dict, priority: float = 0.0, dedupe_key: str = None,
+                max_attempts: int = MAX_ATTEMPTS) -> str:
+        """Add a job; with dedupe_key, returns the ID of an identical unfinished job instead."""
+
+    @abc.abstractmethod
+    def record(self, payload: dict, result: dict) -> str:
+        """Add a job that is already done (e.g. answered from the store); never leased or claimed."""
+
+    @abc.abstractmethod
+    def lease(self, worker_id: str, lease_seconds: int = LEASE_SECONDS):
+        """Claim the next ready job, or None."""
+
+    @abc.abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int = LEASE_SECONDS) -> bool:
+        """Extend a lease; False means it was lost and the job should be abandoned."""
+
+    @abc.abstractmethod
+    def set_stage(self, job_id: str, worker_id: str, stage: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: dict) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def defer(self, job_id: str, worker_id: str, delay_seconds: float, reason: str) -> bool:
+        """Hand a leased job back to run after a delay, without counting the attempt."""
+
+    @abc.abstractmethod
+    def get(self, job_id: str):
+        pass
+
+    @abc.abstractmethod
+    def depth(self) -> int:
+        """Jobs waiting to be leased, including ones backing off before a retry."""
+
+    @abc.abstractmethod
+    def unclaimed(self, limit: int = 100) -> list:
+        """IDs of finished jobs whose result nobody has claimed yet."""
+
+    @abc.abstractmethod
+    def claim_result(self, job_id: str) -> bool:
+        """Mark a finished job's result as collected; True for the first caller only."""
+
+    def wait(self, job_id: str, timeout: float, poll_seconds: float = 1.0):
+        """Block until the job finishes or the timeout passes; returns the last job state."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["state"] in ("done", "failed") or time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_seconds)
+
+
+# ── SQLite backend ────────────────────────────────────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id        TEXT PRIMARY KEY,
+    payload       TEXT NOT NULL,
+    priority      REAL NOT NULL,
+    dedupe_key    TEXT,
+    state         TEXT NOT NULL,
+    stage         TEXT,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL,
+    available_at  REAL NOT NULL,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    result        TEXT,
+    error         TEXT,
+    collected     INTEGER NOT NULL DEFAULT 0,
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready  ON jobs (state, available_at, priority);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease  ON jobs (state, lease_expires);
+CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (dedupe_key, state);
+CREATE INDEX IF NOT EXISTS idx_jobs_collect ON jobs (state, collected);
+"""
+
+
+class SQLiteQueue(JobQueue):
+    """Single-host queue; every process opening the same file shares it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    @staticmethod
+    def _row(row) -> dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, payload, priority=0.0, dedupe_key=None, max_attempts=MAX_ATTEMPTS):
+        conn = self._transaction()
+        try:
+            if dedupe_key:
+                row = conn.execute(
+                    "SELECT job_id FROM jobs WHERE dedupe_key = ? AND state IN ('queued', 'leased')",
+                    (dedupe_key,),
+                ).fetchone()
+                if row:
+                    conn.execute("COMMIT")
+                    return row["job_id"]
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            conn.execute(
+                """
+                INSERT INTO jobs (job_id, payload, priority, dedupe_key, state, stage, max_attempts,
+                                  available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 'queued', 'queued', ?, ?, ?, ?)
+                """,
+                (job_id, json.dumps(payload), priority, dedupe_key, max_attempts, now, now, now),
+            )
+            conn.execute("COMMIT")
+            return job_id
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def record(self, payload, result):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            """
+            INSERT INTO jobs (job_id, payload, priority, state, stage, max_attempts, available_at,
+                              result, collected, created_at, updated_at)
+            VALUES (?, ?, 0, 'done', 'done', 0, ?, ?, 1, ?, ?)
+            """,
+            (job_id, json.dumps(payload), now, json.dumps(result), now, now),
+        )
+        return job_id
+
+    def lease(self, worker_id, lease_seconds=LEASE_SECONDS):
+        conn = self._transaction()
+        try:
+            now = time.time()
+            # Expired leases whose attempts are used up fail; the rest become ready again
+            conn.execute(
+                """
+                UPDATE jobs SET state = 'failed', error = 'lease expired', updated_at = ?
+                WHERE state = 'leased' AND lease_expires < ? AND attempts >= max_attempts
+                """,
+                (now, now),
+            )
+            conn.execute(
+                """
+                UPDATE jobs SET state = 'queued', lease_owner = NULL, available_at = ?, updated_at = ?
+                WHERE state = 'leased' AND lease_expires < ?
+                """,
+                (now, now, now),
+            )
+            row = conn.execute(
+                """
+                SELECT job_id FROM jobs WHERE state = 'queued' AND available_at <= ?
+                ORDER BY priority, created_at LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                """
+                UPDATE jobs SET state = 'leased', lease_owner = ?, lease_expires = ?,
+                                attempts = attempts + 1, updated_at = ?
+                WHERE job_id = ?
+                """,
+                (worker_id, now + lease_seconds, now, row["job_id"]),
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+            conn.execute("COMMIT")
+            return self._row(job)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _update_owned(self, job_id, worker_id, assignments: str, params: tuple) -> bool:
+        cursor = self._connect().execute(
+            f"UPDATE jobs SET {assignments}, updated_at = ? "
+            f"WHERE job_id = ? AND state = 'leased' AND lease_owner = ?",
+            (*params, time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=LEASE_SECONDS):
+        return self._update_owned(job_id, worker_id, "lease_expires = ?", (time.time() + lease_seconds,))
+
+    def set_stage(self, job_id, worker_id, stage):
+        self._update_owned(job_id, worker_id, "stage = ?", (stage,))
+
+    def complete(self, job_id, worker_id, result):
+        return self._update_owned(
+            job_id, worker_id, "state = 'done', stage = 'done', result = ?", (json.dumps(result),)
+        )
+
+    def fail(self, job_id, worker_id, error, retry=True):
+        conn = self._transaction()
+        try:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE job_id = ? AND state = 'leased' AND lease_owner = ?",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return False
+            now = time.time()
+            if retry and row["attempts"] < row["max_attempts"]:
+                conn.execute(
+                    """
+                    UPDATE jobs SET state = 'queued', stage = 'queued', lease_owner = NULL,
+                                    available_at = ?, error = ?, updated_at = ?
+                    WHERE job_id = ?
+                    """,
+                    (now + backoff_seconds(row["attempts"]), error, now, job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET state = 'failed', error = ?, updated_at = ? WHERE job_id = ?",
+                    (error, now, job_id),
+                )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def defer(self, job_id, worker_id, delay_seconds, reason):
+        return self._update_owned(
+            job_id, worker_id,
+            "state = 'queued', stage = 'queued', lease_owner = NULL, attempts = attempts - 1, "
+            "available_at = ?, error = ?",
+            (time.time() + delay_seconds, reason),
+        )
+
+    def get(self, job_id):
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def depth(self):
+        return self._connect().execute("SELECT COUNT(*) FROM jobs WHERE state = 'queued'").fetchone()[0]
+
+    def unclaimed(self, limit=100):
+        rows = self._connect().execute(
+            "SELECT job_id FROM jobs WHERE state = 'done' AND collected = 0 ORDER BY updated_at LIMIT ?", (limit,)
+        ).fetchall()
+        return [row["job_id"] for row in rows]
+
+    def claim_result(self, job_id):
+        cursor = self._connect().execute(
+            "UPDATE jobs SET collected = 1 WHERE job_id = ? AND state = 'done' AND collected = 0", (job_id,)
+        )
+        return cursor.rowcount == 1
+
+
+# ── Redis backend ─────────────────────────────────────────────────────────────
+
+# Each state transition is one script, so it is atomic across API and worker nodes.
+# Job hashes live at <prefix>:job:<id>. The scripts derive key names from ARGV
+# (lease walks job keys it only learns inside the script), so they need a
+# single-node Redis (or a primary with replicas); Redis Cluster is not supported.
+
+_ENQUEUE = """
+local p = ARGV[1]
+if ARGV[6] ~= '' then
+    local existing = redis.call('GET', p .. ':active:' .. ARGV[6])
+    if existing then return existing end
+end
+redis.call('HSET', p .. ':job:' .. ARGV[2],
+    'payload', ARGV[3], 'priority', ARGV[4], 'max_attempts', ARGV[5], 'dedupe_key', ARGV[6],
+    'state', 'queued', 'stage', 'queued', 'attempts', 0, 'created_at', ARGV[7], 'updated_at', ARGV[7])
+redis.call('ZADD', p .. ':ready', ARGV[4], ARGV[2])
+if ARGV[6] ~= '' then redis.call('SET', p .. ':active:' .. ARGV[6], ARGV[2]) end
+return ARGV[2]
+"""
+
+_FINISH = """
+local function finish(p, id, key, now, ttl)
+    local dedupe = redis.call('HGET', key, 'dedupe_key')
+    if dedupe and dedupe ~= '' then redis.call('DEL', p .. ':active:' .. dedupe) end
+    redis.call('ZREM', p .. ':leased', id)
+    redis.call('EXPIRE', key, ttl)
+end
+"""
+
+_LEASE = _FINISH + """
+local p, worker, now, lease, ttl = ARGV[1], ARGV[2], tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5]
+
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', p .. ':delayed', '-inf', now)) do
+    redis.call('ZREM', p .. ':delayed', id)
+    redis.call('ZADD', p .. ':ready', redis.call('HGET', p .. ':job:' .. id, 'priority'), id)
+end
+
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', p .. ':leased', '-inf', now)) do
+    local key = p .. ':job:' .. id
+    if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(redis.call('HGET', key, 'max_attempts')) then
+        redis.call('HSET', key, 'state', 'failed', 'error', 'lease expired', 'updated_at', now)
+        finish(p, id, key, now, ttl)
+    else
+        redis.call('ZREM', p .. ':leased', id)
+        redis.call('HSET', key, 'state', 'queued', 'lease_owner', '', 'updated_at', now)
+        redis.call('ZADD', p .. ':ready', redis.call('HGET', key, 'priority'), id)
+    end
+end
+
+local popped = redis.call('ZPOPMIN', p .. ':ready')
+if #popped == 0 then return false end
+local id = popped[1]
+local key = p .. ':job:' .. id
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('HSET', key, 'state', 'leased', 'lease_owner', worker, 'lease_expires', now + lease, 'updated_at', now)
+redis.call('ZADD', p .. ':leased', now + lease, id)
+return id
+"""
+
+_OWNED = """
+local p, id, worker, now = ARGV[1], ARGV[2], ARGV[3], tonumber(ARGV[4])
+local key = p .. ':job:' .. id
+if redis.call('HGET', key, 'state') ~= 'leased' or redis.call('HGET', key, 'lease_owner') ~= worker then
+    return 0
+end
+"""
+
+_HEARTBEAT = _OWNED + """
+redis.call('HSET', key, 'lease_expires', now + tonumber(ARGV[5]), 'updated_at', now)
+redis.call('ZADD', p .. ':leased', now + tonumber(ARGV[5]), id)
+return 1
+"""
+
+_COMPLETE = _FINISH + _OWNED + """
+redis.call('HSET', key, 'state', 'done', 'stage', 'done', 'result', ARGV[5], 'updated_at', now)
+finish(p, id, key, now, ARGV[6])
+redis.call('ZADD', p .. ':unclaimed', now, id)
+return 1
+"""
+
+_FAIL = _FINISH + _OWNED + """
+local err, retry_at, ttl = ARGV[5], ARGV[6], ARGV[7]
+if retry_at ~= '' and tonumber(redis.call('HGET', key, 'attempts')) < tonumber(redis.call('HGET', key, 'max_attempts')) then
+    redis.call('ZREM', p .. ':leased', id)
+    redis.call('HSET', key, 'state', 'queued', 'stage', 'queued', 'lease_owner', '', 'error', err, 'updated_at', now)
+    redis.call('ZADD', p .. ':delayed', tonumber(retry_at), id)
+else
+    redis.call('HSET', key, 'state', 'failed', 'error', err, 'updated_at', now)
+    finish(p, id, key, now, ttl)
+end
+return 1
+"""
+
+_DEFER = _OWNED + """
+redis.call('ZREM', p .. ':leased', id)
+redis.call('HINCRBY', key, 'attempts', -1)
+redis.call('HSET', key, 'state', 'queued', 'stage', 'queued', 'lease_owner', '', 'error', ARGV[6], 'updated_at', now)
+redis.call('ZADD', p .. ':delayed', now + tonumber(ARGV[5]), id)
+return 1
+"""
+
+
+class RedisQueue(JobQueue):
+    """Queue shared by every host that can reach one Redis server (not Redis Cluster)."""
+
+    def __init__(self, url: str, prefix: str = "finfluencer", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("QUEUE_URL is a redis:// URL but the 'redis' package is not installed")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.redis = client
+        self.prefix = prefix
+        self._enqueue = client.register_script(_ENQUEUE)
+        self._lease = client.register_script(_LEASE)
+        self._heartbeat = client.register_script(_HEARTBEAT)
+        self._complete = client.register_script(_COMPLETE)
+        self._fail = client.register_script(_FAIL)
+        self._defer = client.register_script(_DEFER)
+
+    def _job(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def enqueue(self, payload, priority=0.0, dedupe_key=None, max_attempts=MAX_ATTEMPTS):
+        return self._enqueue(args=[
+            self.prefix, uuid.uuid4().hex, json.dumps(payload), priority, max_attempts,
+            dedupe_key or '', time.time(),
+        ])
+
+    def record(self, payload, result):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        key = self._job(job_id)
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping={
+            "payload": json.dumps(payload), "priority": 0, "max_attempts": 0, "attempts": 0,
+            "state": "done", "stage": "done", "result": json.dumps(result), "created_at": now, "updated_at": now,
+        })
+        pipe.expire(key, RESULT_TTL_SECONDS)
+        pipe.execute()
+        return job_id
+
+    def lease(self, worker_id, lease_seconds=LEASE_SECONDS):
+        job_id = self._lease(args=[self.prefix, worker_id, time.time(), lease_seconds, RESULT_TTL_SECONDS])
+        return self.get(job_id) if job_id else None
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=LEASE_SECONDS):
+        return bool(self._heartbeat(args=[self.prefix, job_id, worker_id, time.time(), lease_seconds]))
+
+    def set_stage(self, job_id, worker_id, stage):
+        key = self._job(job_id)
+        if self.redis.hget(key, "lease_owner") == worker_id:
+            self.redis.hset(key, mapping={"stage": stage, "updated_at": time.time()})
+
+    def complete(self, job_id, worker_id, result):
+        return bool(self._complete(args=[
+            self.prefix, job_id, worker_id, time.time(), json.dumps(result), RESULT_TTL_SECONDS,
+        ]))
+
+    def fail(self, job_id, worker_id, error, retry=True):
+        attempts = int(self.redis.hget(self._job(job_id), "attempts") or 0)
+        retry_at = time.time() + backoff_seconds(attempts) if retry else ''
+        return bool(self._fail(args=[
+            self.prefix, job_id, worker_id, time.time(), error, retry_at, RESULT_TTL_SECONDS,
+        ]))
+
+    def defer(self, job_id, worker_id, delay_seconds, reason):
+        return bool(self._defer(args=[self.prefix, job_id, worker_id, time.time(), delay_seconds, reason]))
+
+    def get(self, job_id):
+        raw = self.redis.hgetall(self._job(job_id))
+        if not raw:
+            return None
+        return {
+            "job_id": job_id,
+            "payload": json.loads(raw["payload"]),
+            "priority": float(raw["priority"]),
+            "dedupe_key": raw.get("dedupe_key") or None,
+            "state": raw["state"],
+            "stage": raw.get("stage"),
+            "attempts": int(raw.get("attempts", 0)),
+            "max_attempts": int(raw["max_attempts"]),
+            "lease_owner": raw.get("lease_owner") or None,
+            "lease_expires": float(raw["lease_expires"]) if raw.get("lease_expires") else None,
+            "result": json.loads(raw["result"]) if raw.get("result") else None,
+            "error": raw.get("error"),
+            "created_at": float(raw["created_at"]),
+            "updated_at": float(raw["updated_at"]),
+        }
+
+    def depth(self):
+        return self.redis.zcard(f"{self.prefix}:ready") + self.redis.zcard(f"{self.prefix}:delayed")
+
+    def unclaimed(self, limit=100):
+        return self.redis.zrange(f"{self.prefix}:unclaimed", 0, limit - 1)
+
+    def claim_result(self, job_id):
+        # ZREM is atomic, so exactly one caller sees 1
+        return bool(self.redis.zrem(f"{self.prefix}:unclaimed", job_id))
+
+
+# ── Factory ───────────────────────────────────────────────────────────────────
+
+def open_queue(url: str = None) -> JobQueue:
+    """sqlite:///relative.db, sqlite:////abs/path.db, or redis://host:port/db."""
+    url = url or QUEUE_URL
+    if not url:
+        raise ValueError("No queue configured (set QUEUE_URL)")
+    scheme = urlparse(url).scheme
+    if scheme == "sqlite":
+        return SQLiteQueue(url[len("sqlite:///"):])
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisQueue(url)
+    raise ValueError(f"Unsupported queue URL scheme '{scheme}'")
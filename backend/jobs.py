@@ -0,0 +1,87 @@
+import time
+import uuid
+import threading
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+# Finished jobs stay pollable this long; results live on in the store after that
+JOB_TTL_SECONDS = 3600
+
+# User-facing order of pipeline stages, used for progress reporting
+STAGES = ["metadata", "queued", "captions", "download", "transcribe", "analyze", "scoring", "done"]
+
+
+class JobRegistry:
+    """In-memory status for asynchronous /jobs submissions."""
+
+    def __init__(self, ttl: float = JOB_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def create(self, key: str, **fields) -> dict:
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "key": key,
+            "status": "running",
+            "stage": "metadata",
+            "created_at": now,
+            "updated_at": now,
+            "result": None,
+            "error": None,
+            **fields,
+        }
+        with self._lock:
+            self._prune(now)
+            self._jobs[job["job_id"]] = job
+        return dict(job)
+
+    def get(self, job_id: str) -> dict:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def find_active(self, key: str) -> dict:
+        with self._lock:
+            for job in self._jobs.values():
+                if job["key"] == key and job["status"] == "running":
+                    return dict(job)
+        return None
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields, updated_at=time.time())
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def progress(self, job_id: str):
+        """Callback for the pipeline to report the stage it has entered."""
+        return lambda stage: self.update(job_id, stage=stage)
+
+    def finish(self, job_id: str, future) -> None:
+        error = future.exception()
+        if error is None:
+            result = {k: v for k, v in future.result().items() if k != "full_transcript"}
+            self.update(job_id, status="done", stage="done", result=result)
+        else:
+            self.update(job_id, status="failed", error=getattr(error, "detail", None) or str(error))
+
+    def _prune(self, now: float) -> None:
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] != "running" and now - job["updated_at"] > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def stage_progress(stage: str) -> float:
+    """Fraction of the pipeline completed when a job is in this stage."""
+    if stage not in STAGES:
+        return 0.0
+    return round(STAGES.index(stage) / (len(STAGES) - 1), 2)
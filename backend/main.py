@@ -1,18 +1,157 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import os
-import traceback
+import logging
+import asyncio
+import secrets
+import threading
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
+
+from backend.utils import extract_metadata, extract_video_id
+from backend.pipeline import analyze_file, analyze_url, local_file_info, run_profiled, save_outcome
+from backend.admission import AdmissionError, preflight, preflight_file
+from backend.uploads import MAX_UPLOAD_BYTES, UploadError, resolve_ingest_path, spool_upload
+from backend.spool import SpoolFullError, spool
+from backend.scheduler import QueueFullError, scheduler
+from backend.singleflight import SingleFlight
+from backend.jobs import JobRegistry, stage_progress
+from backend.chat import answer
+from backend.jobqueue import QUEUE_URL, open_queue
+from backend.store import TRANSCRIPT_FIELDS, get_result, get_transcript_page, query_results
+from backend.rescoring import load_features, what_if
+from backend.profiling import ProfilerBusyError, artifact_path, exclusive_profile, list_artifacts
+from backend.watcher import ChannelWatcher, add_channel, get_channel, list_channels, poll_channel, remove_channel
+from backend.metrics import publish_cache_stats, render_latest, track_stage
+from backend.telemetry import configure_logging, correlation, get_correlation_id, span, trace_carrier
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+WATCH_CHANNELS = os.getenv("WATCH_CHANNELS", "").lower() in ("1", "true", "yes")
+
+# With QUEUE_URL set, YouTube analyses run on backend.worker processes instead
+# of in this one; uploads and server-local files still run here.
+job_queue = open_queue(QUEUE_URL) if QUEUE_URL else None
+ANALYZE_WAIT_SECONDS = int(os.getenv("ANALYZE_WAIT_SECONDS", 300))
+COLLECT_INTERVAL_SECONDS = 5
+
+
+def _log_job_failure(future) -> None:
+    if future.exception() is not None:
+        logger.error(f"Background job failed: {future.exception()}")
+
+
+# ── Distributed queue ─────────────────────────────────────────────────────────
+
+_REMOTE_STATUS = {"queued": "running", "leased": "running", "done": "done", "failed": "failed"}
+
+
+def _enqueue_remote(url: str, estimate: dict, key: str) -> str:
+    return job_queue.enqueue(
+        {"url": url, "estimate": estimate, "correlation_id": get_correlation_id(), "trace": trace_carrier()},
+        priority=estimate["estimated_seconds"], dedupe_key=key,
+    )
+
+
+def _write_back(job: dict) -> None:
+    """Store a finished remote job's outcome here, unless this store already has it (a shared DB)."""
+    outcome = job["result"] or {}
+    result = outcome.get("result")
+    if not result:
+        return
+    stored = get_result(result["video_id"], ["analyzed_at"])
+    if stored is None or stored["analyzed_at"] < job["created_at"]:
+        save_outcome(outcome)
+
+
+def _collect(job_id: str) -> None:
+    # Every API process races for the claim, so each result is written once
+    if job_queue.claim_result(job_id):
+        job = job_queue.get(job_id)
+        if job is not None:
+            _write_back(job)
+
+
+def _collect_results(stop: threading.Event) -> None:
+    """Persist finished remote jobs as they complete, whether or not anyone polls them."""
+    while not stop.wait(COLLECT_INTERVAL_SECONDS):
+        try:
+            for job_id in job_queue.unclaimed():
+                _collect(job_id)
+        except Exception:
+            logger.exception("Collecting remote results failed")
+
+
+def _remote_job(job: dict) -> dict:
+    """A queue record in the shape JobRegistry uses, so _job_status serves both."""
+    outcome = job["result"] or {}
+    estimate = job["payload"].get("estimate") or {}
+    return {
+        "job_id": job["job_id"],
+        "status": _REMOTE_STATUS[job["state"]],
+        "stage": job["stage"] or "queued",
+        "video_id": estimate.get("video_id"),
+        "estimated_seconds": estimate.get("estimated_seconds"),
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "result": outcome.get("result"),
+        "error": job["error"],
+    }
+
+
+def _submit_watched(url: str) -> bool:
+    """Watcher callback: True once the upload is queued or permanently rejected."""
+    with correlation():
+        return _submit_watched_video(url)
+
+
+def _submit_watched_video(url: str) -> bool:
+    info = extract_metadata(url)
+    try:
+        estimate = preflight(info, check_spool=job_queue is None)
+    except AdmissionError as e:
+        # Deferred (live/upcoming) videos come back on a later poll
+        logger.info(f"Watcher: {url} not admitted — {e.detail}")
+        return e.retry_after is None
+
+    if job_queue is not None:
+        _enqueue_remote(url, estimate, info["id"])
+        return True
+    try:
+        future = scheduler.submit(estimate["estimated_seconds"], run_profiled, analyze_url, url, info, estimate)
+    except QueueFullError:
+        return False
+    future.add_done_callback(_log_job_failure)
+    return True
+
+
+watcher = ChannelWatcher(_submit_watched)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    spool.collect_garbage()
+    collecting = threading.Event()
+    if job_queue is not None:
+        threading.Thread(target=_collect_results, args=(collecting,), name="result-collector", daemon=True).start()
+    if WATCH_CHANNELS:
+        watcher.start()
+    yield
+    watcher.stop()
+    collecting.set()
 
-from backend.utils import download_audio
-from backend.transcriber import transcribe_audio
-from backend.analyzer import analyze_transcript
-from backend.scorer import calculate_risk_score
 
 app = FastAPI(
     title="AI Finfluencer Risk Detector",
     description="Analyzes financial videos for misleading or risky content",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -22,8 +161,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def correlate_requests(request: Request, call_next):
+    """Tag the request's logs, spans and any job it starts with X-Request-ID (or a fresh ID)."""
+    with correlation(request.headers.get("x-request-id")) as request_id:
+        with span(f"{request.method} {request.url.path}", http_method=request.method, http_route=request.url.path):
+            response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    publish_cache_stats()
+    return response
+
+
+# Brotli when available (it falls back to gzip for clients that lack br)
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=1000)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+inflight = SingleFlight()
+jobs = JobRegistry()
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
 class VideoRequest(BaseModel):
     url: str
+    profile: bool = False
+
+class LocalFileRequest(BaseModel):
+    path: str
+
+class ChannelRequest(BaseModel):
+    channel_url: str
+    interval_seconds: int = 3600
+    min_interval_seconds: int = 600
+
+class ChatMessage(BaseModel):
+    role: Literal["user", "assistant", "system"]
+    content: str
+
+class ChatRequest(BaseModel):
+    messages: list[ChatMessage]
+    video_id: Optional[str] = None
+
+class WhatIfRequest(BaseModel):
+    candidate: dict
+    base: Optional[dict] = None
+    kind: str = "risk"
 
 @app.get("/")
 def root():
@@ -33,52 +217,420 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+def _parse_fields(fields: Optional[str]) -> Optional[list]:
+    return [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+
+
+def _project_response(result: dict, fields: Optional[list]) -> dict:
+    """Keep only the requested fields; by default drop the full transcript."""
+    if fields:
+        return {f: result[f] for f in fields if f in result}
+    return {k: v for k, v in result.items() if k not in TRANSCRIPT_FIELDS}
+
+
+def _require_admin(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN or not token or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def _is_youtube_url(url: str) -> bool:
+    return "youtube.com" in url or "youtu.be" in url
+
+
+def _preflight_or_raise(url: str, check_spool: bool = True) -> tuple:
+    """Fetch metadata and run admission checks; maps rejections onto HTTP errors."""
+    try:
+        with track_stage("metadata"):
+            info = extract_metadata(url)
+    except Exception as e:
+        logger.error(f"Metadata fetch failed for {url}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"Could not fetch video metadata: {e}")
+
+    try:
+        estimate = preflight(info, check_spool)
+    except AdmissionError as e:
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+
+    return info, estimate
+
+
+@app.post("/preflight")
+def preflight_video(request: VideoRequest):
+    if not _is_youtube_url(request.url):
+        raise HTTPException(status_code=400, detail="Only YouTube URLs are supported")
+
+    _, estimate = _preflight_or_raise(request.url, check_spool=job_queue is None)
+    return estimate
+
+
 @app.post("/analyze")
-def analyze_video(request: VideoRequest):
-    if "youtube.com" not in request.url and "youtu.be" not in request.url:
+def analyze_video(
+    request: VideoRequest,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    x_admin_token: Optional[str] = Header(None),
+):
+    if not _is_youtube_url(request.url):
+        raise HTTPException(status_code=400, detail="Only YouTube URLs are supported")
+    if request.profile:
+        _require_admin(x_admin_token)
+        # Held until the run finishes, so a second profiled request is refused rather than queued
+        try:
+            with exclusive_profile():
+                return _analyze_here(request, fields)
+        except ProfilerBusyError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    if job_queue is not None:
+        # The worker's spool, not this host's, decides whether the download fits
+        _, estimate = _preflight_or_raise(request.url, check_spool=False)
+        video_id = extract_video_id(request.url) or request.url
+        job_id = _enqueue_remote(request.url, estimate, video_id)
+        remote = job_queue.wait(job_id, ANALYZE_WAIT_SECONDS)
+        if remote is None:
+            # The queue record expired under us; if it finished, a collector has stored the result
+            raise HTTPException(
+                status_code=504,
+                detail=f"Job {job_id} is no longer in the queue; look for the result at /results/{video_id}",
+            )
+        job = _remote_job(remote)
+        if job["status"] == "done":
+            # Stored before answering, so /results and /transcript see it straight away
+            _collect(job_id)
+            return _project_response(job["result"], _parse_fields(fields))
+        if job["status"] == "failed":
+            raise HTTPException(status_code=500, detail=job["error"])
+        # Still running: hand back the job to poll rather than holding the connection
+        return JSONResponse(status_code=202, content=_job_status(job))
+
+    return _analyze_here(request, fields)
+
+
+def _analyze_here(request: VideoRequest, fields: Optional[str]):
+    """Run /analyze on this host's scheduler. Profiled runs always do, so their artifacts land here."""
+    def start():
+        logger.info(f"Fetching metadata: {request.url}")
+        info, estimate = _preflight_or_raise(request.url)
+        logger.info(f"Admitted — estimated {estimate['estimated_seconds']}s", extra={"video_id": info.get("id")})
+        try:
+            return scheduler.submit(
+                estimate["estimated_seconds"], run_profiled, analyze_url, request.url, info, estimate,
+                profile=request.profile,
+            )
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    # Identical requests in flight share one pipeline run; profiled runs never coalesce
+    if request.profile:
+        future = inflight.do(object(), start)
+    else:
+        future = inflight.do(extract_video_id(request.url) or request.url, start)
+
+    try:
+        return _project_response(future.result(), _parse_fields(fields))
+
+    except HTTPException:
+        raise
+    except SpoolFullError as e:
+        raise HTTPException(status_code=507, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        logger.exception("Analysis failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _job_status(job: dict, fields: Optional[list] = None) -> dict:
+    status = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": stage_progress(job["stage"]),
+        "video_id": job.get("video_id"),
+        "estimated_seconds": job.get("estimated_seconds"),
+        "elapsed_seconds": round(job["updated_at"] - job["created_at"], 1),
+        "status_url": f"/jobs/{job['job_id']}",
+    }
+    if job["status"] == "done":
+        status["result"] = _project_response(job["result"], fields)
+    if job["status"] == "failed":
+        status["error"] = job["error"]
+    return status
+
+
+@app.post("/jobs", status_code=202)
+def create_job(
+    request: VideoRequest,
+    response: Response,
+    force: bool = Query(False, description="Re-analyze even if a result is stored"),
+):
+    """Submit a video and return immediately; poll GET /jobs/{job_id} for progress."""
+    if not _is_youtube_url(request.url):
         raise HTTPException(status_code=400, detail="Only YouTube URLs are supported")
 
-    audio_path = None
+    video_id = extract_video_id(request.url)
+    key = video_id or request.url
+
+    if video_id and not force:
+        stored = get_result(video_id)
+        if stored is not None:
+            response.status_code = 200
+            if job_queue is not None:
+                # Any API process must be able to answer the status_url
+                result = {k: v for k, v in stored.items() if k not in TRANSCRIPT_FIELDS}
+                job_id = job_queue.record({"url": request.url, "estimate": {"video_id": video_id}}, {"result": result})
+                return _job_status(_remote_job(job_queue.get(job_id)))
+            job = jobs.create(key, video_id=video_id)
+            jobs.update(job["job_id"], status="done", stage="done", result=stored)
+            return _job_status(jobs.get(job["job_id"]))
+
+    if job_queue is not None:
+        # The worker's spool, not this host's, decides whether the download fits
+        _, estimate = _preflight_or_raise(request.url, check_spool=False)
+        job_id = _enqueue_remote(request.url, estimate, key)
+        return _job_status(_remote_job(job_queue.get(job_id)))
+
+    active = jobs.find_active(key)
+    if active is not None:
+        return _job_status(active)
+
+    job = jobs.create(key, video_id=video_id)
+    job_id = job["job_id"]
 
+    def start():
+        info, estimate = _preflight_or_raise(request.url)
+        jobs.update(job_id, stage="queued", video_id=info.get("id"), estimated_seconds=estimate["estimated_seconds"])
+        try:
+            return scheduler.submit(
+                estimate["estimated_seconds"], run_profiled, analyze_url, request.url, info, estimate,
+                progress=jobs.progress(job_id),
+            )
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    future = inflight.do(key, start)
+
+    # Rejections during admission are answered now rather than through the job
+    if future.done() and isinstance(future.exception(), HTTPException):
+        jobs.remove(job_id)
+        raise future.exception()
+
+    future.add_done_callback(lambda f: jobs.finish(job_id, f))
+    future.add_done_callback(_log_job_failure)
+    return _job_status(jobs.get(job_id))
+
+
+@app.get("/jobs/{job_id}")
+def read_job(job_id: str, fields: Optional[str] = Query(None, description="Comma-separated result fields")):
+    job = jobs.get(job_id)
+    if job is None and job_queue is not None:
+        remote = job_queue.get(job_id)
+        job = _remote_job(remote) if remote else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return _job_status(job, _parse_fields(fields))
+
+
+def _admit_file(path: str) -> dict:
+    try:
+        return preflight_file(path)
+    except AdmissionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+async def _run_file_job(path: str, info: dict, estimate: dict, fields: Optional[str], cleanup_dir: str = None):
     try:
-        print(f"Downloading: {request.url}")
-        audio_path, title, duration = download_audio(request.url)
-        print(f"Downloaded: {title}")
-
-        print("Transcribing...")
-        transcript = transcribe_audio(audio_path)
-        print(f"Words: {len(transcript['text'].split())}")
-
-        print("Analyzing...")
-        analysis = analyze_transcript(transcript["text"])
-
-        print("Scoring...")
-        score = calculate_risk_score(analysis)
-        print(f"Score: {score['risk_score']}/10")
-
-        return {
-            "success": True,
-            "video_title": title,
-            "duration_seconds": duration,
-            "language": transcript["language"],
-            "transcript_preview": transcript["text"][:300],
-            "full_transcript": transcript["text"],        # ← added
-            "risk_score": score["risk_score"],
-            "risk_label": score["risk_label"],
-            "reasons": score["reasons"],
-            "hype_keywords_found": analysis["hype_analysis"]["found_keywords"],
-            "disclaimer_found": analysis["disclaimer_analysis"]["has_disclaimer"],
-            "found_disclaimers": analysis["disclaimer_analysis"]["found_disclaimers"],
-            "word_count": analysis["transcript_length"],
-            "finbert_sentiment": score.get("finbert_sentiment", "neutral"),
-            "finbert_confidence": score.get("finbert_confidence", 0.0)
-        }
+        future = scheduler.submit(estimate["estimated_seconds"], _analyze_file_job, path, info, estimate, cleanup_dir)
+    except QueueFullError as e:
+        if cleanup_dir:
+            await run_in_threadpool(spool.release, cleanup_dir)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
+    try:
+        return _project_response(await asyncio.wrap_future(future), _parse_fields(fields))
     except Exception as e:
-        print("ERROR:", traceback.format_exc())
+        logger.exception("Analysis failed")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def _analyze_file_job(path: str, info: dict, estimate: dict, cleanup_dir: str = None) -> dict:
+    try:
+        return analyze_file(path, info, estimate)
     finally:
-        if audio_path and os.path.exists(audio_path):
-            os.remove(audio_path)
-            print("Temp audio deleted")
\ No newline at end of file
+        if cleanup_dir:
+            spool.release(cleanup_dir)
+
+
+@app.post("/analyze/upload")
+async def analyze_upload(
+    request: Request,
+    filename: Optional[str] = Query(None, description="Name of the file for raw (non-multipart) uploads"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+):
+    # Chunked uploads have no length up front; they are still capped at MAX_UPLOAD_BYTES
+    length = request.headers.get("content-length", "")
+    expected = min(int(length), MAX_UPLOAD_BYTES) if length.isdigit() else 0
+    try:
+        spool_dir = await run_in_threadpool(spool.create, "upload", expected)
+    except SpoolFullError as e:
+        raise HTTPException(status_code=507, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    try:
+        upload = await spool_upload(request, spool_dir, filename)
+        # ffprobe is a blocking subprocess; keep it off the event loop
+        estimate = await run_in_threadpool(_admit_file, upload["path"])
+    except UploadError as e:
+        await run_in_threadpool(spool.release, spool_dir)
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except BaseException:
+        await run_in_threadpool(spool.release, spool_dir)
+        raise
+
+    # Content-addressed, so re-uploading the same recording updates one result
+    info = {
+        "id": f"u-{upload['sha1'][:14]}",
+        "title": upload["filename"],
+        "duration": estimate["duration_seconds"],
+        "channel": "upload",
+        "channel_id": "upload",
+    }
+    return await _run_file_job(upload["path"], info, estimate, fields, cleanup_dir=spool_dir)
+
+
+@app.post("/analyze/local")
+async def analyze_local(
+    request: LocalFileRequest,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+):
+    try:
+        path = await run_in_threadpool(resolve_ingest_path, request.path)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    estimate = await run_in_threadpool(_admit_file, path)
+    info = await run_in_threadpool(local_file_info, path)
+    info["duration"] = estimate["duration_seconds"]
+    return await _run_file_job(path, info, estimate, fields)
+
+
+@app.get("/transcript/{video_id}")
+def read_transcript(
+    video_id: str,
+    offset: int = Query(0, ge=0, description="First segment index"),
+    limit: int = Query(200, ge=1),
+    start: Optional[float] = Query(None, description="Only segments ending after this time (s)"),
+    end: Optional[float] = Query(None, description="Only segments starting before this time (s)"),
+):
+    page = get_transcript_page(video_id, offset, limit, start, end)
+    if page is None:
+        raise HTTPException(status_code=404, detail="No stored transcript for this video")
+    return page
+
+
+@app.post("/api/chat")
+def chat(request: ChatRequest):
+    """Answer a question about an analyzed video from its indexed transcript."""
+    if not request.video_id:
+        raise HTTPException(status_code=400, detail="video_id is required")
+    question = next((m.content for m in reversed(request.messages) if m.role == "user"), "")
+    if not question.strip():
+        raise HTTPException(status_code=400, detail="No user question in messages")
+
+    reply = answer(request.video_id, question)
+    if reply is None:
+        raise HTTPException(status_code=404, detail="No analyzed transcript for this video")
+    return reply
+
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    artifacts = list_artifacts(profile_id)
+    if artifacts is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {
+        "profile_id": profile_id,
+        "artifacts": {name: f"/profiles/{profile_id}/{name}" for name in artifacts},
+    }
+
+
+@app.get("/profiles/{profile_id}/{artifact}")
+def get_profile_artifact(profile_id: str, artifact: str, x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    path = artifact_path(profile_id, artifact)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path, filename=artifact)
+
+
+@app.post("/rescore/what-if")
+def rescore_what_if(request: WhatIfRequest):
+    if request.kind not in ("risk", "hype"):
+        raise HTTPException(status_code=400, detail="kind must be 'risk' or 'hype'")
+    try:
+        return what_if(load_features(), request.candidate, request.base, request.kind)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid scoring config: {e}")
+
+
+@app.get("/results")
+def list_results(
+    channel: Optional[str] = None,
+    channel_id: Optional[str] = None,
+    level: Optional[str] = Query(None, description="HIGH, MEDIUM or LOW"),
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    uploaded_after: Optional[str] = Query(None, description="YYYY-MM-DD or YYYYMMDD"),
+    uploaded_before: Optional[str] = Query(None, description="YYYY-MM-DD or YYYYMMDD"),
+    sort: str = "upload_date",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+):
+    try:
+        return query_results(
+            channel=channel, channel_id=channel_id, level=level,
+            min_score=min_score, max_score=max_score,
+            uploaded_after=uploaded_after, uploaded_before=uploaded_before,
+            sort=sort, limit=limit, cursor=cursor, fields=_parse_fields(fields),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/results/{video_id}")
+def read_result(video_id: str, fields: Optional[str] = None):
+    result = get_result(video_id, _parse_fields(fields))
+    if result is None:
+        raise HTTPException(status_code=404, detail="No stored result for this video")
+    return result
+
+
+@app.get("/watch/channels")
+def get_watched_channels():
+    return {"watching": WATCH_CHANNELS, "channels": list_channels()}
+
+
+@app.post("/watch/channels")
+def watch_channel(request: ChannelRequest):
+    return add_channel(request.channel_url, request.interval_seconds, request.min_interval_seconds)
+
+
+@app.delete("/watch/channels")
+def unwatch_channel(channel_url: str):
+    if not remove_channel(channel_url):
+        raise HTTPException(status_code=404, detail="Channel is not being watched")
+    return {"removed": channel_url}
+
+
+@app.post("/watch/channels/poll")
+def poll_watched_channel(request: ChannelRequest):
+    """Poll one channel now (still subject to its minimum interval)."""
+    # A watched channel keeps its own intervals; only an unknown one is added with the request's
+    channel = get_channel(request.channel_url) or add_channel(
+        request.channel_url, request.interval_seconds, request.min_interval_seconds
+    )
+    submitted = poll_channel(channel["channel_url"], _submit_watched)
+    return {"channel_url": channel["channel_url"], "submitted": submitted}
@@ -0,0 +1,169 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from backend.telemetry import span
+
+# ── Metric definitions ────────────────────────────────────────────────────────
+
+# Stages range from sub-millisecond regex passes to hour-long transcriptions
+_STAGE_BUCKETS = (
+    0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600,
+)
+
+STAGE_SECONDS = Histogram(
+    "finfluencer_stage_seconds",
+    "Wall-clock time spent in each pipeline stage or detector",
+    ["stage"],
+    buckets=_STAGE_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "finfluencer_stage_errors",
+    "Exceptions raised by each pipeline stage",
+    ["stage"],
+)
+# Gauge modes only matter under gunicorn, where each worker writes its own values
+JOBS_IN_FLIGHT = Gauge(
+    "finfluencer_jobs_in_flight",
+    "Analysis jobs currently executing",
+    multiprocess_mode="livesum",
+)
+QUEUE_DEPTH = Gauge(
+    "finfluencer_queue_depth",
+    "Analysis jobs admitted but waiting for a worker",
+    multiprocess_mode="livesum",
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "finfluencer_model_load_seconds",
+    "Time taken to load each model into memory",
+    ["model"],
+    multiprocess_mode="max",
+)
+COALESCED_REQUESTS = Counter(
+    "finfluencer_coalesced_requests",
+    "Requests that attached to an identical analysis already in flight",
+)
+FINBERT_CHUNKS = Counter(
+    "finfluencer_finbert_chunks",
+    "FinBERT chunks by outcome (inferred, or near_duplicate when a stored result was reused)",
+    ["outcome"],
+)
+TRANSCRIPT_SOURCE = Counter(
+    "finfluencer_transcripts",
+    "Transcripts produced, by source (captions or whisper)",
+    ["source"],
+)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Time a block (or, as a decorator, a function), count its failures and trace it as a span."""
+    start = time.perf_counter()
+    try:
+        with span(stage):
+            yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+# ── Cache statistics ──────────────────────────────────────────────────────────
+
+_caches = {}
+
+# Multi-worker serving only: each process copies its lru_cache counters here so
+# the per-worker files can be summed at scrape time. Not in REGISTRY, where
+# _CacheCollector reports the same numbers directly.
+_CACHE_LOOKUPS = Gauge(
+    "finfluencer_cache_lookups",
+    "Cache lookups by outcome, per process",
+    ["cache", "outcome"],
+    multiprocess_mode="livesum",
+    registry=None,
+)
+
+
+def register_cache(name: str, cached_fn) -> None:
+    """Expose an lru_cache's hit/miss counters. Read at scrape time, free on the hot path."""
+    _caches[name] = cached_fn
+
+
+def publish_cache_stats() -> None:
+    """Under gunicorn, copy this process's cache counters into its metric files (cheap; a no-op otherwise)."""
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    for name, fn in _caches.items():
+        info = fn.cache_info()
+        _CACHE_LOOKUPS.labels(name, "hit").set(info.hits)
+        _CACHE_LOOKUPS.labels(name, "miss").set(info.misses)
+
+
+def _cache_families(stats: dict) -> tuple:
+    """Hit, miss and hit-ratio families from {cache name: (hits, misses)}."""
+    hits = CounterMetricFamily("finfluencer_cache_hits", "Cache hits", labels=["cache"])
+    misses = CounterMetricFamily("finfluencer_cache_misses", "Cache misses", labels=["cache"])
+    ratio = GaugeMetricFamily("finfluencer_cache_hit_ratio", "Cache hit ratio", labels=["cache"])
+    for name, (hit, miss) in sorted(stats.items()):
+        hits.add_metric([name], hit)
+        misses.add_metric([name], miss)
+        ratio.add_metric([name], hit / (hit + miss) if hit + miss else 0.0)
+    return hits, misses, ratio
+
+
+class _CacheCollector:
+    def collect(self):
+        stats = {}
+        for name, fn in _caches.items():
+            info = fn.cache_info()
+            stats[name] = (info.hits, info.misses)
+        yield from _cache_families(stats)
+
+
+REGISTRY.register(_CacheCollector())
+
+
+class _MultiprocessCollector:
+    """Every worker's metric files, with the per-process cache gauges summed into the usual families."""
+
+    def __init__(self):
+        self._files = multiprocess.MultiProcessCollector(None)
+
+    def collect(self):
+        stats = {}
+        for family in self._files.collect():
+            if family.name != "finfluencer_cache_lookups":
+                yield family
+                continue
+            for sample in family.samples:
+                counts = stats.setdefault(sample.labels["cache"], [0.0, 0.0])
+                counts[sample.labels["outcome"] == "miss"] += sample.value
+        yield from _cache_families(stats)
+
+
+def render_latest() -> tuple:
+    """
+    Body and content type for the /metrics endpoint.
+
+    With PROMETHEUS_MULTIPROC_DIR set (multi-worker serving), values are
+    aggregated across every worker's files instead; cache counters are as of
+    each worker's last request or finished job.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        registry.register(_MultiprocessCollector())
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,124 @@
+"""
+MinHash/LSH index for reusing FinBERT results on near-duplicate chunks.
+
+Sponsor reads, intros and outros repeat across a channel's videos with small
+wording changes, so exact-match caching misses them. A chunk is reduced to
+the set of its word shingles, summarised by a MinHash signature, and banded
+into an LSH table. Candidates from the table are confirmed by their
+estimated Jaccard similarity before a stored result is reused.
+"""
+import os
+import re
+import zlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+SIMILARITY_THRESHOLD = float(os.getenv("MINHASH_THRESHOLD", 0.85))
+NUM_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS", 128))
+# 16 bands of 8 rows surfaces pairs from ~0.7 Jaccard; the threshold above decides
+NUM_BANDS = int(os.getenv("MINHASH_BANDS", 16))
+SHINGLE_WORDS = 3
+MAX_ENTRIES = int(os.getenv("MINHASH_MAX_ENTRIES", 50000))
+
+_PRIME = np.uint64(4294967311)   # smallest prime above 2**32
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def normalize(text: str) -> list:
+    """Lowercased words with punctuation stripped."""
+    return _NON_WORD.sub(" ", text.lower()).split()
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> np.ndarray:
+    """Stable 32-bit hashes of the text's k-word shingles (crc32, so they persist across processes)."""
+    words = normalize(text)
+    if len(words) < k:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = NUM_PERMUTATIONS, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # a*h + b stays below 2**64 for 32-bit h, so uint64 arithmetic never wraps
+        self.a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingles(text)
+        if hashes.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        return ((np.outer(hashes, self.a) + self.b) % _PRIME).min(axis=0)
+
+
+class NearDuplicateIndex:
+    """
+    Bounded LSH table from chunk signatures to stored values.
+
+    lookup() returns the value stored for the most similar chunk at or above
+    the similarity threshold, or None. Oldest entries are evicted first.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, num_perm: int = NUM_PERMUTATIONS,
+                 bands: int = NUM_BANDS, max_entries: int = MAX_ENTRIES):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm)
+        self._entries = OrderedDict()      # entry id → (signature, value)
+        self._buckets = {}                 # (band, band bytes) → set of entry ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def lookup(self, text: str, signature: np.ndarray = None):
+        signature = self.hasher.signature(text) if signature is None else signature
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates |= self._buckets.get(key, set())
+            best, best_similarity = None, self.threshold
+            for entry_id in candidates:
+                stored, value = self._entries[entry_id]
+                similarity = float(np.mean(stored == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = value, similarity
+            return best
+
+    def add(self, text: str, value, signature: np.ndarray = None) -> None:
+        signature = self.hasher.signature(text) if signature is None else signature
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature, value)
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        entry_id, (signature, _) = self._entries.popitem(last=False)
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
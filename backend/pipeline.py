@@ -0,0 +1,231 @@
+import os
+import time
+import base64
+import hashlib
+import logging
+from contextlib import nullcontext
+
+import numpy as np
+
+from backend.utils import download_audio
+from backend.captions import fetch_caption_transcript
+from backend.transcriber import transcribe_audio
+from backend.analyzer import analyze_transcript
+from backend.scorer import calculate_risk_score
+from backend.admission import record_transcription
+from backend.store import TRANSCRIPT_FIELDS, save_chat_index, save_result, save_transcript
+from backend.chat import build_index
+from backend.rescoring import FEATURE_DTYPE, append_feature_record, append_features
+from backend.segments import SegmentTable, as_table
+from backend.profiling import ProfileSession
+from backend.metrics import JOBS_IN_FLIGHT, TRANSCRIPT_SOURCE, track_stage
+from backend.telemetry import set_span_attributes, span
+from backend.spool import estimate_download_bytes, spool
+
+logger = logging.getLogger(__name__)
+
+# Characters of transcript inlined in every result; the rest is paged from /transcript
+TRANSCRIPT_PREVIEW_CHARS = 300
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def local_file_info(path: str) -> dict:
+    """
+    Metadata stand-in for audio that did not come from YouTube.
+
+    The ID hashes the absolute path, size and mtime, so re-ingesting an
+    unchanged file updates the same stored result.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    digest = hashlib.sha1(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+    return {
+        "id": f"f-{digest[:14]}",
+        "title": os.path.basename(path),
+        "duration": 0,
+        "channel": "local",
+        "channel_id": "local",
+    }
+
+
+def _transcribe_file(audio_path: str, duration: float) -> dict:
+    logger.info("Transcribing...")
+    started = time.perf_counter()
+    with track_stage("transcribe"):
+        transcript = transcribe_audio(audio_path)
+        set_span_attributes(audio_duration=duration or 0, word_count=len(transcript["text"].split()),
+                            language=transcript["language"] or "")
+    if not duration:
+        duration = transcript["segments"].duration
+    record_transcription(duration, time.perf_counter() - started)
+    return transcript
+
+
+def _preview_spans(spans: list, limit: int) -> list:
+    """Highlight spans that fall in the first `limit` characters, clipped to it."""
+    return [[start, min(end, limit), kind] for start, end, kind in spans if start < limit]
+
+
+def _no_progress(stage: str) -> None:
+    pass
+
+
+def _analyze_and_store(info: dict, transcript: dict, title: str, duration: float, estimate: dict,
+                       progress=_no_progress, artifacts: dict = None) -> dict:
+    TRANSCRIPT_SOURCE.labels(transcript["source"]).inc()
+    save_transcript(info["id"], transcript)
+    chat_index = build_index(transcript["segments"])
+    save_chat_index(info["id"], chat_index)
+    words = len(transcript['text'].split())
+    logger.info(f"Words: {words} (source: {transcript['source']})",
+                extra={"video_id": info["id"], "word_count": words, "transcript_source": transcript["source"]})
+
+    logger.info("Analyzing...")
+    progress("analyze")
+    with track_stage("analyze"):
+        set_span_attributes(word_count=words)
+        analysis = analyze_transcript(transcript["text"])
+
+    logger.info("Scoring...")
+    progress("scoring")
+    with track_stage("scoring"):
+        score = calculate_risk_score(analysis)
+        set_span_attributes(risk_score=score["risk_score"], risk_label=score["risk_label"])
+    logger.info(f"Score: {score['risk_score']}/10", extra={"video_id": info["id"], "risk_score": score["risk_score"]})
+
+    features = append_features(info.get("id"), analysis)
+    if artifacts is not None:
+        artifacts.update(transcript=transcript, chat_index=chat_index, features=features)
+
+    result = {
+        "success": True,
+        "video_id": info["id"],
+        "video_title": title,
+        "duration_seconds": duration,
+        "estimated_seconds": (estimate or {}).get("estimated_seconds"),
+        "language": transcript["language"],
+        "transcript_source": transcript["source"],
+        "transcript_preview": transcript["text"][:TRANSCRIPT_PREVIEW_CHARS],
+        "full_transcript": transcript["text"],        # ← added
+        "transcript_url": f"/transcript/{info['id']}",
+        "risk_score": score["risk_score"],
+        "risk_label": score["risk_label"],
+        "reasons": score["reasons"],
+        "hype_keywords_found": analysis["hype_analysis"]["found_keywords"],
+        "disclaimer_found": analysis["disclaimer_analysis"]["has_disclaimer"],
+        "found_disclaimers": analysis["disclaimer_analysis"]["found_disclaimers"],
+        # [start, end, kind] offsets, for the preview only: a long transcript has thousands
+        "highlights": _preview_spans(analysis["highlights"], TRANSCRIPT_PREVIEW_CHARS),
+        "word_count": analysis["transcript_length"],
+        "finbert_sentiment": score.get("finbert_sentiment", "neutral"),
+        "finbert_confidence": score.get("finbert_confidence", 0.0),
+        "finbert_skipped_chunks": analysis["finbert_analysis"].get("skipped_chunks", 0),
+    }
+    save_result(info, result)
+    return result
+
+
+# ── Results from other hosts ──────────────────────────────────────────────────
+
+STORED_INFO_KEYS = ("id", "title", "channel", "channel_id", "uploader", "upload_date")
+
+
+def pack_outcome(info: dict, result: dict, artifacts: dict) -> dict:
+    """
+    A queue worker's result plus everything the pipeline stored on the
+    worker's host (transcript, chat index, feature row), as JSON, so the API
+    host can store the same with save_outcome().
+    """
+    transcript = artifacts["transcript"]
+    table = as_table(transcript["segments"])
+    return {
+        "info": {k: info.get(k) for k in STORED_INFO_KEYS},
+        "result": {k: v for k, v in result.items() if k not in TRANSCRIPT_FIELDS},
+        "transcript": {
+            "language": transcript["language"],
+            "source": transcript["source"],
+            "segments": base64.b64encode(table.to_bytes()).decode("ascii"),
+        },
+        "chat_index": artifacts["chat_index"],
+        "features": base64.b64encode(artifacts["features"].tobytes()).decode("ascii"),
+    }
+
+
+def save_outcome(outcome: dict) -> None:
+    """Store a pack_outcome() here; the result goes last, once its transcript is readable."""
+    info = outcome["info"]
+    transcript = outcome.get("transcript")
+    if transcript:
+        segments = SegmentTable.from_bytes(base64.b64decode(transcript["segments"]))
+        save_transcript(info["id"], {**transcript, "segments": segments})
+    if outcome.get("chat_index") is not None:
+        save_chat_index(info["id"], outcome["chat_index"])
+    if outcome.get("features"):
+        append_feature_record(np.frombuffer(base64.b64decode(outcome["features"]), dtype=FEATURE_DTYPE))
+    save_result(info, outcome["result"])
+
+
+# ── Entry points ──────────────────────────────────────────────────────────────
+
+def analyze_url(url: str, info: dict, estimate: dict = None, progress=_no_progress, artifacts: dict = None) -> dict:
+    """
+    Analyze a YouTube video whose metadata has already been fetched.
+
+    progress(stage) is called as each user-visible stage begins. If given,
+    `artifacts` is filled with the transcript, chat index and feature row
+    that were stored alongside the result.
+    """
+    title = info.get('title', 'Unknown Title')
+    duration = info.get('duration', 0)
+    JOBS_IN_FLIGHT.inc()
+
+    try:
+        with span("pipeline", video_id=info.get("id") or "", url=url):
+            progress("captions")
+            with track_stage("captions"):
+                transcript = fetch_caption_transcript(info)
+            if transcript is None:
+                logger.info(f"Downloading: {url}", extra={"video_id": info.get("id")})
+                progress("download")
+                # The source stream, .part files and the converted MP3 all go with the directory
+                with spool.job("download", estimate_download_bytes(duration)) as job_dir:
+                    with track_stage("download"):
+                        audio_path, title, duration = download_audio(url, job_dir)
+                        set_span_attributes(audio_duration=duration or 0, audio_bytes=os.path.getsize(audio_path))
+                    logger.info(f"Downloaded: {title}", extra={"video_id": info.get("id"), "audio_duration": duration})
+                    progress("transcribe")
+                    transcript = _transcribe_file(audio_path, duration)
+
+            return _analyze_and_store(info, transcript, title, duration, estimate, progress, artifacts)
+
+    finally:
+        JOBS_IN_FLIGHT.dec()
+
+
+def analyze_file(audio_path: str, info: dict = None, estimate: dict = None, progress=_no_progress) -> dict:
+    """Analyze an audio file already on disk. The file is left in place."""
+    info = info or local_file_info(audio_path)
+    JOBS_IN_FLIGHT.inc()
+
+    try:
+        with span("pipeline", video_id=info.get("id") or "", path=audio_path):
+            progress("transcribe")
+            transcript = _transcribe_file(audio_path, info.get("duration"))
+            duration = info.get("duration") or transcript["segments"].duration
+            return _analyze_and_store(info, transcript, info.get("title"), duration, estimate, progress)
+
+    finally:
+        JOBS_IN_FLIGHT.dec()
+
+
+def run_profiled(fn, *args, profile: bool = False, **kwargs) -> dict:
+    """Run a pipeline entry point, optionally under a ProfileSession."""
+    profiler = ProfileSession() if profile else nullcontext()
+    with profiler:
+        result = fn(*args, **kwargs)
+
+    if profile:
+        result["profile_id"] = profiler.id
+        result["profile_url"] = f"/profiles/{profiler.id}"
+    return result
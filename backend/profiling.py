@@ -0,0 +1,156 @@
+import os
+import re
+import uuid
+import pstats
+import logging
+import cProfile
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "finfluencer-profiles"))
+
+# Collapsed-stack reconstruction limits
+MAX_STACK_DEPTH = 64
+MIN_STACK_MICROSECONDS = 1
+
+_PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+# The session active on the current pipeline thread, if any
+_local = threading.local()
+# cProfile can't run two sessions in one process, so only one profiled run at a time
+_exclusive = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised by exclusive_profile() when another profiled run holds the profiler."""
+
+
+# ── cProfile → collapsed stacks ───────────────────────────────────────────────
+
+def _label(func: tuple) -> str:
+    filename, line, name = func
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> list:
+    """
+    Approximate flamegraph input from cProfile's caller graph.
+
+    cProfile only records caller→callee edges, so each function's own time is
+    spread over its callers in proportion to the time they spent calling it.
+    Output lines are "root;...;leaf <microseconds>".
+    """
+    raw = stats.stats
+    out = Counter()
+
+    def walk(func, path, weight, seen):
+        callers = raw.get(func, (0, 0, 0, 0, {}))[4]
+        parents = [(c, edge) for c, edge in callers.items() if c in raw and c not in seen]
+        if not parents or len(path) >= MAX_STACK_DEPTH:
+            out[';'.join(reversed(path))] += weight
+            return
+        total = sum(edge[3] for _, edge in parents) or 1
+        for caller, edge in parents:
+            share = weight * edge[3] / total
+            if share >= MIN_STACK_MICROSECONDS:
+                walk(caller, path + [_label(caller)], share, seen | {caller})
+
+    for func, (_, _, tottime, _, _) in raw.items():
+        weight = tottime * 1e6
+        if weight >= MIN_STACK_MICROSECONDS:
+            walk(func, [_label(func)], weight, {func})
+
+    return [f"{stack} {int(us)}" for stack, us in out.most_common() if int(us) > 0]
+
+
+# ── Sessions ──────────────────────────────────────────────────────────────────
+
+@contextmanager
+def exclusive_profile():
+    """Hold the process's one profiling slot for the block, or raise ProfilerBusyError at once."""
+    if not _exclusive.acquire(blocking=False):
+        raise ProfilerBusyError("Another profiled run is in progress; retry when it finishes")
+    try:
+        yield
+    finally:
+        _exclusive.release()
+
+
+class ProfileSession:
+    """
+    Profile one pipeline run on the current thread.
+
+    Writes <id>.pstats and <id>.collapsed under PROFILE_DIR, plus one
+    torch profiler stack file per Whisper/FinBERT call made during the run.
+    Sessions must not overlap; hold exclusive_profile() around the run.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.dir = os.path.join(PROFILE_DIR, self.id)
+        self._profiler = cProfile.Profile()
+        self._torch_calls = Counter()
+
+    def __enter__(self):
+        os.makedirs(self.dir, exist_ok=True)
+        _local.session = self
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.disable()
+        _local.session = None
+
+        stats = pstats.Stats(self._profiler)
+        stats.dump_stats(os.path.join(self.dir, 'pipeline.pstats'))
+        with open(os.path.join(self.dir, 'pipeline.collapsed'), 'w') as f:
+            f.write('\n'.join(collapsed_stacks(stats)) + '\n')
+        logger.info(f"Profile {self.id} written to {self.dir}")
+        return False
+
+    def torch_artifact(self, name: str) -> str:
+        self._torch_calls[name] += 1
+        return os.path.join(self.dir, f"torch-{name}-{self._torch_calls[name]}")
+
+
+@contextmanager
+def torch_profiled(name: str):
+    """Run a model call under the torch profiler, but only inside a ProfileSession."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        yield
+        return
+
+    from torch.profiler import ProfilerActivity, profile
+    with profile(activities=[ProfilerActivity.CPU], with_stack=True, record_shapes=True) as prof:
+        yield
+
+    base = session.torch_artifact(name)
+    prof.export_stacks(f"{base}.collapsed", "self_cpu_time_total")
+    with open(f"{base}.txt", 'w') as f:
+        f.write(prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=50))
+
+
+# ── Artifact lookup ───────────────────────────────────────────────────────────
+
+def list_artifacts(profile_id: str) -> list:
+    """Artifact file names for a profile, or None if the ID is unknown."""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id)
+    if not os.path.isdir(path):
+        return None
+    return sorted(os.listdir(path))
+
+
+def artifact_path(profile_id: str, name: str) -> str:
+    artifacts = list_artifacts(profile_id) or []
+    if name not in artifacts:
+        return None
+    return os.path.join(PROFILE_DIR, profile_id, name)
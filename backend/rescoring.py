@@ -0,0 +1,197 @@
+import os
+import logging
+import threading
+
+import numpy as np
+
+from backend.analyzer import HYPE_SCORE_CONFIG
+from backend.scorer import RISK_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# ── Feature storage ───────────────────────────────────────────────────────────
+
+FEATURES_PATH = os.getenv(
+    "FEATURES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'features.bin')
+)
+
+# One fixed-width record per analysis. Appends are a single write and loading
+# is one np.fromfile, so the corpus never goes through JSON or Python dicts.
+FEATURE_DTYPE = np.dtype([
+    ("video_id", "S32"),
+    ("unique_hype", "i4"),
+    ("total_hype", "i4"),
+    ("has_disclaimer", "?"),
+    ("exaggerations", "i4"),
+    ("positive_ratio", "f8"),
+    ("negative_ratio", "f8"),
+    ("neutral_ratio", "f8"),
+])
+VIDEO_ID_BYTES = FEATURE_DTYPE["video_id"].itemsize
+
+_write_lock = threading.Lock()
+
+
+def extract_features(video_id: str, analysis: dict) -> np.ndarray:
+    """Flatten the scoring inputs of one analyze_transcript() result into a record."""
+    finbert = analysis["finbert_analysis"]
+    total_chunks = finbert.get("total_chunks") or 0
+    encoded = (video_id or '').encode()
+    if len(encoded) > VIDEO_ID_BYTES:
+        # A truncated ID would silently merge with other videos in load_features()
+        raise ValueError(f"Video ID {video_id!r} is longer than {VIDEO_ID_BYTES} bytes")
+    record = np.zeros(1, dtype=FEATURE_DTYPE)
+    record["video_id"] = encoded
+    record["unique_hype"] = analysis["hype_analysis"]["unique_matches"]
+    record["total_hype"] = analysis["hype_analysis"]["total_matches"]
+    record["has_disclaimer"] = analysis["disclaimer_analysis"]["has_disclaimer"]
+    record["exaggerations"] = analysis["exaggeration_analysis"]["total_exaggerations"]
+    record["positive_ratio"] = finbert["positive_ratio"]
+    record["negative_ratio"] = finbert.get("negative_chunks", 0) / total_chunks if total_chunks else 0.0
+    record["neutral_ratio"] = finbert.get("neutral_chunks", 0) / total_chunks if total_chunks else 0.0
+    return record
+
+
+def append_features(video_id: str, analysis: dict, path: str = FEATURES_PATH) -> np.ndarray:
+    record = extract_features(video_id, analysis)
+    append_feature_record(record, path)
+    return record
+
+
+def append_feature_record(record: np.ndarray, path: str = FEATURES_PATH) -> None:
+    """Append already-extracted records (e.g. shipped back by a queue worker)."""
+    with _write_lock, open(path, 'ab') as f:
+        f.write(np.asarray(record, dtype=FEATURE_DTYPE).tobytes())
+
+
+def load_features(path: str = FEATURES_PATH) -> dict:
+    """
+    Load the corpus as contiguous column arrays, keeping the latest record per video.
+    """
+    if not os.path.exists(path):
+        records = np.zeros(0, dtype=FEATURE_DTYPE)
+    else:
+        records = np.fromfile(path, dtype=FEATURE_DTYPE)
+
+    # np.unique keeps the first occurrence, so search the reversed array
+    _, last = np.unique(records["video_id"][::-1], return_index=True)
+    records = records[::-1][np.sort(last)][::-1]
+    return {name: np.ascontiguousarray(records[name]) for name in FEATURE_DTYPE.names}
+
+
+# ── Vectorized scorers ────────────────────────────────────────────────────────
+
+def _tier_points(values: np.ndarray, tiers: list) -> np.ndarray:
+    return np.select([values >= minimum for minimum, _ in tiers], [points for _, points in tiers], default=0)
+
+
+def _label_index(scores: np.ndarray, labels: list) -> np.ndarray:
+    """Index into labels for each score; len(labels) means the default label."""
+    return np.select([scores >= minimum for minimum, _ in labels], list(range(len(labels))), default=len(labels))
+
+
+def score_risk(features: dict, config: dict = RISK_CONFIG) -> tuple:
+    """
+    Vectorized calculate_risk_score over a feature table.
+
+    Returns (scores, label indices, label names); index i means names[i].
+    """
+    score = (
+        _tier_points(features["unique_hype"], config["hype_tiers"])
+        + np.where(features["has_disclaimer"], 0, config["missing_disclaimer_points"])
+        + _tier_points(features["exaggerations"], config["exaggeration_tiers"])
+        + _tier_points(features["positive_ratio"], config["positive_ratio_tiers"])
+    )
+    score = np.minimum(np.round(score, 1), config["max_score"])
+
+    names = [name for _, name in config["labels"]] + [config["default_label"]]
+    return score, _label_index(score, config["labels"]), names
+
+
+def score_hype(features: dict, config: dict = HYPE_SCORE_CONFIG) -> tuple:
+    """
+    Vectorized compute_hype_score over a feature table.
+
+    Returns (scores, level indices, level names); index i means names[i].
+    """
+    score = (
+        np.minimum(features["total_hype"] * config["keyword_points"], config["keyword_cap"])
+        + np.where(features["has_disclaimer"], 0, config["missing_disclaimer_points"])
+        + np.minimum(features["exaggerations"] * config["exaggeration_points"], config["exaggeration_cap"])
+        + np.round(features["positive_ratio"] * config["finbert_positive_points"], 2)
+    )
+    score = np.round(np.minimum(score, config["max_score"]), 2)
+
+    names = [name for _, name in config["levels"]] + [config["default_level"]]
+    return score, _label_index(score, config["levels"]), names
+
+
+SCORERS = {
+    "risk": (score_risk, RISK_CONFIG),
+    "hype": (score_hype, HYPE_SCORE_CONFIG),
+}
+
+
+# ── What-if analysis ──────────────────────────────────────────────────────────
+
+def merge_config(base: dict, overrides: dict) -> dict:
+    """Overlay overrides on a config; JSON lists of pairs become tier tuples."""
+    unknown = set(overrides) - set(base)
+    if unknown:
+        raise ValueError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, list):
+            value = sorted((tuple(pair) for pair in value), key=lambda pair: pair[0], reverse=True)
+        merged[key] = value
+    return merged
+
+
+def _distribution(index: np.ndarray, names: list) -> dict:
+    counts = np.bincount(index, minlength=len(names))
+    dist = {}
+    for name, count in zip(names, counts):
+        dist[name] = dist.get(name, 0) + int(count)
+    return dist
+
+
+def what_if(features: dict, candidate: dict, base: dict = None, kind: str = "risk") -> dict:
+    """
+    Score the whole corpus under two configs and report how the labels move.
+    """
+    scorer, default = SCORERS[kind]
+    base_config = merge_config(default, base or {})
+    candidate_config = merge_config(default, candidate)
+
+    base_scores, base_idx, base_names = scorer(features, base_config)
+    cand_scores, cand_idx, cand_names = scorer(features, candidate_config)
+
+    base_dist = _distribution(base_idx, base_names)
+    cand_dist = _distribution(cand_idx, cand_names)
+    all_labels = sorted(set(base_dist) | set(cand_dist))
+
+    # Count (base, candidate) label pairs in one pass
+    pair_counts = np.bincount(
+        base_idx * len(cand_names) + cand_idx, minlength=len(base_names) * len(cand_names)
+    ).reshape(len(base_names), len(cand_names))
+    transitions = {}
+    changed = 0
+    for i, src in enumerate(base_names):
+        for j, dst in enumerate(cand_names):
+            count = int(pair_counts[i, j])
+            if src != dst and count:
+                bucket = transitions.setdefault(src, {})
+                bucket[dst] = bucket.get(dst, 0) + count
+                changed += count
+
+    return {
+        "kind": kind,
+        "rows": int(len(base_idx)),
+        "changed": changed,
+        "mean_score_delta": float((cand_scores - base_scores).mean()) if len(base_scores) else 0.0,
+        "base_distribution": base_dist,
+        "candidate_distribution": cand_dist,
+        "delta": {label: cand_dist.get(label, 0) - base_dist.get(label, 0) for label in all_labels},
+        "transitions": transitions,
+    }
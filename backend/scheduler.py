@@ -0,0 +1,101 @@
+import os
+import math
+import heapq
+import logging
+import itertools
+import threading
+import contextvars
+from concurrent.futures import Future
+
+from backend.metrics import QUEUE_DEPTH, publish_cache_stats
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "1"))
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "16"))
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when the queue is at capacity."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+
+class JobScheduler:
+    """
+    Bounded shortest-job-first executor.
+
+    Jobs are ordered by their estimated cost so a 2-minute clip never waits
+    behind a 3-hour podcast. Ties keep submission order.
+    """
+
+    def __init__(self, workers: int = PIPELINE_WORKERS, max_queued: int = MAX_QUEUED_JOBS):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._queued_cost = 0.0
+        self._running_cost = 0.0
+        self._threads = []
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._heap)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, for the Retry-After header."""
+        backlog = self._queued_cost + self._running_cost
+        return max(1, math.ceil(backlog / self.workers))
+
+    def submit(self, cost: float, fn, *args, **kwargs) -> Future:
+        future = Future()
+        with self._cond:
+            if len(self._heap) >= self.max_queued:
+                raise QueueFullError(self.retry_after())
+            # The job runs in the submitter's context, keeping its correlation ID and trace
+            context = contextvars.copy_context()
+            heapq.heappush(self._heap, (cost, next(self._seq), future, context.run, (fn, *args), kwargs))
+            self._queued_cost += cost
+            QUEUE_DEPTH.set(len(self._heap))
+            self._ensure_workers()
+            self._cond.notify()
+        return future
+
+    def _ensure_workers(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"pipeline-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                cost, _, future, fn, args, kwargs = heapq.heappop(self._heap)
+                self._queued_cost -= cost
+                self._running_cost += cost
+                QUEUE_DEPTH.set(len(self._heap))
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running_cost -= cost
+                publish_cache_stats()
+
+
+scheduler = JobScheduler()
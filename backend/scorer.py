@@ -1,4 +1,27 @@
-def calculate_risk_score(analysis: dict) -> dict:
+# ── Config ────────────────────────────────────────────────────────────────────
+
+# Tiers are (minimum value, points), highest first. The vectorized re-scorer in
+# backend/rescoring.py reads the same structure, so edit weights here only.
+RISK_CONFIG = {
+    "hype_tiers": [(6, 3), (3, 2), (1, 1)],
+    "missing_disclaimer_points": 2,
+    "exaggeration_tiers": [(3, 2), (1, 1)],
+    "positive_ratio_tiers": [(0.7, 3), (0.5, 2), (0.3, 1)],
+    "max_score": 10,
+    "labels": [(7, "🔴 HIGH RISK"), (4, "🟡 MEDIUM RISK")],
+    "default_label": "🟢 LOW RISK",
+}
+
+
+def _tier(value, tiers: list) -> tuple:
+    """Return (tier index, points) of the first tier the value reaches, or (None, 0)."""
+    for i, (minimum, points) in enumerate(tiers):
+        if value >= minimum:
+            return i, points
+    return None, 0
+
+
+def calculate_risk_score(analysis: dict, config: dict = RISK_CONFIG) -> dict:
     score = 0
     reasons = []
 
@@ -9,30 +32,29 @@ def calculate_risk_score(analysis: dict) -> dict:
 
     # Rule 1: Hype keywords (max 3 points)
     unique_hype = hype["unique_matches"]
-    if unique_hype >= 6:
-        score += 3
+    tier, points = _tier(unique_hype, config["hype_tiers"])
+    score += points
+    if tier == 0:
         reasons.append(f"🚨 {unique_hype} hype keywords detected")
-    elif unique_hype >= 3:
-        score += 2
+    elif tier == 1:
         reasons.append(f"⚠️ {unique_hype} hype keywords detected")
-    elif unique_hype >= 1:
-        score += 1
+    elif tier is not None:
         reasons.append(f"📌 {unique_hype} hype keyword(s) detected")
 
     # Rule 2: Missing disclaimer (2 points)
     if disclaimer["missing_disclaimer"]:
-        score += 2
+        score += config["missing_disclaimer_points"]
         reasons.append("🚨 No financial disclaimer found")
     else:
         reasons.append("✅ Disclaimer present")
 
     # Rule 3: Exaggerated claims (max 2 points)
     exag_count = exaggeration["total_exaggerations"]
-    if exag_count >= 3:
-        score += 2
+    tier, points = _tier(exag_count, config["exaggeration_tiers"])
+    score += points
+    if tier == 0:
         reasons.append(f"🚨 {exag_count} exaggerated claims detected")
-    elif exag_count >= 1:
-        score += 1
+    elif tier is not None:
         reasons.append(f"⚠️ {exag_count} exaggerated claim(s) detected")
 
     # Rule 4: FinBERT sentiment (max 3 points)
@@ -40,26 +62,20 @@ def calculate_risk_score(analysis: dict) -> dict:
     sentiment = finbert["sentiment"]
     confidence = finbert["confidence"]
 
-    if positive_ratio >= 0.7:
-        score += 3
+    tier, points = _tier(positive_ratio, config["positive_ratio_tiers"])
+    score += points
+    if tier == 0:
         reasons.append(f"🚨 FinBERT: Overwhelmingly positive sentiment ({int(positive_ratio*100)}%) — potential hype")
-    elif positive_ratio >= 0.5:
-        score += 2
+    elif tier == 1:
         reasons.append(f"⚠️ FinBERT: High positive sentiment ({int(positive_ratio*100)}%) — overconfident tone")
-    elif positive_ratio >= 0.3:
-        score += 1
+    elif tier is not None:
         reasons.append(f"📌 FinBERT: Moderately positive sentiment ({int(positive_ratio*100)}%)")
     else:
         reasons.append(f"✅ FinBERT: Balanced sentiment ({sentiment}, {int(confidence*100)}% confidence)")
 
-    score = min(round(score, 1), 10)
+    score = min(round(score, 1), config["max_score"])
 
-    if score >= 7:
-        label = "🔴 HIGH RISK"
-    elif score >= 4:
-        label = "🟡 MEDIUM RISK"
-    else:
-        label = "🟢 LOW RISK"
+    label = next((name for minimum, name in config["labels"] if score >= minimum), config["default_label"])
 
     return {
         "risk_score": score,
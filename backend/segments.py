@@ -0,0 +1,261 @@
+"""
+Struct-of-arrays container for transcript segments.
+
+Whisper returns one dict per segment (token lists, log-probs, compression
+ratios); a long video is tens of thousands of them. SegmentTable keeps the
+same data as a handful of NumPy arrays and one text buffer:
+
+    start, end                       float64 seconds, in time order
+    avg_logprob, no_speech_prob,     float32; NaN where the source has none
+    compression_ratio                (captions)
+    text, text_offsets               segment i is text[text_offsets[i]:text_offsets[i + 1]]
+    tokens, token_offsets            optional, same layout
+
+Slicing by index or time range returns views over the same buffers, and
+to_bytes()/from_bytes() is a flat binary format that loads without any
+per-segment parsing.
+"""
+import struct
+import operator
+import itertools
+
+import numpy as np
+
+SCORE_FIELDS = ("avg_logprob", "no_speech_prob", "compression_ratio")
+
+# magic, version, flags, reserved, segments, text bytes, tokens
+_HEADER = struct.Struct("<4sBBHQQQ")
+_MAGIC = b"SEGT"
+_VERSION = 1
+_HAS_TOKENS = 0x1
+
+
+def _cumulative(lengths) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+class SegmentTable:
+    __slots__ = ("start", "end", "avg_logprob", "no_speech_prob", "compression_ratio",
+                 "text", "text_offsets", "tokens", "token_offsets")
+
+    def __init__(self, start, end, text: str, text_offsets, avg_logprob=None, no_speech_prob=None,
+                 compression_ratio=None, tokens=None, token_offsets=None):
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        n = len(self.start)
+        for name, values in zip(SCORE_FIELDS, (avg_logprob, no_speech_prob, compression_ratio)):
+            setattr(self, name, np.full(n, np.nan, dtype=np.float32) if values is None
+                    else np.asarray(values, dtype=np.float32))
+        # Offsets are absolute positions in the (possibly shared) buffers, so views need no copying
+        self.text = text
+        self.text_offsets = np.asarray(text_offsets, dtype=np.int64)
+        self.tokens = None if tokens is None else np.asarray(tokens, dtype=np.int32)
+        self.token_offsets = None if token_offsets is None else np.asarray(token_offsets, dtype=np.int64)
+
+    # ── Construction ──────────────────────────────────────────────────────────
+
+    @classmethod
+    def empty(cls) -> "SegmentTable":
+        return cls(np.zeros(0), np.zeros(0), "", np.zeros(1, dtype=np.int64))
+
+    @classmethod
+    def from_segments(cls, segments: list, offset: float = 0.0, keep_tokens: bool = False) -> "SegmentTable":
+        """Build from Whisper- or caption-style dicts, shifting times by `offset` seconds."""
+        n = len(segments)
+        texts = [seg.get("text", "").strip() for seg in segments]
+        start = np.fromiter((seg["start"] for seg in segments), dtype=np.float64, count=n) + offset
+        end = np.fromiter((seg["end"] for seg in segments), dtype=np.float64, count=n) + offset
+        scores = {
+            name: np.fromiter((seg.get(name, np.nan) for seg in segments), dtype=np.float32, count=n)
+            for name in SCORE_FIELDS
+        }
+        tokens = token_offsets = None
+        if keep_tokens:
+            token_lists = [seg.get("tokens") or () for seg in segments]
+            token_offsets = _cumulative([len(t) for t in token_lists])
+            tokens = np.fromiter(itertools.chain.from_iterable(token_lists), dtype=np.int32,
+                                 count=int(token_offsets[-1]))
+        return cls(start, end, "".join(texts), _cumulative([len(t) for t in texts]),
+                   tokens=tokens, token_offsets=token_offsets, **scores)
+
+    @classmethod
+    def concat(cls, tables: list) -> "SegmentTable":
+        """Join tables end to end (e.g. one per audio window) into a new compact table."""
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls.empty()
+        compact = [t.compact() for t in tables]
+        text_offsets = _concat_offsets([t.text_offsets for t in compact])
+        tokens = token_offsets = None
+        if all(t.tokens is not None for t in compact):
+            tokens = np.concatenate([t.tokens for t in compact])
+            token_offsets = _concat_offsets([t.token_offsets for t in compact])
+        return cls(
+            np.concatenate([t.start for t in compact]),
+            np.concatenate([t.end for t in compact]),
+            "".join(t.text for t in compact),
+            text_offsets,
+            tokens=tokens,
+            token_offsets=token_offsets,
+            **{name: np.concatenate([getattr(t, name) for t in compact]) for name in SCORE_FIELDS},
+        )
+
+    # ── Access ────────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __iter__(self):
+        return (self.segment(i) for i in range(len(self)))
+
+    def __getitem__(self, key):
+        """table[i] is one segment as a dict; table[i:j] is a zero-copy view."""
+        if isinstance(key, slice):
+            i, j, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("SegmentTable slices must be contiguous")
+            return self._view(i, max(i, j))
+        i = operator.index(key)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("segment index out of range")
+        return self.segment(i)
+
+    def _view(self, i: int, j: int) -> "SegmentTable":
+        view = SegmentTable.__new__(SegmentTable)
+        view.start, view.end = self.start[i:j], self.end[i:j]
+        for name in SCORE_FIELDS:
+            setattr(view, name, getattr(self, name)[i:j])
+        view.text = self.text
+        view.text_offsets = self.text_offsets[i:j + 1]
+        view.tokens = self.tokens
+        view.token_offsets = None if self.token_offsets is None else self.token_offsets[i:j + 1]
+        return view
+
+    def text_at(self, i: int) -> str:
+        return self.text[self.text_offsets[i]:self.text_offsets[i + 1]]
+
+    def texts(self) -> list:
+        offsets = self.text_offsets.tolist()
+        return [self.text[a:b] for a, b in zip(offsets, offsets[1:])]
+
+    def tokens_at(self, i: int):
+        if self.tokens is None:
+            return None
+        return self.tokens[self.token_offsets[i]:self.token_offsets[i + 1]]
+
+    def segment(self, i: int) -> dict:
+        return {"id": i, "start": float(self.start[i]), "end": float(self.end[i]), "text": self.text_at(i)}
+
+    def to_dicts(self) -> list:
+        """Plain segment dicts (id, start, end, text), e.g. for JSON responses."""
+        return [
+            {"id": i, "start": s, "end": e, "text": t}
+            for i, (s, e, t) in enumerate(zip(self.start.tolist(), self.end.tolist(), self.texts()))
+        ]
+
+    @property
+    def duration(self) -> float:
+        return float(self.end.max()) if len(self) else 0.0
+
+    # ── Time ranges ───────────────────────────────────────────────────────────
+
+    def span(self, start: float = None, end: float = None) -> tuple:
+        """
+        Index range [i, j) of the segments overlapping [start, end).
+
+        Binary searches on start and on the running maximum of end, so
+        overlapping caption cues are handled.
+        """
+        i = 0
+        if start is not None:
+            i = int(np.searchsorted(np.maximum.accumulate(self.end), start, side="right"))
+        j = len(self)
+        if end is not None:
+            j = int(np.searchsorted(self.start, end, side="left"))
+        return i, max(i, j)
+
+    def between(self, start: float = None, end: float = None) -> "SegmentTable":
+        """Zero-copy view of the segments overlapping [start, end)."""
+        i, j = self.span(start, end)
+        return self[i:j]
+
+    # ── Serialization ─────────────────────────────────────────────────────────
+
+    def compact(self) -> "SegmentTable":
+        """A copy whose buffers hold only this table's segments (views share their parent's)."""
+        a, b = int(self.text_offsets[0]), int(self.text_offsets[-1])
+        tokens = token_offsets = None
+        if self.tokens is not None:
+            ta, tb = int(self.token_offsets[0]), int(self.token_offsets[-1])
+            tokens, token_offsets = self.tokens[ta:tb], self.token_offsets - ta
+        return SegmentTable(
+            self.start, self.end, self.text[a:b], self.text_offsets - a,
+            tokens=tokens, token_offsets=token_offsets,
+            **{name: getattr(self, name) for name in SCORE_FIELDS},
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Flat little-endian encoding: header, start, end, text offsets,
+        [token offsets], scores, [tokens], UTF-8 text. Every array starts
+        on a boundary of its item size.
+        """
+        table = self if self.text_offsets[0] == 0 and len(self.text) == self.text_offsets[-1] else self.compact()
+        text = table.text.encode("utf-8")
+        has_tokens = table.tokens is not None
+        token_count = int(table.token_offsets[-1] - table.token_offsets[0]) if has_tokens else 0
+        parts = [
+            _HEADER.pack(_MAGIC, _VERSION, _HAS_TOKENS if has_tokens else 0, 0, len(table), len(text), token_count),
+            table.start.astype("<f8").tobytes(),
+            table.end.astype("<f8").tobytes(),
+            table.text_offsets.astype("<i8").tobytes(),
+        ]
+        if has_tokens:
+            parts.append((table.token_offsets - table.token_offsets[0]).astype("<i8").tobytes())
+        parts.extend(getattr(table, name).astype("<f4").tobytes() for name in SCORE_FIELDS)
+        if has_tokens:
+            start = int(table.token_offsets[0])
+            parts.append(table.tokens[start:start + token_count].astype("<i4").tobytes())
+        parts.append(text)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SegmentTable":
+        """Decode to_bytes() output. The arrays are read-only views over `data`."""
+        magic, version, flags, _, n, text_bytes, token_count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a SegmentTable (bad magic or version)")
+        pos = _HEADER.size
+
+        def take(dtype: str, count: int) -> np.ndarray:
+            nonlocal pos
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=pos)
+            pos += array.nbytes
+            return array
+
+        start, end, text_offsets = take("<f8", n), take("<f8", n), take("<i8", n + 1)
+        token_offsets = take("<i8", n + 1) if flags & _HAS_TOKENS else None
+        scores = {name: take("<f4", n) for name in SCORE_FIELDS}
+        tokens = take("<i4", token_count) if flags & _HAS_TOKENS else None
+        text = bytes(data[pos:pos + text_bytes]).decode("utf-8")
+        return cls(start, end, text, text_offsets, tokens=tokens, token_offsets=token_offsets, **scores)
+
+
+def _concat_offsets(parts: list) -> np.ndarray:
+    """Join per-table offset arrays (each starting at 0) into one running array."""
+    out, base = [np.zeros(1, dtype=np.int64)], 0
+    for offsets in parts:
+        out.append(offsets[1:] + base)
+        base += int(offsets[-1])
+    return np.concatenate(out)
+
+
+def as_table(segments) -> SegmentTable:
+    """Accept a SegmentTable or a list of segment dicts."""
+    if isinstance(segments, SegmentTable):
+        return segments
+    return SegmentTable.from_segments(segments or [])
@@ -0,0 +1,116 @@
+"""
+Preload-then-fork serving.
+
+    gunicorn backend.main:app          # picks up ./gunicorn.conf.py
+
+The gunicorn master imports the app and loads Whisper and FinBERT once, then
+forks the workers. The weights are never written after loading, so the
+workers share the master's pages copy-on-write and N workers cost roughly
+one model's memory. Nothing here runs inference in the master: a warmed-up
+OpenMP thread pool does not survive fork.
+
+With QUEUE_URL set, YouTube analyses run in `python -m backend.worker
+--processes N` instead, which preloads and forks the same way; the gunicorn
+workers then only run uploads, local files and profiled requests.
+"""
+import os
+import gc
+import sys
+import shutil
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+PRELOAD_MODELS = [m for m in os.getenv("PRELOAD_MODELS", "whisper,finbert").split(',') if m]
+
+# Move weights into shared memory (/dev/shm) instead of relying on copy-on-write.
+# Needs a /dev/shm large enough for every model (Docker defaults to 64 MB).
+SHARE_MODEL_MEMORY = os.getenv("SHARE_MODEL_MEMORY", "").lower() in ("1", "true", "yes")
+
+# Intra-op threads per worker; 0 splits the machine's cores evenly across workers
+TORCH_THREADS_PER_WORKER = int(os.getenv("TORCH_THREADS_PER_WORKER", 0))
+
+DEFAULT_METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'prometheus')
+
+
+def _freeze(module) -> None:
+    """Inference-only weights: no grad buffers, nothing that writes to the pages."""
+    module.eval()
+    for param in module.parameters():
+        param.requires_grad_(False)
+    if SHARE_MODEL_MEMORY:
+        module.share_memory()
+
+
+# ── Master ────────────────────────────────────────────────────────────────────
+
+def prepare_metrics_dir() -> str:
+    """
+    Point prometheus_client at a fresh multiprocess directory.
+
+    Must run before anything imports prometheus_client, i.e. from the
+    gunicorn config rather than the app.
+    """
+    path = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", DEFAULT_METRICS_DIR)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def preload_models(names: list = None) -> None:
+    """Load models in the master so forked workers inherit them."""
+    # Keep the collector from touching (and so copying) object headers until frozen
+    gc.disable()
+    names = PRELOAD_MODELS if names is None else names
+
+    if "whisper" in names:
+        from backend.transcriber import get_model
+        _freeze(get_model())
+
+    if "finbert" in names:
+        from backend.analyzer import get_finbert
+        try:
+            _freeze(get_finbert().model)
+        except Exception as e:
+            # Workers fall back to loading it lazily (and will log the same failure)
+            logger.warning(f"FinBERT not preloaded: {e}")
+
+    # Everything allocated so far moves to a permanent generation that worker
+    # collections never scan, so the shared pages stay shared
+    gc.freeze()
+    logger.info(f"Preloaded {', '.join(names) or 'nothing'}; {gc.get_freeze_count()} objects frozen")
+
+
+# ── Workers ───────────────────────────────────────────────────────────────────
+
+def check_worker_count(workers: int) -> None:
+    """
+    Refuse to fork several workers that would each keep their own job state.
+
+    /jobs status, request coalescing and admission only span processes when
+    YouTube analyses go through the shared queue (QUEUE_URL).
+    """
+    if workers > 1 and not os.getenv("QUEUE_URL"):
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={workers} needs QUEUE_URL: without the shared job queue each worker "
+            "would only see its own jobs. Set QUEUE_URL (see backend/jobqueue.py) or run one worker."
+        )
+
+
+def configure_worker(workers: int) -> None:
+    gc.enable()
+    # Uploads and server-local files still use the per-process scheduler; split its cap
+    from backend.scheduler import MAX_QUEUED_JOBS, scheduler
+    scheduler.max_queued = max(1, MAX_QUEUED_JOBS // max(1, workers))
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        threads = TORCH_THREADS_PER_WORKER or max(1, (os.cpu_count() or 1) // max(1, workers))
+        torch.set_num_threads(threads)
+
+
+def worker_exited(pid: int) -> None:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import Future
+
+from backend.metrics import COALESCED_REQUESTS
+
+
+class SingleFlight:
+    """
+    De-duplicate concurrent work by key.
+
+    The first caller for a key runs start(), which must return a Future; any
+    caller arriving with the same key before that Future settles gets the same
+    shared Future instead of starting a second run. Errors raised by start()
+    are delivered through the shared Future too, so every caller sees the same
+    outcome.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def do(self, key, start) -> Future:
+        with self._lock:
+            shared = self._calls.get(key)
+            if shared is not None:
+                COALESCED_REQUESTS.inc()
+                return shared
+            shared = self._calls[key] = Future()
+
+        try:
+            inner = start()
+        except BaseException as e:
+            self._finish(key, shared, exception=e)
+            return shared
+
+        inner.add_done_callback(lambda f: self._finish(key, shared, inner=f))
+        return shared
+
+    def _finish(self, key, shared: Future, inner: Future = None, exception: BaseException = None) -> None:
+        # Forget the key first so a request arriving after completion starts fresh
+        with self._lock:
+            self._calls.pop(key, None)
+
+        if inner is not None:
+            exception = inner.exception()
+        if exception is not None:
+            shared.set_exception(exception)
+        else:
+            shared.set_result(inner.result())
@@ -0,0 +1,211 @@
+"""
+Scratch space for downloaded and uploaded audio.
+
+Every job gets its own directory under SPOOL_ROOT and the whole directory
+is removed when the job ends, so yt-dlp's source stream, .part files and
+FFmpeg's converted output go with it. Point SPOOL_ROOT at a tmpfs (e.g. a
+Docker `tmpfs:` mount) to keep audio I/O off the disk:
+
+    SPOOL_ROOT=/spool               default: <tmp>/finfluencer-spool
+    SPOOL_QUOTA_BYTES=4294967296    what one process may reserve at a time
+    SPOOL_MIN_FREE_BYTES=268435456  free space to leave on the filesystem
+
+Jobs reserve their expected size up front against a running total, and the
+filesystem's free space (which reflects every process sharing the root) is
+checked with one statvfs call. When either limit is hit a job is refused at
+once with SpoolFullError (a 507 with Retry-After) rather than waiting for
+space, so disk pressure never stalls the pipeline.
+
+Directories are named <kind>-<node>-<pid>-<random>, where <node> identifies
+the host, boot and PID namespace. collect_garbage() removes this node's
+directories whose process is gone (a crash or kill -9); PIDs from another
+container or host are never compared. Any directory older than
+SPOOL_MAX_AGE_SECONDS is removed regardless.
+"""
+import os
+import uuid
+import time
+import shutil
+import socket
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+SPOOL_ROOT = os.getenv("SPOOL_ROOT") or os.path.join(tempfile.gettempdir(), "finfluencer-spool")
+SPOOL_QUOTA_BYTES = int(os.getenv("SPOOL_QUOTA_BYTES", 4 * 1024 ** 3))
+SPOOL_MIN_FREE_BYTES = int(os.getenv("SPOOL_MIN_FREE_BYTES", 256 * 1024 ** 2))
+SPOOL_MAX_AGE_SECONDS = int(os.getenv("SPOOL_MAX_AGE_SECONDS", 24 * 3600))
+SPOOL_RETRY_AFTER_SECONDS = 60
+
+# A download briefly holds the source stream and the 128 kbps MP3 it is
+# converted to, so reserve both plus some slack
+DOWNLOAD_BYTES_PER_SECOND = 2 * 16000
+DOWNLOAD_SLACK_BYTES = 8 * 1024 ** 2
+
+
+class SpoolFullError(Exception):
+    """Raised instead of waiting when a job's reservation does not fit."""
+
+    def __init__(self, needed: int, available: int, retry_after: int = SPOOL_RETRY_AFTER_SECONDS):
+        super().__init__(
+            f"Not enough scratch space: need {needed / 1024 ** 2:.1f} MB, "
+            f"{max(0, available) / 1024 ** 2:.1f} MB available"
+        )
+        self.needed = needed
+        self.available = available
+        self.retry_after = retry_after
+
+
+def estimate_download_bytes(duration_seconds: float) -> int:
+    return int((duration_seconds or 0) * DOWNLOAD_BYTES_PER_SECOND) + DOWNLOAD_SLACK_BYTES
+
+
+def _tree_size(path: str) -> int:
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        total += _tree_size(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    pass
+    except FileNotFoundError:
+        pass
+    return total
+
+
+def _node_id() -> str:
+    """Short ID for this host + boot + PID namespace: the scope in which a PID means anything."""
+    parts = [socket.gethostname()]
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            parts.append(f.read().strip())
+        parts.append(os.readlink("/proc/self/ns/pid"))
+    except OSError:
+        pass
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+
+NODE_ID = _node_id()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SpoolManager:
+    def __init__(self, root: str = SPOOL_ROOT, quota_bytes: int = SPOOL_QUOTA_BYTES,
+                 min_free_bytes: int = SPOOL_MIN_FREE_BYTES, max_age_seconds: int = SPOOL_MAX_AGE_SECONDS):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.min_free_bytes = min_free_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._reserved = {}     # live job directory → bytes reserved for it
+        self._reserved_total = 0
+
+    def _job_dirs(self) -> list:
+        try:
+            with os.scandir(self.root) as entries:
+                return [e.path for e in entries if e.is_dir(follow_symlinks=False)]
+        except FileNotFoundError:
+            return []
+
+    # ── Accounting ────────────────────────────────────────────────────────────
+
+    def usage(self) -> int:
+        """Bytes reserved by this process's live job directories."""
+        return self._reserved_total
+
+    def available(self) -> int:
+        os.makedirs(self.root, exist_ok=True)
+        free = shutil.disk_usage(self.root).free - self.min_free_bytes
+        return min(self.quota_bytes - self._reserved_total, free)
+
+    def check(self, nbytes: int) -> None:
+        """Raise SpoolFullError if `nbytes` more would not fit right now."""
+        available = self.available()
+        if nbytes > available:
+            raise SpoolFullError(nbytes, available)
+
+    # ── Job directories ───────────────────────────────────────────────────────
+
+    def create(self, kind: str, reserve_bytes: int = 0) -> str:
+        """A fresh directory for one job, after reserving `reserve_bytes`; pair with release()."""
+        path = os.path.join(self.root, f"{kind}-{NODE_ID}-{os.getpid()}-{uuid.uuid4().hex[:12]}")
+        reserve_bytes = max(0, int(reserve_bytes))
+        with self._lock:
+            self.check(reserve_bytes)
+            self._reserved[path] = reserve_bytes
+            self._reserved_total += reserve_bytes
+        try:
+            os.makedirs(path)
+        except BaseException:
+            self._unreserve(path)
+            raise
+        return path
+
+    def _unreserve(self, path: str) -> None:
+        with self._lock:
+            self._reserved_total -= self._reserved.pop(path, 0)
+
+    def release(self, path: str) -> None:
+        shutil.rmtree(path, ignore_errors=True)
+        self._unreserve(path)
+        logger.debug(f"Spool released: {path}")
+
+    @contextmanager
+    def job(self, kind: str, reserve_bytes: int = 0):
+        """Directory for the block; removed with everything in it on exit."""
+        path = self.create(kind, reserve_bytes)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    # ── Garbage collection ────────────────────────────────────────────────────
+
+    def _is_stale(self, path: str, now: float) -> bool:
+        try:
+            age = now - os.stat(path).st_mtime
+        except FileNotFoundError:
+            return False
+        if age > self.max_age_seconds:
+            return True
+        parts = os.path.basename(path).split("-")
+        if len(parts) == 4 and parts[1] == NODE_ID and parts[2].isdigit():
+            pid = int(parts[2])
+            return pid != os.getpid() and not _pid_alive(pid)
+        # Another host, container or naming scheme: its PIDs mean nothing here, so only age retires it
+        return False
+
+    def collect_garbage(self) -> int:
+        """Remove job directories left behind by dead processes; returns how many."""
+        now = time.time()
+        removed = freed = 0
+        for path in self._job_dirs():
+            if self._is_stale(path, now):
+                freed += _tree_size(path)
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        if removed:
+            logger.info(f"Spool GC removed {removed} stale job dir(s), {freed // 1024 ** 2} MB")
+        return removed
+
+
+spool = SpoolManager()
@@ -0,0 +1,352 @@
+import os
+import json
+import time
+import base64
+import sqlite3
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from backend.metrics import register_cache
+from backend.segments import SegmentTable, as_table
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+RESULTS_DB = os.getenv(
+    "RESULTS_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'results.db')
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+MAX_SEGMENT_PAGE_SIZE = 2000
+TABLE_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", 64))
+
+# Columns that can be projected without decoding the stored JSON payload
+COLUMNS = (
+    "video_id", "channel", "channel_id", "upload_date", "analyzed_at",
+    "risk_score", "risk_label", "risk_level", "video_title", "duration_seconds",
+    "language", "transcript_source",
+)
+
+SORT_KEYS = ("upload_date", "risk_score", "analyzed_at")
+
+# Served from transcript_tables instead of being duplicated in every payload
+TRANSCRIPT_FIELDS = ("full_transcript",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    video_id          TEXT PRIMARY KEY,
+    channel           TEXT NOT NULL DEFAULT '',
+    channel_id        TEXT NOT NULL DEFAULT '',
+    upload_date       TEXT NOT NULL DEFAULT '',
+    analyzed_at       REAL NOT NULL,
+    risk_score        REAL NOT NULL,
+    risk_label        TEXT NOT NULL,
+    risk_level        TEXT NOT NULL,
+    video_title       TEXT,
+    duration_seconds  INTEGER,
+    language          TEXT,
+    transcript_source TEXT,
+    payload           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_channel_id ON results (channel_id, upload_date, video_id);
+CREATE INDEX IF NOT EXISTS idx_results_channel    ON results (channel, upload_date, video_id);
+CREATE INDEX IF NOT EXISTS idx_results_level      ON results (risk_level, upload_date, video_id);
+CREATE INDEX IF NOT EXISTS idx_results_upload     ON results (upload_date, video_id);
+CREATE INDEX IF NOT EXISTS idx_results_score      ON results (risk_score, video_id);
+CREATE INDEX IF NOT EXISTS idx_results_analyzed   ON results (analyzed_at, video_id);
+
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT PRIMARY KEY,
+    language TEXT,
+    source   TEXT,
+    segments INTEGER NOT NULL
+);
+-- One SegmentTable.to_bytes() blob per transcript
+CREATE TABLE IF NOT EXISTS transcript_tables (
+    video_id TEXT PRIMARY KEY,
+    saved_at REAL NOT NULL,
+    data     BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chat_indexes (
+    video_id TEXT PRIMARY KEY,
+    built_at REAL NOT NULL,
+    payload  TEXT NOT NULL
+);
+"""
+
+_local = threading.local()
+
+
+def _connect(path: str = None) -> sqlite3.Connection:
+    """One connection per thread; WAL lets readers run alongside the writer."""
+    path = path or RESULTS_DB
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+def risk_level(label: str) -> str:
+    """'🔴 HIGH RISK' → 'HIGH', for indexed filtering without emoji matching."""
+    for level in ("HIGH", "MEDIUM", "LOW"):
+        if level in (label or '').upper():
+            return level
+    return "UNKNOWN"
+
+
+def _normalize_date(value: str) -> str:
+    """Accept YYYYMMDD or YYYY-MM-DD; yt-dlp stores upload_date as YYYYMMDD."""
+    return (value or '').replace('-', '')
+
+
+# ── Writes ────────────────────────────────────────────────────────────────────
+
+def save_result(info: dict, result: dict, path: str = None) -> None:
+    """Insert or replace one analysis result, keyed by video ID."""
+    conn = _connect(path)
+    with conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO results (
+                video_id, channel, channel_id, upload_date, analyzed_at,
+                risk_score, risk_label, risk_level, video_title, duration_seconds,
+                language, transcript_source, payload
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                info.get("id"),
+                info.get("channel") or info.get("uploader") or '',
+                info.get("channel_id") or info.get("uploader_id") or '',
+                info.get("upload_date") or '',
+                time.time(),
+                result["risk_score"],
+                result["risk_label"],
+                risk_level(result["risk_label"]),
+                result.get("video_title"),
+                result.get("duration_seconds"),
+                result.get("language"),
+                result.get("transcript_source"),
+                json.dumps({k: v for k, v in result.items() if k not in TRANSCRIPT_FIELDS}),
+            ),
+        )
+
+
+def save_transcript(video_id: str, transcript: dict, path: str = None) -> None:
+    """Store a transcript's segments as one binary SegmentTable."""
+    table = as_table(transcript.get("segments"))
+    conn = _connect(path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO transcripts (video_id, language, source, segments) VALUES (?, ?, ?, ?)",
+            (video_id, transcript.get("language"), transcript.get("source"), len(table)),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO transcript_tables (video_id, saved_at, data) VALUES (?, ?, ?)",
+            (video_id, time.time(), table.to_bytes()),
+        )
+
+
+def save_chat_index(video_id: str, index: dict, path: str = None) -> None:
+    """Store a transcript's retrieval index next to its segments."""
+    conn = _connect(path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO chat_indexes (video_id, built_at, payload) VALUES (?, ?, ?)",
+            (video_id, time.time(), json.dumps(index, separators=(',', ':'))),
+        )
+
+
+# ── Reads ─────────────────────────────────────────────────────────────────────
+
+def _project(row: sqlite3.Row, fields: Optional[list]) -> dict:
+    if fields and all(f in COLUMNS for f in fields):
+        return {f: row[f] for f in fields}
+    full = json.loads(row["payload"])
+    full.update({c: row[c] for c in COLUMNS})
+    if not fields:
+        return full
+    return {f: full.get(f) for f in fields}
+
+
+def get_result(video_id: str, fields: Optional[list] = None, path: str = None) -> Optional[dict]:
+    row = _connect(path).execute("SELECT * FROM results WHERE video_id = ?", (video_id,)).fetchone()
+    return _project(row, fields) if row else None
+
+
+def _encode_cursor(sort_value, video_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort_value, video_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        sort_value, video_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return sort_value, video_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def query_results(
+    channel: str = None,
+    channel_id: str = None,
+    level: str = None,
+    min_score: float = None,
+    max_score: float = None,
+    uploaded_after: str = None,
+    uploaded_before: str = None,
+    sort: str = "upload_date",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str = None,
+    fields: Optional[list] = None,
+    path: str = None,
+) -> dict:
+    """
+    Filter stored results, newest (or highest) first, with keyset pagination.
+
+    Pass the returned next_cursor back in to fetch the following page. Only
+    the selected columns are read when every requested field is indexed.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    where, params = [], []
+    if channel_id:
+        where.append("channel_id = ?")
+        params.append(channel_id)
+    if channel:
+        where.append("channel = ?")
+        params.append(channel)
+    if level:
+        where.append("risk_level = ?")
+        params.append(risk_level(level))
+    if min_score is not None:
+        where.append("risk_score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        where.append("risk_score <= ?")
+        params.append(max_score)
+    if uploaded_after:
+        where.append("upload_date >= ?")
+        params.append(_normalize_date(uploaded_after))
+    if uploaded_before:
+        where.append("upload_date <= ?")
+        params.append(_normalize_date(uploaded_before))
+    if cursor:
+        sort_value, last_id = _decode_cursor(cursor)
+        where.append(f"({sort}, video_id) < (?, ?)")
+        params.extend([sort_value, last_id])
+
+    if fields and all(f in COLUMNS for f in fields):
+        select = ', '.join(dict.fromkeys(list(fields) + [sort, "video_id"]))
+    else:
+        select = '*'
+
+    sql = f"SELECT {select} FROM results"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {sort} DESC, video_id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    rows = _connect(path).execute(sql, params).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "results": [_project(row, fields) for row in rows],
+        "count": len(rows),
+        "next_cursor": _encode_cursor(rows[-1][sort], rows[-1]["video_id"]) if has_more else None,
+    }
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _load_table(path: str, video_id: str, saved_at: float) -> Optional[SegmentTable]:
+    # saved_at is part of the key so a re-analysis invalidates the cached copy
+    row = _connect(path).execute("SELECT data FROM transcript_tables WHERE video_id = ?", (video_id,)).fetchone()
+    return SegmentTable.from_bytes(row["data"]) if row else None
+
+
+register_cache("transcript_table", _load_table)
+
+
+def get_transcript_table(video_id: str, path: str = None) -> Optional[SegmentTable]:
+    """A stored transcript's segments, or None if it has none."""
+    row = _connect(path).execute("SELECT saved_at FROM transcript_tables WHERE video_id = ?", (video_id,)).fetchone()
+    return _load_table(path or RESULTS_DB, video_id, row["saved_at"]) if row else None
+
+
+def _segment_row(table: SegmentTable, idx: int) -> dict:
+    return {"idx": idx, "start": float(table.start[idx]), "end": float(table.end[idx]), "text": table.text_at(idx)}
+
+
+def get_transcript_page(video_id: str, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE,
+                        start: float = None, end: float = None, path: str = None) -> Optional[dict]:
+    """
+    One page of a stored transcript, by segment offset and optionally a time range.
+    """
+    meta = _connect(path).execute("SELECT * FROM transcripts WHERE video_id = ?", (video_id,)).fetchone()
+    if meta is None:
+        return None
+    table = get_transcript_table(video_id, path) or SegmentTable.empty()
+
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_SEGMENT_PAGE_SIZE))
+
+    # Binary search narrows to the time range; the mask handles cues that overlap it only partly
+    i, j = table.span(start, end)
+    i = min(max(i, offset), j)
+    window = table[i:j]
+    keep = np.ones(len(window), dtype=bool)
+    if start is not None:
+        keep &= window.end > start
+    if end is not None:
+        keep &= window.start < end
+    indexes = (np.flatnonzero(keep)[:limit + 1] + i).tolist()
+    has_more = len(indexes) > limit
+    indexes = indexes[:limit]
+
+    return {
+        "video_id": video_id,
+        "language": meta["language"],
+        "source": meta["source"],
+        "total_segments": meta["segments"],
+        "offset": offset,
+        "segments": [_segment_row(table, idx) for idx in indexes],
+        "next_offset": indexes[-1] + 1 if has_more else None,
+    }
+
+
+def get_segments(video_id: str, indexes: list, path: str = None) -> dict:
+    """Specific transcript segments by index, as {idx: segment}."""
+    if not indexes:
+        return {}
+    table = get_transcript_table(video_id, path)
+    if table is None:
+        return {}
+    return {idx: _segment_row(table, idx) for idx in indexes if 0 <= idx < len(table)}
+
+
+def chat_index_version(video_id: str, path: str = None) -> Optional[float]:
+    row = _connect(path).execute("SELECT built_at FROM chat_indexes WHERE video_id = ?", (video_id,)).fetchone()
+    return row["built_at"] if row else None
+
+
+def get_chat_index(video_id: str, path: str = None) -> Optional[dict]:
+    row = _connect(path).execute("SELECT payload FROM chat_indexes WHERE video_id = ?", (video_id,)).fetchone()
+    return json.loads(row["payload"]) if row else None
@@ -0,0 +1,230 @@
+"""
+Structured logs with correlation IDs, and optional OpenTelemetry tracing.
+
+Every log line carries the ID of the request or queue job it belongs to,
+so one analysis can be followed from the API through the scheduler threads
+to a remote worker:
+
+    LOG_FORMAT=json     one JSON object per line (default: text)
+    LOG_LEVEL=INFO
+
+Tracing is off unless TRACE_EXPORT is set and opentelemetry-sdk is
+installed. Each track_stage() block then becomes a span:
+
+    TRACE_EXPORT=otlp                      OTLP/HTTP to $OTEL_EXPORTER_OTLP_ENDPOINT (a local collector)
+    TRACE_EXPORT=file:data/traces.jsonl    one JSON span per line
+    TRACE_EXPORT=console
+
+Library modules only log; the entry points (API, worker, CLIs) call
+configure_logging().
+"""
+import os
+import sys
+import json
+import uuid
+import logging
+import threading
+import contextvars
+from datetime import datetime, timezone
+from contextlib import contextmanager
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "finfluencer")
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(correlation_id)s]: %(message)s"
+
+_correlation_id = contextvars.ContextVar("correlation_id", default=None)
+
+
+# ── Correlation IDs ───────────────────────────────────────────────────────────
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def get_correlation_id():
+    return _correlation_id.get()
+
+
+@contextmanager
+def correlation(correlation_id: str = None):
+    """Tag everything logged (and traced) inside the block with one ID."""
+    token = _correlation_id.set(correlation_id or new_correlation_id())
+    try:
+        yield _correlation_id.get()
+    finally:
+        _correlation_id.reset(token)
+
+
+# ── Logging ───────────────────────────────────────────────────────────────────
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "correlation_id"}
+
+
+class CorrelationFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get() or "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        correlation_id = getattr(record, "correlation_id", None)
+        if correlation_id and correlation_id != "-":
+            entry["correlation_id"] = correlation_id
+        entry.update(_trace_ids())
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """
+    Install the root handler. Idempotent.
+
+    If something else (a host application) already configured the root
+    logger, its handlers are kept and only gain correlation IDs.
+    """
+    root = logging.getLogger()
+    ours = [h for h in root.handlers if getattr(h, "_finfluencer", False)]
+    if root.handlers and not ours:
+        for handler in root.handlers:
+            handler.addFilter(CorrelationFilter())
+        return
+
+    for handler in ours:
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(sys.stderr)
+    handler._finfluencer = True
+    handler.addFilter(CorrelationFilter())
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+# ── Tracing ───────────────────────────────────────────────────────────────────
+
+_tracer = None
+_tracer_pid = None
+_tracer_lock = threading.Lock()
+
+
+def _make_exporter(target: str):
+    if target == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if target == "console":
+        return ConsoleSpanExporter()
+    if target.startswith("file:"):
+        out = open(target[len("file:"):], "a", buffering=1)
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    raise ValueError(f"Unknown TRACE_EXPORT {target!r}; use otlp, console or file:<path>")
+
+
+def get_tracer():
+    """
+    This process's tracer, or None when tracing is off.
+
+    Built on first use per PID, so each forked gunicorn worker gets its own
+    export thread.
+    """
+    global _tracer, _tracer_pid
+    if not TRACE_EXPORT:
+        return None
+    if _tracer_pid == os.getpid():
+        return _tracer
+    with _tracer_lock:
+        if _tracer_pid != os.getpid():
+            try:
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+                provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+                provider.add_span_processor(BatchSpanProcessor(_make_exporter(TRACE_EXPORT)))
+                _tracer = provider.get_tracer("backend")
+            except ImportError as e:
+                logging.getLogger(__name__).warning(
+                    f"TRACE_EXPORT is set but OpenTelemetry is not installed ({e}); tracing disabled"
+                )
+                _tracer = None
+            _tracer_pid = os.getpid()
+    return _tracer
+
+
+def _attributes(attributes: dict) -> dict:
+    return {k: v for k, v in attributes.items() if isinstance(v, (str, bool, int, float))}
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """A span around the block (a no-op when tracing is off)."""
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    correlation_id = _correlation_id.get()
+    if correlation_id:
+        attributes["correlation.id"] = correlation_id
+    with tracer.start_as_current_span(name, attributes=_attributes(attributes)) as current:
+        yield current
+
+
+def set_span_attributes(**attributes) -> None:
+    """Attach attributes (durations, counts) to the innermost active span."""
+    if get_tracer() is None:
+        return
+    from opentelemetry import trace
+    trace.get_current_span().set_attributes(_attributes(attributes))
+
+
+def _trace_ids() -> dict:
+    if get_tracer() is None:
+        return {}
+    from opentelemetry import trace
+    ctx = trace.get_current_span().get_span_context()
+    if not ctx.is_valid:
+        return {}
+    return {"trace_id": format(ctx.trace_id, "032x"), "span_id": format(ctx.span_id, "016x")}
+
+
+# ── Propagation across the job queue ──────────────────────────────────────────
+
+def trace_carrier() -> dict:
+    """W3C trace headers for the current span, to ship inside a job payload."""
+    if get_tracer() is None:
+        return {}
+    from opentelemetry.propagate import inject
+    carrier = {}
+    inject(carrier)
+    return carrier
+
+
+@contextmanager
+def remote_parent(carrier: dict):
+    """Make spans inside the block children of the span that enqueued the job."""
+    if not carrier or get_tracer() is None:
+        yield
+        return
+    from opentelemetry import context
+    from opentelemetry.propagate import extract
+    token = context.attach(extract(carrier))
+    try:
+        yield
+    finally:
+        context.detach(token)
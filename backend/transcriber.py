@@ -1,33 +1,51 @@
-import whisper
 import os
 import ssl
 import logging
-import numpy as np
+import time
+from contextlib import closing
+
+from backend.audio import (
+    MIN_DURATION_SECONDS, SAMPLE_RATE, SILENCE_PEAK, WINDOW_SECONDS, AudioStats, stream_windows,
+)
+from backend.metrics import MODEL_LOAD_SECONDS, track_stage
+from backend.segments import SegmentTable
+from backend.profiling import torch_profiled
+from backend.telemetry import set_span_attributes
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # SSL fix
 ssl._create_default_https_context = ssl._create_unverified_context
 
+# ── Config ────────────────────────────────────────────────────────────────────
+
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+# Whisper's token IDs are only kept on request; most consumers need text and times
+KEEP_TOKENS = os.getenv("TRANSCRIPT_KEEP_TOKENS", "").lower() in ("1", "true", "yes")
+
 # ── Lazy model loader ─────────────────────────────────────────────────────────
 
 _model = None
+_model_name = None
 
 def get_model():
-    global _model
-    if _model is None:
-        logger.info("Loading Whisper model...")
-        _model = whisper.load_model("base")
+    """The Whisper model named by WHISPER_MODEL; changing that setting swaps it out."""
+    global _model, _model_name
+    if _model is None or _model_name != WHISPER_MODEL:
+        import whisper
+        logger.info(f"Loading Whisper model ({WHISPER_MODEL})...")
+        started = time.perf_counter()
+        _model = None  # release the previous model before loading the next
+        _model = whisper.load_model(WHISPER_MODEL)
+        _model_name = WHISPER_MODEL
+        MODEL_LOAD_SECONDS.labels("whisper").set(time.perf_counter() - started)
         logger.info("Whisper model loaded!")
     return _model
 
 
 # ── Audio validation ──────────────────────────────────────────────────────────
 
-def validate_audio(audio_path: str) -> None:
-    """Validate audio before passing to Whisper to prevent tensor reshape crashes."""
-
+def _check_file(audio_path: str) -> int:
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
@@ -37,66 +55,90 @@ def validate_audio(audio_path: str) -> None:
             f"Audio file too small ({file_size} bytes) — "
             f"likely a failed download or corrupt FFmpeg output: {audio_path}"
         )
+    return file_size
 
-    # Use whisper's own audio loader to validate (no extra dependencies)
-    try:
-        audio = whisper.load_audio(audio_path)
-        duration = len(audio) / whisper.audio.SAMPLE_RATE
-
-        if duration < 0.5:
-            raise ValueError(
-                f"Audio too short ({duration:.2f}s). Whisper needs at least 0.5s."
-            )
 
-        if np.max(np.abs(audio)) < 1e-4:
-            raise ValueError(
-                f"Audio appears silent (max amplitude: {np.max(np.abs(audio)):.6f})."
-            )
-
-        logger.info(f"Audio validated — Duration: {duration:.2f}s | Size: {file_size} bytes")
+def validate_audio(audio_path: str) -> None:
+    """Validate audio before passing to Whisper to prevent tensor reshape crashes."""
+    file_size = _check_file(audio_path)
 
-    except (ValueError, FileNotFoundError):
-        raise
-    except Exception as e:
-        raise RuntimeError(f"Could not read audio file '{audio_path}': {e}") from e
+    # One streaming pass; never holds more than a window of samples
+    stats = AudioStats()
+    with closing(stream_windows(audio_path)) as windows:
+        for _, window in windows:
+            stats.update(window)
+    stats.validate()
+    logger.info(f"Audio validated — Duration: {stats.duration:.2f}s | Size: {file_size} bytes")
 
 
 # ── Transcription ─────────────────────────────────────────────────────────────
 
-def transcribe_audio(audio_path: str) -> dict:
-    validate_audio(audio_path)
+def transcribe_audio(audio_path: str, window_seconds: float = WINDOW_SECONDS) -> dict:
+    """
+    Transcribe a file window by window, so peak memory doesn't grow with its length.
+
+    The audio is validated as it streams (silent windows are skipped rather
+    than transcribed) and the language is detected on the first window with
+    sound. Segment times are offset to be relative to the start of the file.
+    """
+    import whisper
+    file_size = _check_file(audio_path)
 
     model = get_model()
 
     try:
         logger.info(f"Transcribing: {audio_path}")
 
-        # Detect language first to avoid empty segment tensor issues
-        audio = whisper.load_audio(audio_path)
-        audio_trimmed = whisper.pad_or_trim(audio)
-        mel = whisper.log_mel_spectrogram(audio_trimmed).to(model.device)
-
-        _, probs = model.detect_language(mel)
-        detected_lang = max(probs, key=probs.get)
-        logger.info(f"Detected language: {detected_lang} (confidence: {probs[detected_lang]:.2f})")
-
-        # Explicit language prevents reshape errors on ambiguous/short segments
-        result = model.transcribe(
-            audio_path,
-            fp16=False,
-            language=detected_lang,
-            condition_on_previous_text=False,
-            verbose=False
-        )
-
-        text = result["text"].strip()
+        stats = AudioStats()
+        detected_lang = None
+        texts, tables = [], []
+
+        # Closing kills FFmpeg at once if Whisper raises partway through
+        with closing(stream_windows(audio_path, window_seconds)) as windows:
+            for offset, window in windows:
+                peak = stats.update(window)
+                if peak < SILENCE_PEAK or window.size < MIN_DURATION_SECONDS * SAMPLE_RATE:
+                    continue
+
+                # Detect language first to avoid empty segment tensor issues
+                if detected_lang is None:
+                    with track_stage("detect_language"), torch_profiled("detect_language"):
+                        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(window)).to(model.device)
+                        _, probs = model.detect_language(mel)
+                        detected_lang = max(probs, key=probs.get)
+                        set_span_attributes(language=detected_lang, confidence=float(probs[detected_lang]))
+                    logger.info(f"Detected language: {detected_lang} (confidence: {probs[detected_lang]:.2f})")
+
+                # Explicit language prevents reshape errors on ambiguous/short segments
+                with track_stage("whisper_transcribe"), torch_profiled("whisper"):
+                    result = model.transcribe(
+                        window,
+                        fp16=False,
+                        language=detected_lang,
+                        condition_on_previous_text=False,
+                        verbose=False
+                    )
+                    set_span_attributes(window_offset=offset, window_seconds=window.size / SAMPLE_RATE,
+                                        segment_count=len(result.get("segments", [])))
+
+                # Whisper's per-segment dicts are dropped window by window
+                tables.append(SegmentTable.from_segments(result.get("segments", []), offset, keep_tokens=KEEP_TOKENS))
+                if result["text"].strip():
+                    texts.append(result["text"].strip())
+                del window, result
+
+        stats.validate()
+        logger.info(f"Audio validated — Duration: {stats.duration:.2f}s | Size: {file_size} bytes")
+
+        text = " ".join(texts)
 
         if not text:
             logger.warning("Whisper returned empty transcription.")
             return {
                 "text": "",
                 "language": detected_lang,
-                "segments": [],
+                "segments": SegmentTable.empty(),
+                "source": "whisper",
                 "warning": "Transcription returned empty. Audio may be unclear."
             }
 
@@ -105,7 +147,8 @@ def transcribe_audio(audio_path: str) -> dict:
         return {
             "text": text,
             "language": detected_lang,
-            "segments": result.get("segments", [])
+            "segments": SegmentTable.concat(tables),
+            "source": "whisper"
         }
 
     except RuntimeError as e:
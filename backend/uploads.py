@@ -0,0 +1,177 @@
+import os
+import hashlib
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 2 * 1024 ** 3))
+
+# Directories the /analyze/local endpoint may read from (os.pathsep-separated).
+# Unset means server-local ingestion is disabled.
+INGEST_ROOTS = [
+    os.path.realpath(p) for p in os.getenv("INGEST_ROOTS", "").split(os.pathsep) if p
+]
+
+AUDIO_EXTENSIONS = {
+    ".mp3", ".wav", ".m4a", ".aac", ".ogg", ".opus", ".flac", ".webm", ".mp4", ".mkv",
+}
+
+
+class UploadError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _check_extension(filename: str) -> str:
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext not in AUDIO_EXTENSIONS:
+        raise UploadError(415, f"Unsupported file type '{ext or filename}'")
+    return ext
+
+
+# ── Streaming spooler ─────────────────────────────────────────────────────────
+
+class _Spool:
+    """Buffers parser output and writes it to disk in UPLOAD_CHUNK_BYTES pieces."""
+
+    def __init__(self, dest_dir: str):
+        self.dest_dir = dest_dir
+        self.file = None
+        self.path = None
+        self.filename = None
+        self.size = 0
+        self.sha1 = hashlib.sha1()
+        self.buffer = bytearray()
+
+    def open(self, filename: str) -> None:
+        ext = _check_extension(filename)
+        self.filename = os.path.basename(filename)
+        self.path = os.path.join(self.dest_dir, f"upload{ext}")
+        self.file = open(self.path, 'wb')
+
+    def feed(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > MAX_UPLOAD_BYTES:
+            raise UploadError(413, f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+        self.sha1.update(data)
+        self.buffer += data
+
+    async def drain(self, force: bool = False) -> None:
+        if self.file and self.buffer and (force or len(self.buffer) >= UPLOAD_CHUNK_BYTES):
+            chunk, self.buffer = bytes(self.buffer), bytearray()
+            await run_in_threadpool(self.file.write, chunk)
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+
+    def result(self) -> dict:
+        if self.path is None or self.size == 0:
+            raise UploadError(400, "No audio file in request")
+        return {"path": self.path, "filename": self.filename, "size": self.size, "sha1": self.sha1.hexdigest()}
+
+
+async def _spool_multipart(request, spool: _Spool, boundary: bytes, field: str) -> None:
+    state = {"header_field": b'', "header_value": b'', "headers": {}, "active": False}
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = state["header_value"] = b''
+
+    def on_headers_finished():
+        _, params = parse_options_header(state["headers"].get(b'content-disposition', b''))
+        name = params.get(b'name', b'').decode()
+        filename = params.get(b'filename')
+        state["active"] = name == field and filename is not None and spool.file is None
+        if state["active"]:
+            spool.open(filename.decode(errors='replace'))
+
+    def on_part_data(data, start, end):
+        if state["active"]:
+            spool.feed(data[start:end])
+
+    def on_part_end():
+        state["active"] = False
+        state["headers"] = {}
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+        await spool.drain()
+    parser.finalize()
+
+
+async def _spool_raw(request, spool: _Spool, filename: str) -> None:
+    spool.open(filename)
+    async for chunk in request.stream():
+        spool.feed(chunk)
+        await spool.drain()
+
+
+async def spool_upload(request, dest_dir: str, filename: str = None, field: str = "file") -> dict:
+    """
+    Stream a request body to dest_dir without holding it in memory.
+
+    Accepts multipart/form-data (the audio in the `field` part) or a raw
+    audio body with the name given by `filename`. Returns the spooled path,
+    original name, size and SHA-1 of the content.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    spool = _Spool(dest_dir)
+    try:
+        if content_type == b'multipart/form-data':
+            boundary = params.get(b'boundary')
+            if not boundary:
+                raise UploadError(400, "Multipart upload without a boundary")
+            await _spool_multipart(request, spool, boundary, field)
+        else:
+            if not filename:
+                raise UploadError(400, "Raw uploads need a ?filename= with the audio extension")
+            await _spool_raw(request, spool, filename)
+        await spool.drain(force=True)
+    finally:
+        spool.close()
+
+    logger.info(f"Spooled upload {spool.filename} ({spool.size} bytes)")
+    return spool.result()
+
+
+# ── Server-local files ────────────────────────────────────────────────────────
+
+def resolve_ingest_path(path: str) -> str:
+    """Resolve a server-local path, refusing anything outside INGEST_ROOTS."""
+    if not INGEST_ROOTS:
+        raise UploadError(403, "Server-local ingestion is disabled (set INGEST_ROOTS)")
+
+    real = os.path.realpath(path)
+    if not any(real == root or real.startswith(root + os.sep) for root in INGEST_ROOTS):
+        raise UploadError(403, "Path is outside the allowed ingest directories")
+    if not os.path.isfile(real):
+        raise UploadError(404, "File not found")
+    _check_extension(real)
+    return real
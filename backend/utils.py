@@ -1,13 +1,24 @@
 import yt_dlp
 import os
-import tempfile
+import re
+import subprocess
 
-def download_audio(url: str) -> tuple:
-    temp_dir = tempfile.mkdtemp()
+_VIDEO_ID = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|live/|embed/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})'
+)
 
+
+def extract_video_id(url: str):
+    """The 11-character YouTube video ID in a URL, or None if there isn't one."""
+    match = _VIDEO_ID.search(url or '')
+    return match.group(1) if match else None
+
+
+def download_audio(url: str, dest_dir: str) -> tuple:
+    """Download and convert to MP3 inside dest_dir; intermediates are left there for the caller to remove."""
     ydl_opts = {
         'format': 'bestaudio/best',
-        'outtmpl': f'{temp_dir}/%(id)s.%(ext)s',
+        'outtmpl': f'{dest_dir}/%(id)s.%(ext)s',
         'postprocessors': [{
             'key': 'FFmpegExtractAudio',
             'preferredcodec': 'mp3',
@@ -22,11 +33,34 @@ def download_audio(url: str) -> tuple:
         title = info.get('title', 'Unknown Title')
         duration = info.get('duration', 0)
 
-    audio_file = f"{temp_dir}/{video_id}.mp3"
+    audio_file = f"{dest_dir}/{video_id}.mp3"
     if not os.path.exists(audio_file):
-        for f in os.listdir(temp_dir):
+        for f in os.listdir(dest_dir):
             if f.startswith(video_id):
-                audio_file = f"{temp_dir}/{f}"
+                audio_file = f"{dest_dir}/{f}"
                 break
 
-    return audio_file, title, duration
\ No newline at end of file
+    return audio_file, title, duration
+
+
+def extract_metadata(url: str) -> dict:
+    """Fetch video metadata (title, duration, subtitle tracks) without downloading anything."""
+    ydl_opts = {
+        'quiet': True,
+        'skip_download': True,
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        return ydl.extract_info(url, download=False)
+
+
+def probe_duration(path: str) -> float:
+    """Container-reported duration in seconds via ffprobe (no decoding); 0 if unknown."""
+    try:
+        out = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=30,
+        )
+        return float(out.stdout.strip())
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return 0.0
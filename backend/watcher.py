@@ -0,0 +1,297 @@
+"""
+Incremental channel watcher.
+
+Each poll is one flat yt-dlp playlist listing (no downloads, no per-video
+metadata). Only video IDs the channel has not produced before are handed to
+the submit callback.
+
+    python -m backend.watcher --add https://www.youtube.com/@SomeChannel
+    python -m backend.watcher --once >> urls.txt    # print new uploads, e.g. for backend.cli
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import threading
+
+import yt_dlp
+
+from backend.telemetry import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+WATCHER_DB = os.getenv(
+    "WATCHER_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'watcher.db')
+)
+
+DEFAULT_INTERVAL_SECONDS = int(os.getenv("WATCH_INTERVAL_SECONDS", 3600))
+DEFAULT_MIN_INTERVAL_SECONDS = 600
+JITTER = 0.2                 # next poll lands within ±20% of the interval
+LISTING_LIMIT = 30           # newest uploads to look at per poll
+INITIAL_BACKFILL = 3         # uploads queued the first time a channel is polled
+POLL_SPACING_SECONDS = 5     # minimum gap between any two channel listings
+MAX_SLEEP_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel_url          TEXT PRIMARY KEY,
+    interval_seconds     INTEGER NOT NULL,
+    min_interval_seconds INTEGER NOT NULL,
+    added_at             REAL NOT NULL,
+    last_poll            REAL,
+    next_poll            REAL NOT NULL,
+    last_error           TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_channels_next_poll ON channels (next_poll);
+CREATE TABLE IF NOT EXISTS seen_videos (
+    channel_url TEXT NOT NULL,
+    video_id    TEXT NOT NULL,
+    seen_at     REAL NOT NULL,
+    PRIMARY KEY (channel_url, video_id)
+) WITHOUT ROWID;
+"""
+
+_local = threading.local()
+
+
+def _connect(path: str = None) -> sqlite3.Connection:
+    path = path or WATCHER_DB
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+# ── Listing ───────────────────────────────────────────────────────────────────
+
+def normalize_channel_url(url: str) -> str:
+    """Point channel URLs at the uploads tab so the listing is flat videos, not tabs."""
+    url = url.rstrip('/')
+    tabs = ('/videos', '/streams', '/shorts', '/playlists')
+    if ('/@' in url or '/channel/' in url or '/c/' in url or '/user/' in url) and not url.endswith(tabs):
+        url += '/videos'
+    return url
+
+
+def list_channel_uploads(channel_url: str, limit: int = LISTING_LIMIT) -> list:
+    """Newest-first video IDs from a flat playlist listing — metadata only."""
+    ydl_opts = {
+        'quiet': True,
+        'skip_download': True,
+        'extract_flat': 'in_playlist',
+        'playlistend': limit,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(channel_url, download=False)
+    return [e["id"] for e in (info.get("entries") or []) if e and e.get("id")]
+
+
+def video_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+# ── Channel registry ──────────────────────────────────────────────────────────
+
+def add_channel(channel_url: str, interval_seconds: int = DEFAULT_INTERVAL_SECONDS,
+                min_interval_seconds: int = DEFAULT_MIN_INTERVAL_SECONDS, path: str = None) -> dict:
+    channel_url = normalize_channel_url(channel_url)
+    interval_seconds = max(interval_seconds, min_interval_seconds)
+    conn = _connect(path)
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO channels (channel_url, interval_seconds, min_interval_seconds, added_at, next_poll)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (channel_url) DO UPDATE SET
+                interval_seconds = excluded.interval_seconds,
+                min_interval_seconds = excluded.min_interval_seconds
+            """,
+            (channel_url, interval_seconds, min_interval_seconds, time.time(), time.time()),
+        )
+    return get_channel(channel_url, path)
+
+
+def remove_channel(channel_url: str, path: str = None) -> bool:
+    channel_url = normalize_channel_url(channel_url)
+    conn = _connect(path)
+    with conn:
+        deleted = conn.execute("DELETE FROM channels WHERE channel_url = ?", (channel_url,)).rowcount
+        conn.execute("DELETE FROM seen_videos WHERE channel_url = ?", (channel_url,))
+    return bool(deleted)
+
+
+def get_channel(channel_url: str, path: str = None) -> dict:
+    channel_url = normalize_channel_url(channel_url)
+    conn = _connect(path)
+    row = conn.execute("SELECT * FROM channels WHERE channel_url = ?", (channel_url,)).fetchone()
+    if row is None:
+        return None
+    seen = conn.execute("SELECT COUNT(*) FROM seen_videos WHERE channel_url = ?", (channel_url,)).fetchone()[0]
+    return {**dict(row), "seen_videos": seen}
+
+
+def list_channels(path: str = None) -> list:
+    rows = _connect(path).execute("SELECT channel_url FROM channels ORDER BY next_poll").fetchall()
+    return [get_channel(row["channel_url"], path) for row in rows]
+
+
+# ── Polling ───────────────────────────────────────────────────────────────────
+
+def _unseen(conn: sqlite3.Connection, channel_url: str, video_ids: list) -> list:
+    if not video_ids:
+        return []
+    marks = ','.join('?' * len(video_ids))
+    seen = {
+        row[0] for row in conn.execute(
+            f"SELECT video_id FROM seen_videos WHERE channel_url = ? AND video_id IN ({marks})",
+            [channel_url, *video_ids],
+        )
+    }
+    return [v for v in video_ids if v not in seen]
+
+
+def poll_channel(channel_url: str, submit, lister=list_channel_uploads, path: str = None,
+                 force: bool = False) -> list:
+    """
+    List a channel once and submit its unseen uploads, oldest first.
+
+    submit(url) returns True once the video is handled (queued or permanently
+    rejected) and False to retry it next poll. Returns the IDs marked seen.
+    """
+    conn = _connect(path)
+    channel = conn.execute("SELECT * FROM channels WHERE channel_url = ?", (channel_url,)).fetchone()
+    if channel is None:
+        raise KeyError(channel_url)
+
+    now = time.time()
+    if not force and channel["last_poll"] and now - channel["last_poll"] < channel["min_interval_seconds"]:
+        logger.info(f"Skipping {channel_url}: polled {now - channel['last_poll']:.0f}s ago")
+        return []
+
+    first_poll = channel["last_poll"] is None
+    error = None
+    handled = []
+    try:
+        new_ids = _unseen(conn, channel_url, lister(channel_url))
+        if first_poll and len(new_ids) > INITIAL_BACKFILL:
+            # Don't flood the queue with a channel's back catalogue; record it as seen
+            backlog = new_ids[INITIAL_BACKFILL:]
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO seen_videos (channel_url, video_id, seen_at) VALUES (?, ?, ?)",
+                    [(channel_url, v, now) for v in backlog],
+                )
+            new_ids = new_ids[:INITIAL_BACKFILL]
+
+        for video_id in reversed(new_ids):
+            if not submit(video_url(video_id)):
+                break
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO seen_videos (channel_url, video_id, seen_at) VALUES (?, ?, ?)",
+                    (channel_url, video_id, time.time()),
+                )
+            handled.append(video_id)
+        logger.info(f"Polled {channel_url}: {len(new_ids)} new, {len(handled)} submitted")
+    except Exception as e:
+        error = str(e)
+        logger.warning(f"Polling {channel_url} failed: {e}")
+
+    interval = channel["interval_seconds"]
+    next_poll = now + interval * random.uniform(1 - JITTER, 1 + JITTER)
+    with conn:
+        conn.execute(
+            "UPDATE channels SET last_poll = ?, next_poll = ?, last_error = ? WHERE channel_url = ?",
+            (now, next_poll, error, channel_url),
+        )
+    return handled
+
+
+class ChannelWatcher:
+    """Background thread that polls due channels one at a time."""
+
+    def __init__(self, submit, lister=list_channel_uploads, path: str = None):
+        self.submit = submit
+        self.lister = lister
+        self.path = path
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="channel-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_due(self) -> int:
+        """Poll every channel that is due now; returns how many were polled."""
+        conn = _connect(self.path)
+        due = [
+            row["channel_url"] for row in
+            conn.execute("SELECT channel_url FROM channels WHERE next_poll <= ? ORDER BY next_poll", (time.time(),))
+        ]
+        for i, channel_url in enumerate(due):
+            if self._stop.is_set():
+                break
+            if i:
+                self._stop.wait(POLL_SPACING_SECONDS)
+            poll_channel(channel_url, self.submit, self.lister, self.path)
+        return len(due)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"Watcher loop error: {e}")
+            row = _connect(self.path).execute("SELECT MIN(next_poll) FROM channels").fetchone()
+            wait = (row[0] - time.time()) if row and row[0] else MAX_SLEEP_SECONDS
+            self._stop.wait(min(max(wait, 1), MAX_SLEEP_SECONDS))
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--add', metavar='URL', help="start watching a channel")
+    parser.add_argument('--remove', metavar='URL', help="stop watching a channel")
+    parser.add_argument('--interval', type=int, default=DEFAULT_INTERVAL_SECONDS)
+    parser.add_argument('--list', action='store_true', help="show watched channels")
+    parser.add_argument('--once', action='store_true', help="poll due channels and print new video URLs")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    if args.add:
+        print(add_channel(args.add, args.interval))
+    if args.remove:
+        print("removed" if remove_channel(args.remove) else "not watched")
+    if args.list:
+        for channel in list_channels():
+            print(channel)
+    if args.once:
+        def emit(url: str) -> bool:
+            print(url, flush=True)
+            return True
+        polled = ChannelWatcher(emit).run_due()
+        print(f"{polled} channel(s) polled", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
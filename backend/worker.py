@@ -0,0 +1,244 @@
+"""
+Queue worker: pulls analysis jobs from the shared queue and runs the pipeline.
+
+    QUEUE_URL=redis://queue-host:6379/0 python -m backend.worker --concurrency 2
+    QUEUE_URL=sqlite:///data/queue.db python -m backend.worker --burst   # drain, then exit
+    QUEUE_URL=redis://queue-host:6379/0 python -m backend.worker --processes 4
+
+Start as many of these as there are transcription boxes; the API only
+admits and enqueues. SIGTERM/SIGINT lets running jobs finish and stops
+leasing new ones.
+
+--processes N loads Whisper and FinBERT once and forks N worker processes
+that share the weights copy-on-write, the same way gunicorn's preloaded
+master does for the API (see backend/serving.py). Crashed children are
+restarted; SIGTERM is passed on to all of them.
+"""
+import os
+import sys
+import socket
+import signal
+import logging
+import argparse
+import threading
+
+from backend.jobqueue import LEASE_SECONDS, open_queue
+from backend.spool import SpoolFullError, spool
+from backend.telemetry import configure_logging, correlation, remote_parent, span
+
+logger = logging.getLogger(__name__)
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+IDLE_POLL_SECONDS = 1.0
+MAX_IDLE_POLL_SECONDS = 10.0
+
+
+class _Heartbeat(threading.Thread):
+    """Renews a lease every third of its length until stopped or lost."""
+
+    def __init__(self, queue, job_id: str, worker_id: str, lease_seconds: int):
+        super().__init__(name=f"heartbeat-{job_id[:8]}", daemon=True)
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker_id, self.lease_seconds):
+                    logger.warning(f"Lost lease on job {self.job_id}")
+                    self.lost.set()
+                    return
+            except Exception as e:
+                # A missed beat is fine; the lease only lapses after three
+                logger.warning(f"Heartbeat for {self.job_id} failed: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def run_job(queue, job: dict, worker_id: str, lease_seconds: int = LEASE_SECONDS) -> None:
+    """Run one leased job and write its outcome back. Never raises."""
+    # Imported here so an idle worker starts without loading the models
+    from backend.pipeline import analyze_url, pack_outcome
+    from backend.admission import AdmissionError, preflight
+    from backend.utils import extract_metadata
+
+    job_id = job["job_id"]
+    payload = job["payload"]
+    heartbeat = _Heartbeat(queue, job_id, worker_id, lease_seconds)
+    heartbeat.start()
+    logger.info(f"Job {job_id} attempt {job['attempts']}/{job['max_attempts']}: {payload['url']}")
+
+    try:
+        # Metadata is fetched here rather than shipped: yt-dlp info dicts are large
+        info = extract_metadata(payload["url"])
+        # A full spool is left to the download below, which defers the job instead of failing it
+        estimate = payload.get("estimate") or preflight(info, check_spool=False)
+        artifacts = {}
+        result = analyze_url(
+            payload["url"], info, estimate,
+            progress=lambda stage: queue.set_stage(job_id, worker_id, stage),
+            artifacts=artifacts,
+        )
+
+        if heartbeat.lost.is_set():
+            logger.warning(f"Job {job_id} finished after its lease was lost; discarding")
+            return
+        # The API host stores the transcript, chat index and features too, not just the result
+        queue.complete(job_id, worker_id, pack_outcome(info, result, artifacts))
+        logger.info(f"Job {job_id} done")
+
+    except AdmissionError as e:
+        queue.fail(job_id, worker_id, e.detail, retry=False)
+    except SpoolFullError as e:
+        # A full scratch disk says nothing about the job; retry later without using up an attempt
+        logger.warning(f"Job {job_id} deferred {e.retry_after}s: {e}")
+        queue.defer(job_id, worker_id, e.retry_after, str(e))
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+        queue.fail(job_id, worker_id, str(e), retry=True)
+    finally:
+        heartbeat.stop()
+
+
+class Worker:
+    def __init__(self, queue, concurrency: int = 1, lease_seconds: int = LEASE_SECONDS,
+                 worker_id: str = None, burst: bool = False):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.burst = burst
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self, slot: int) -> None:
+        worker_id = f"{self.worker_id}-{slot}"
+        idle = IDLE_POLL_SECONDS
+        while not self._stop.is_set():
+            try:
+                job = self.queue.lease(worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Lease failed: {e}")
+                job = None
+
+            if job is None:
+                if self.burst:
+                    return
+                self._stop.wait(idle)
+                idle = min(idle * 2, MAX_IDLE_POLL_SECONDS)
+                continue
+
+            idle = IDLE_POLL_SECONDS
+            # Log lines and spans join up with the API request that enqueued the job
+            payload = job["payload"]
+            with correlation(payload.get("correlation_id") or job["job_id"]), remote_parent(payload.get("trace")):
+                with span("queue_job", job_id=job["job_id"], attempt=job["attempts"]):
+                    run_job(self.queue, job, worker_id, self.lease_seconds)
+
+    def run(self) -> None:
+        threads = [
+            threading.Thread(target=self._loop, args=(i,), name=f"queue-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            while t.is_alive():
+                t.join(timeout=1)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queue', default=None, help="queue URL (default: $QUEUE_URL)")
+    parser.add_argument('--concurrency', type=int, default=1, help="jobs to run at once in this process")
+    parser.add_argument('--lease-seconds', type=int, default=LEASE_SECONDS)
+    parser.add_argument('--burst', action='store_true', help="exit once the queue is empty")
+    parser.add_argument('--processes', type=int, default=int(os.getenv("WORKER_PROCESSES", 1)),
+                        help="forked worker processes sharing one copy of the models")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    spool.collect_garbage()
+    if args.processes > 1:
+        return run_processes(args)
+    return _run_worker(args)
+
+
+def _run_worker(args) -> int:
+    worker = Worker(open_queue(args.queue), args.concurrency, args.lease_seconds, burst=args.burst)
+
+    def shutdown(signum, frame):
+        logger.info("Stopping after running jobs finish")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    logger.info(f"Worker {worker.worker_id} pulling from {args.queue or 'QUEUE_URL'}")
+    worker.run()
+    return 0
+
+
+def run_processes(args) -> int:
+    """Preload the models, then fork args.processes workers that share them."""
+    from backend import serving
+
+    serving.preload_models()
+    children = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                serving.configure_worker(args.processes)
+                # Queue connections are opened here, never inherited across fork
+                code = _run_worker(args)
+            except Exception:
+                logger.exception("Worker process failed")
+            finally:
+                os._exit(code)
+        children[pid] = slot
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for slot in range(args.processes):
+        spawn(slot)
+    logger.info(f"Forked {args.processes} worker processes")
+
+    failed = False
+    while children:
+        pid, status = os.wait()
+        slot = children.pop(pid, None)
+        if slot is None:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if code != 0 and not stopping and not args.burst:
+            logger.warning(f"Worker process {pid} exited with {code}; restarting")
+            spawn(slot)
+        failed = failed or code != 0
+    return 1 if failed and not stopping else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
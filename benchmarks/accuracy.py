@@ -0,0 +1,274 @@
+"""
+Accuracy-vs-speed evaluation: what each faster setting costs in results.
+
+    python -m benchmarks.accuracy golden/corpus.jsonl --set whisper_model=base,tiny,small
+    python -m benchmarks.accuracy golden/corpus.jsonl --set finbert_dedup=1,0 --set torch_threads=4,1
+    python -m benchmarks.accuracy golden/corpus.jsonl --set whisper_model=base,tiny --json eval.json
+
+Runs every combination of the --set values (the first value of each is the
+baseline) over a labelled corpus, and reports per configuration:
+
+    label accuracy    calculate_risk_score level (HIGH/MEDIUM/LOW) vs the expected label
+    baseline agree    same level as the baseline configuration on the same item
+    score MAE         vs the expected risk_score, and vs the baseline's score
+    WER               word error rate against the reference transcript (audio items)
+    cost              wall-clock and CPU seconds for transcription and analysis
+
+The corpus is JSONL, one item per line; paths are relative to the file:
+
+    {"id": "ep-101", "audio": "audio/ep-101.mp3", "reference": "text/ep-101.txt", "risk_label": "HIGH", "risk_score": 8}
+    {"id": "clip-7", "transcript": "reference transcript text ...", "risk_label": "LOW", "risk_score": 2}
+
+Items with audio are transcribed; items without are analyzed from their
+reference transcript (which isolates analyzer settings). Nothing is written
+to the results store.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import itertools
+
+import numpy as np
+
+from backend.store import risk_level
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+# Settings that can be varied, and how to parse them from --set
+SETTINGS = {
+    "whisper_model": str,       # tiny / base / small / ... (WHISPER_MODEL)
+    "window_seconds": float,    # decode/transcribe window (AUDIO_WINDOW_SECONDS)
+    "finbert_model": str,       # any text-classification checkpoint (FINBERT_MODEL)
+    "finbert_dedup": _flag,     # MinHash reuse of near-duplicate chunks (FINBERT_DEDUP)
+    "torch_threads": int,       # intra-op threads for both models
+}
+# Settings that change the transcript; configurations that share them reuse it
+TRANSCRIBE_SETTINGS = ("whisper_model", "window_seconds", "torch_threads")
+
+
+# ── Corpus ────────────────────────────────────────────────────────────────────
+
+def load_corpus(path: str, limit: int = None) -> list:
+    base = os.path.dirname(os.path.abspath(path))
+    items = []
+    with open(path) as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            item = json.loads(line)
+            item.setdefault("id", f"line-{n}")
+            if item.get("audio"):
+                item["audio"] = os.path.join(base, item["audio"])
+            if item.get("reference"):
+                with open(os.path.join(base, item["reference"])) as ref:
+                    item["transcript"] = ref.read()
+            if not item.get("audio") and not item.get("transcript"):
+                raise ValueError(f"{path}:{n}: item needs audio or a transcript")
+            items.append(item)
+    return items[:limit] if limit else items
+
+
+# ── Word error rate ───────────────────────────────────────────────────────────
+
+def words(text: str) -> list:
+    return _WORD.findall((text or '').lower())
+
+
+def edit_distance(ref: list, hyp: list) -> int:
+    """Word-level Levenshtein distance, one NumPy row per reference word."""
+    if not ref or not hyp:
+        return len(ref) or len(hyp)
+    vocab = {}
+    r = np.array([vocab.setdefault(w, len(vocab)) for w in ref])
+    h = np.array([vocab.setdefault(w, len(vocab)) for w in hyp])
+    cols = np.arange(len(h) + 1)
+    prev = cols.copy()
+    for i, word in enumerate(r, 1):
+        # Substitution/match and deletion first, then insertions as a running minimum
+        cur = np.empty_like(prev)
+        cur[0] = i
+        cur[1:] = np.minimum(prev[:-1] + (h != word), prev[1:] + 1)
+        prev = np.minimum.accumulate(cur - cols) + cols
+    return int(prev[-1])
+
+
+# ── Running a configuration ───────────────────────────────────────────────────
+
+def apply_settings(config: dict) -> None:
+    from backend import analyzer, transcriber
+    from backend.minhash import NearDuplicateIndex
+
+    if "whisper_model" in config:
+        transcriber.WHISPER_MODEL = config["whisper_model"]
+    if "finbert_model" in config:
+        analyzer.FINBERT_MODEL = config["finbert_model"]
+    if "finbert_dedup" in config:
+        analyzer.FINBERT_DEDUP = config["finbert_dedup"]
+    if "torch_threads" in config:
+        import torch
+        torch.set_num_threads(config["torch_threads"])
+    # No FinBERT result may carry over from the previous configuration
+    analyzer._cached_finbert.cache_clear()
+    analyzer._finbert_seen = NearDuplicateIndex()
+
+
+def _warm_up(items: list) -> None:
+    """Load the configured models now, so loading is not billed to the first item."""
+    from backend.analyzer import get_finbert
+    from backend.transcriber import get_model
+
+    if any(item.get("audio") for item in items):
+        get_model()
+    try:
+        get_finbert()
+    except Exception as e:
+        print(f"  FinBERT unavailable ({e}); its sentiment will be missing from scores")
+
+
+def run_item(item: dict, config: dict, transcripts: dict) -> dict:
+    from backend.analyzer import analyze_transcript
+    from backend.audio import WINDOW_SECONDS
+    from backend.scorer import calculate_risk_score
+    from backend.transcriber import transcribe_audio
+
+    record = {"id": item["id"], "transcribe_wall": 0.0, "transcribe_cpu": 0.0, "audio_seconds": 0.0}
+    try:
+        text = item.get("transcript", "")
+        if item.get("audio"):
+            key = (item["id"], *((k, config[k]) for k in TRANSCRIBE_SETTINGS if k in config))
+            if key not in transcripts:
+                wall, cpu = time.perf_counter(), time.process_time()
+                transcript = transcribe_audio(item["audio"], window_seconds=config.get("window_seconds", WINDOW_SECONDS))
+                transcripts[key] = {
+                    "text": transcript["text"],
+                    "transcribe_wall": time.perf_counter() - wall,
+                    "transcribe_cpu": time.process_time() - cpu,
+                    "audio_seconds": transcript["segments"].duration,
+                }
+            cached = transcripts[key]
+            record.update({k: v for k, v in cached.items() if k != "text"})
+            if item.get("transcript"):
+                ref = words(item["transcript"])
+                record["ref_words"] = len(ref)
+                record["word_errors"] = edit_distance(ref, words(cached["text"]))
+            text = cached["text"]
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        score = calculate_risk_score(analyze_transcript(text))
+        record["analyze_wall"] = time.perf_counter() - wall
+        record["analyze_cpu"] = time.process_time() - cpu
+        record["risk_level"] = risk_level(score["risk_label"])
+        record["risk_score"] = score["risk_score"]
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def summarize(items: list, records: list, baseline: list = None) -> dict:
+    expected = {item["id"]: item for item in items}
+    base = {r["id"]: r for r in (baseline or []) if "error" not in r}
+    ok = [r for r in records if "error" not in r]
+
+    labelled = [r for r in ok if expected[r["id"]].get("risk_label")]
+    scored = [r for r in ok if expected[r["id"]].get("risk_score") is not None]
+    compared = [r for r in ok if r["id"] in base]
+    transcribed = [r for r in ok if "word_errors" in r]
+
+    def mean(values: list):
+        return float(np.mean(values)) if values else None
+
+    total_wall = sum(r["transcribe_wall"] + r["analyze_wall"] for r in ok)
+    audio_seconds = sum(r["audio_seconds"] for r in ok)
+    ref_words = sum(r["ref_words"] for r in transcribed)
+    return {
+        "items": len(records),
+        "errors": len(records) - len(ok),
+        "label_accuracy": mean([r["risk_level"] == risk_level(expected[r["id"]]["risk_label"]) for r in labelled]),
+        "score_mae": mean([abs(r["risk_score"] - expected[r["id"]]["risk_score"]) for r in scored]),
+        "baseline_agreement": mean([r["risk_level"] == base[r["id"]]["risk_level"] for r in compared]),
+        "baseline_score_mae": mean([abs(r["risk_score"] - base[r["id"]]["risk_score"]) for r in compared]),
+        "wer": sum(r["word_errors"] for r in transcribed) / ref_words if ref_words else None,
+        "transcribe_wall": sum(r["transcribe_wall"] for r in ok),
+        "transcribe_cpu": sum(r["transcribe_cpu"] for r in ok),
+        "analyze_wall": sum(r["analyze_wall"] for r in ok),
+        "analyze_cpu": sum(r["analyze_cpu"] for r in ok),
+        "total_wall": total_wall,
+        "rtf": sum(r["transcribe_wall"] for r in ok) / audio_seconds if audio_seconds else None,
+    }
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def parse_grid(assignments: list) -> list:
+    """['a=1,2', 'b=x'] → [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'x'}]; first combination is the baseline."""
+    axes = {}
+    for assignment in assignments:
+        name, _, values = assignment.partition('=')
+        if name not in SETTINGS:
+            raise SystemExit(f"Unknown setting {name!r}; choose from {', '.join(SETTINGS)}")
+        axes[name] = [SETTINGS[name](v) for v in values.split(',') if v]
+    names = list(axes)
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes.values())] or [{}]
+
+
+def _fmt(value, spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def print_report(results: list) -> None:
+    print(f"  {'label':>6} {'agree':>6} {'MAE':>5} {'ΔMAE':>5} {'WER':>6} "
+          f"{'wall s':>8} {'cpu s':>8} {'RTF':>6} {'speedup':>7}  configuration")
+    base_wall = results[0]["summary"]["total_wall"]
+    for entry in results:
+        s = entry["summary"]
+        name = ' '.join(f"{k}={v}" for k, v in entry["config"].items()) or "defaults"
+        speedup = base_wall / s["total_wall"] if s["total_wall"] else None
+        print(f"  {_fmt(s['label_accuracy'], '6.1%')} {_fmt(s['baseline_agreement'], '6.1%')} "
+              f"{_fmt(s['score_mae'], '5.2f')} {_fmt(s['baseline_score_mae'], '5.2f')} {_fmt(s['wer'], '6.1%')} "
+              f"{s['total_wall']:8.1f} {s['transcribe_cpu'] + s['analyze_cpu']:8.1f} "
+              f"{_fmt(s['rtf'], '6.3f')} {_fmt(speedup, '6.2f')}x  {name}"
+              + (f"  ({s['errors']} errors)" if s["errors"] else ""))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', help="golden corpus JSONL")
+    parser.add_argument('--set', dest='settings', action='append', default=[], metavar='NAME=V1,V2',
+                        help=f"vary a setting ({', '.join(SETTINGS)}); repeatable")
+    parser.add_argument('--limit', type=int, default=None, help="only the first N items")
+    parser.add_argument('--json', default=None, help="also write per-item records and summaries here")
+    args = parser.parse_args(argv)
+
+    items = load_corpus(args.corpus, args.limit)
+    grid = parse_grid(args.settings)
+    print(f"{len(items)} items × {len(grid)} configuration(s)")
+
+    transcripts, results = {}, []
+    for config in grid:
+        print(f"Running {config or 'defaults'}...")
+        apply_settings(config)
+        _warm_up(items)
+        records = [run_item(item, config, transcripts) for item in items]
+        baseline = results[0]["records"] if results else None
+        results.append({"config": config, "summary": summarize(items, records, baseline), "records": records})
+
+    print("Results (baseline first):")
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
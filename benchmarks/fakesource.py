@@ -0,0 +1,182 @@
+"""
+Offline stand-in for YouTube, for load tests.
+
+install() swaps extract_metadata and download_audio everywhere the backend
+imported them, so the API, scheduler, queue and workers run unchanged
+against synthetic speech clips. The video ID encodes the clip length:
+
+    https://www.youtube.com/watch?v=00060x00001    # 60 s of audio, request 1
+
+Run a patched API or queue worker in its own process (e.g. to load-test a
+different host or worker count):
+
+    python -m benchmarks.fakesource serve --port 8001
+    QUEUE_URL=sqlite:///data/queue.db python -m benchmarks.fakesource worker --concurrency 2
+
+--simulate-rtf replaces Whisper with a sleep of duration × RTF, which
+measures the serving path (admission, scheduling, coalescing, storage)
+without paying for transcription.
+
+A patched API or worker stores its results, features, watchlist and spool
+under a fresh temporary directory (see isolate_storage()), so fake videos
+never land in data/ and every run starts cold. Pass --storage DIR to keep
+a directory for inspection.
+"""
+import os
+import re
+import sys
+import time
+import wave
+import atexit
+import shutil
+import argparse
+import tempfile
+import threading
+
+from backend.segments import SegmentTable
+from benchmarks.synthetic import make_speech_clip, make_transcript
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIPS_DIR = os.path.join(BENCH_DIR, 'clips')
+
+_FAKE_ID = re.compile(r'^(\d{5})x(\d{5})$')
+# Speech rate used for simulated transcripts
+_WORDS_PER_SECOND = 2.5
+_clip_lock = threading.Lock()
+
+
+def fake_video_id(seconds: int, n: int) -> str:
+    """11-character ID for request n of a clip `seconds` long."""
+    return f"{int(seconds):05d}x{n % 100000:05d}"
+
+
+def fake_video_url(seconds: int, n: int) -> str:
+    return f"https://www.youtube.com/watch?v={fake_video_id(seconds, n)}"
+
+
+def _clip_seconds(url: str) -> tuple:
+    from backend.utils import extract_video_id
+
+    video_id = extract_video_id(url)
+    match = _FAKE_ID.match(video_id or '')
+    if not match:
+        raise ValueError(f"Not a load-test video URL: {url}")
+    return video_id, int(match.group(1))
+
+
+def clip_path(seconds: int) -> str:
+    """The shared synthetic clip for this length, generated on first use."""
+    with _clip_lock:
+        return make_speech_clip(seconds, os.path.join(CLIPS_DIR, f'speech_{seconds}s.wav'), seed=seconds)
+
+
+# Modules that read a storage path from the environment when first imported
+_STORAGE_MODULES = ('backend.store', 'backend.rescoring', 'backend.spool', 'backend.watcher')
+
+
+def isolate_storage(root: str = None) -> str:
+    """
+    Point RESULTS_DB, FEATURES_PATH, WATCHER_DB and SPOOL_ROOT under `root`
+    (a new temporary directory, removed at exit, by default). Must run before
+    anything imports backend.main, which is where those paths are read.
+    """
+    loaded = [m for m in _STORAGE_MODULES if m in sys.modules]
+    if loaded:
+        raise RuntimeError(f"isolate_storage() must run before importing {', '.join(loaded)}")
+    if root is None:
+        root = tempfile.mkdtemp(prefix='finfluencer-loadtest-')
+        atexit.register(shutil.rmtree, root, ignore_errors=True)
+    os.makedirs(root, exist_ok=True)
+    os.environ['RESULTS_DB'] = os.path.join(root, 'results.db')
+    os.environ['FEATURES_PATH'] = os.path.join(root, 'features.bin')
+    os.environ['WATCHER_DB'] = os.path.join(root, 'watcher.db')
+    os.environ['SPOOL_ROOT'] = os.path.join(root, 'spool')
+    return root
+
+
+# ── Fakes ─────────────────────────────────────────────────────────────────────
+
+def extract_metadata(url: str) -> dict:
+    video_id, seconds = _clip_seconds(url)
+    return {
+        "id": video_id,
+        "title": f"Load test clip {video_id}",
+        "duration": seconds,
+        "channel": "loadtest",
+        "channel_id": "loadtest",
+        "upload_date": time.strftime("%Y%m%d"),
+        "availability": "public",
+        "live_status": "not_live",
+        "subtitles": {},
+    }
+
+
+def download_audio(url: str, dest_dir: str) -> tuple:
+    # A private copy, because the pipeline removes the job's spool directory when it is done
+    video_id, seconds = _clip_seconds(url)
+    audio_file = os.path.join(dest_dir, f"{video_id}.wav")
+    shutil.copyfile(clip_path(seconds), audio_file)
+    return audio_file, f"Load test clip {video_id}", seconds
+
+
+def _simulated_transcriber(rtf: float):
+    def transcribe_audio(audio_path: str, **kwargs) -> dict:
+        with wave.open(audio_path) as wf:
+            duration = wf.getnframes() / wf.getframerate()
+        time.sleep(duration * rtf)
+        n_words = int(duration * _WORDS_PER_SECOND)
+        text = make_transcript(n_words, seed=n_words)
+        words = text.split()
+        per_segment = int(_WORDS_PER_SECOND * 5)
+        segments = SegmentTable.from_segments([
+            {"start": i / _WORDS_PER_SECOND, "end": min(duration, (i + per_segment) / _WORDS_PER_SECOND),
+             "text": ' '.join(words[i:i + per_segment])}
+            for i in range(0, len(words), per_segment)
+        ])
+        return {"text": text, "language": "en", "segments": segments, "source": "whisper"}
+
+    return transcribe_audio
+
+
+def install(simulate_rtf: float = None) -> None:
+    """Patch the backend to serve fake videos; call before the app handles requests."""
+    import backend.utils
+    import backend.pipeline
+    import backend.main
+
+    backend.utils.extract_metadata = extract_metadata
+    backend.utils.download_audio = download_audio
+    backend.main.extract_metadata = extract_metadata
+    backend.pipeline.download_audio = download_audio
+    if simulate_rtf is not None:
+        backend.pipeline.transcribe_audio = _simulated_transcriber(simulate_rtf)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('mode', choices=['serve', 'worker'])
+    parser.add_argument('--simulate-rtf', type=float, default=None,
+                        help="skip Whisper and sleep duration × RTF instead")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--storage', default=None,
+                        help="directory for the databases and spool (default: a temporary one)")
+    args, rest = parser.parse_known_args(argv)
+
+    # Workers run the real pipeline, which stores results and features too
+    isolate_storage(args.storage)
+    install(args.simulate_rtf)
+    if args.mode == 'worker':
+        from backend import worker
+        return worker.main(rest)
+
+    import uvicorn
+    from backend.main import app
+    uvicorn.run(app, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
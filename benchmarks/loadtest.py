@@ -0,0 +1,291 @@
+"""
+Offline load test for the API, driven against fake videos (see fakesource.py).
+
+    python -m benchmarks.loadtest --requests 40 --rate 0.5 --concurrency 8 --clips 30 120
+    python -m benchmarks.loadtest --simulate-rtf 0.05 --rate 4      # serving path only
+    python -m benchmarks.loadtest --endpoint jobs --requests 20     # submit + poll
+    python -m benchmarks.loadtest --url http://127.0.0.1:8001       # a `fakesource serve` process
+
+Without --url the API runs in this process on a free port, patched to serve
+synthetic clips and storing into a temporary directory, so nothing touches
+the network or data/. Arrivals are Poisson at
+--rate requests/second (0 = closed loop: --concurrency clients back to back).
+Latency is measured from each request's scheduled arrival, so time spent
+waiting for a free client counts.
+
+Reports throughput, end-to-end p50/p95/p99, error rates by status and
+per-stage p50/p95/p99 from the server's finfluencer_stage_seconds histogram
+(diffed before/after the run). Exits non-zero when throughput is below
+--min-throughput or the error rate is above --max-error-rate.
+"""
+import sys
+import json
+import math
+import time
+import random
+import socket
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from benchmarks.fakesource import clip_path, fake_video_url
+
+STAGE_METRIC = "finfluencer_stage_seconds"
+QUANTILES = (0.5, 0.95, 0.99)
+JOB_POLL_SECONDS = 0.5
+REQUEST_TIMEOUT_SECONDS = 3600
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+# ── Server metrics ────────────────────────────────────────────────────────────
+
+def scrape_stages(client: httpx.Client) -> dict:
+    """stage → {"buckets": {le: cumulative count}, "count", "sum", "errors"} from /metrics."""
+    stages = {}
+    text = client.get("/metrics").text
+    for family in text_string_to_metric_families(text):
+        if family.name not in (STAGE_METRIC, "finfluencer_stage_errors"):
+            continue
+        for sample in family.samples:
+            stage = stages.setdefault(sample.labels.get("stage"), {"buckets": {}, "count": 0, "sum": 0.0, "errors": 0})
+            if sample.name == f"{STAGE_METRIC}_bucket":
+                stage["buckets"][float(sample.labels["le"])] = sample.value
+            elif sample.name == f"{STAGE_METRIC}_count":
+                stage["count"] = sample.value
+            elif sample.name == f"{STAGE_METRIC}_sum":
+                stage["sum"] = sample.value
+            elif sample.name == "finfluencer_stage_errors_total":
+                stage["errors"] = sample.value
+    return stages
+
+
+def histogram_quantile(q: float, buckets: dict) -> float:
+    """Prometheus-style quantile: linear interpolation inside the bucket holding the rank."""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]] if bounds else 0
+    if not total:
+        return 0.0
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for le in bounds:
+        count = buckets[le]
+        if count >= rank:
+            if le == float("inf"):
+                return lower
+            return lower + (le - lower) * (rank - below) / (count - below) if count > below else le
+        lower, below = le, count
+    return lower
+
+
+def stage_report(before: dict, after: dict) -> dict:
+    report = {}
+    for stage, end in sorted(after.items()):
+        start = before.get(stage, {"buckets": {}, "count": 0, "sum": 0.0, "errors": 0})
+        count = end["count"] - start["count"]
+        errors = end["errors"] - start["errors"]
+        if count <= 0 and errors <= 0:
+            continue
+        buckets = {le: n - start["buckets"].get(le, 0) for le, n in end["buckets"].items()}
+        report[stage] = {
+            "count": int(count),
+            "errors": int(errors),
+            "mean": (end["sum"] - start["sum"]) / count if count else 0.0,
+            **{f"p{int(q * 100)}": histogram_quantile(q, buckets) for q in QUANTILES},
+        }
+    return report
+
+
+# ── Load generation ───────────────────────────────────────────────────────────
+
+def _run_analyze(client: httpx.Client, url: str) -> int:
+    return client.post("/analyze", json={"url": url}, params={"fields": "video_id"}).status_code
+
+
+def _run_job(client: httpx.Client, url: str) -> int:
+    response = client.post("/jobs", json={"url": url}, params={"fields": "video_id"})
+    if response.status_code not in (200, 202):
+        return response.status_code
+    job = response.json()
+    while job["status"] not in ("done", "failed"):
+        time.sleep(JOB_POLL_SECONDS)
+        response = client.get(job["status_url"])
+        if response.status_code != 200:
+            return response.status_code
+        job = response.json()
+    return 200 if job["status"] == "done" else 500
+
+
+def run_load(client: httpx.Client, urls: list, endpoint: str, rate: float, concurrency: int) -> dict:
+    """Send one request per URL; returns per-request (status, latency) and wall time."""
+    call = _run_job if endpoint == "jobs" else _run_analyze
+    rng = random.Random(0)
+    samples, lock = [], threading.Lock()
+
+    def one(url: str, scheduled: float) -> None:
+        try:
+            status = call(client, url)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        with lock:
+            samples.append((status, time.perf_counter() - scheduled))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rate > 0:
+            arrival = started
+            for url in urls:
+                arrival += rng.expovariate(rate)
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                pool.submit(one, url, arrival)
+        else:
+            # Closed loop: every slot picks up the next URL as soon as it is free
+            pending = iter(urls)
+            pending_lock = threading.Lock()
+
+            def client_loop() -> None:
+                while True:
+                    with pending_lock:
+                        url = next(pending, None)
+                    if url is None:
+                        return
+                    one(url, time.perf_counter())
+
+            for _ in range(concurrency):
+                pool.submit(client_loop)
+    return {"samples": samples, "wall_seconds": time.perf_counter() - started}
+
+
+def summarize(load: dict) -> dict:
+    statuses = Counter(str(status) for status, _ in load["samples"])
+    ok = sorted(latency for status, latency in load["samples"] if status == 200)
+    total = len(load["samples"])
+    return {
+        "requests": total,
+        "succeeded": len(ok),
+        "wall_seconds": load["wall_seconds"],
+        "throughput_rps": len(ok) / load["wall_seconds"] if load["wall_seconds"] else 0.0,
+        "error_rate": (total - len(ok)) / total if total else 0.0,
+        "statuses": dict(statuses),
+        "latency": {f"p{int(q * 100)}": percentile(ok, q) for q in QUANTILES},
+    }
+
+
+# ── In-process server ─────────────────────────────────────────────────────────
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(simulate_rtf: float = None) -> tuple:
+    """Start the patched API on a free local port; returns (base URL, uvicorn server)."""
+    import uvicorn
+    from benchmarks.fakesource import install, isolate_storage
+
+    # Fake IDs repeat from run to run; a scratch store keeps them out of the
+    # real results and features and keeps earlier runs from answering as cache hits
+    isolate_storage()
+    install(simulate_rtf)
+    from backend.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="loadtest-api", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def print_report(summary: dict, stages: dict) -> None:
+    latency = summary["latency"]
+    print(f"  requests      {summary['requests']} ({summary['succeeded']} ok) in {summary['wall_seconds']:.1f}s")
+    print(f"  throughput    {summary['throughput_rps']:.3f} req/s")
+    print(f"  error rate    {summary['error_rate']:.1%}  {summary['statuses']}")
+    print(f"  end to end    p50 {latency['p50']:.2f}s  p95 {latency['p95']:.2f}s  p99 {latency['p99']:.2f}s")
+    print("Stages (server histograms, bucket-interpolated):")
+    print(f"  {'stage':<28} {'count':>6} {'errors':>6} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for stage, s in stages.items():
+        print(f"  {stage:<28} {s['count']:>6} {s['errors']:>6} "
+              f"{s['p50']:>9.3f}s {s['p95']:>9.3f}s {s['p99']:>9.3f}s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=None, help="API to drive (default: start one in-process)")
+    parser.add_argument('--endpoint', choices=['analyze', 'jobs'], default='analyze')
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--rate', type=float, default=0.0, help="Poisson arrivals per second (0 = closed loop)")
+    parser.add_argument('--concurrency', type=int, default=4, help="client connections")
+    parser.add_argument('--clips', type=int, nargs='+', default=[30, 120], help="clip lengths in seconds")
+    parser.add_argument('--duplicates', type=float, default=0.0,
+                        help="fraction of requests that repeat an earlier video (exercises coalescing)")
+    parser.add_argument('--simulate-rtf', type=float, default=None,
+                        help="skip Whisper in the in-process API and sleep duration × RTF instead")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', default=None, help="also write the report to this file")
+    parser.add_argument('--min-throughput', type=float, default=None, help="fail below this many req/s")
+    parser.add_argument('--max-error-rate', type=float, default=None, help="fail above this error rate")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    urls = []
+    for n in range(args.requests):
+        if urls and rng.random() < args.duplicates:
+            urls.append(rng.choice(urls))
+        else:
+            urls.append(fake_video_url(rng.choice(args.clips), args.seed * args.requests + n))
+
+    print("Preparing clips...")
+    for seconds in set(args.clips):
+        clip_path(seconds)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        base_url, server = start_local_server(args.simulate_rtf)
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    with httpx.Client(base_url=base_url, timeout=REQUEST_TIMEOUT_SECONDS, limits=limits) as client:
+        before = scrape_stages(client)
+        print(f"Driving {base_url}: {args.requests} requests to /{args.endpoint}, "
+              f"rate {args.rate or 'closed loop'}, concurrency {args.concurrency}")
+        load = run_load(client, urls, args.endpoint, args.rate, args.concurrency)
+        after = scrape_stages(client)
+
+    if server is not None:
+        server.should_exit = True
+
+    summary = summarize(load)
+    stages = stage_report(before, after)
+    print_report(summary, stages)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"config": vars(args), "summary": summary, "stages": stages}, f, indent=2)
+
+    failed = False
+    if args.min_throughput is not None and summary["throughput_rps"] < args.min_throughput:
+        print(f"Throughput {summary['throughput_rps']:.3f} req/s is below {args.min_throughput}")
+        failed = True
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        print(f"Error rate {summary['error_rate']:.1%} is above {args.max_error_rate:.1%}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
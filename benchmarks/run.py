@@ -0,0 +1,159 @@
+"""
+Offline benchmarks for the analyzer, scorer and transcriber hot paths.
+
+    python -m benchmarks.run                      # run and compare to baseline
+    python -m benchmarks.run --save               # run and overwrite the baseline
+    python -m benchmarks.run --skip-transcribe    # analyzer/scorer only
+
+Exits non-zero when any benchmark is slower than baseline by more than
+--threshold (default 25%).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+
+from backend.analyzer import (
+    _chunk_text_with_overlap,
+    compute_hype_score,
+    detect_disclaimers,
+    detect_exaggerated_claims,
+    detect_hype_keywords,
+)
+from backend.scorer import calculate_risk_score
+from benchmarks.synthetic import make_speech_clip, make_transcript
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+CLIPS_DIR = os.path.join(BENCH_DIR, 'clips')
+
+TRANSCRIPT_SIZES = [1_000, 10_000, 50_000, 200_000]
+CLIP_SECONDS = [10, 60, 300]
+
+# Stand-in for FinBERT output so scoring benchmarks stay model-free
+_FINBERT_RESULT = {"sentiment": "positive", "confidence": 0.81, "positive_ratio": 0.6,
+                   "positive_chunks": 3, "negative_chunks": 0, "neutral_chunks": 2, "total_chunks": 5}
+
+
+def _time(fn, repeat: int) -> dict:
+    fn()  # warm-up (regex compilation, lazy imports)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"median": statistics.median(samples), "min": min(samples), "repeat": repeat}
+
+
+# ── Benchmarks ────────────────────────────────────────────────────────────────
+
+def bench_analyzer(sizes: list, repeat: int) -> dict:
+    results = {}
+    for n in sizes:
+        text = make_transcript(n, seed=n)
+        hype = detect_hype_keywords(text)
+        disclaimers = detect_disclaimers(text)
+        exaggerations = detect_exaggerated_claims(text)
+        analysis = {
+            "hype_analysis": hype,
+            "disclaimer_analysis": disclaimers,
+            "exaggeration_analysis": exaggerations,
+            "finbert_analysis": _FINBERT_RESULT,
+        }
+
+        cases = {
+            "detect_hype_keywords": lambda: detect_hype_keywords(text),
+            "detect_disclaimers": lambda: detect_disclaimers(text),
+            "detect_exaggerated_claims": lambda: detect_exaggerated_claims(text),
+            "chunk_text": lambda: _chunk_text_with_overlap(text),
+            "compute_hype_score": lambda: compute_hype_score(hype, disclaimers, exaggerations, _FINBERT_RESULT),
+            "calculate_risk_score": lambda: calculate_risk_score(analysis),
+        }
+        for name, fn in cases.items():
+            key = f"{name}[{n}w]"
+            results[key] = _time(fn, repeat)
+            print(f"  {key:<40} {results[key]['median'] * 1000:10.3f} ms")
+    return results
+
+
+def bench_transcriber(clip_seconds: list, repeat: int) -> dict:
+    try:
+        from backend.transcriber import get_model, transcribe_audio
+        # Whisper is imported on first use; loading here also keeps model load out of the timings
+        get_model()
+    except ImportError as e:
+        print(f"  skipping transcriber benchmarks: {e}")
+        return {}
+
+    results = {}
+    for seconds in clip_seconds:
+        path = make_speech_clip(seconds, os.path.join(CLIPS_DIR, f'speech_{seconds}s.wav'), seed=seconds)
+        key = f"transcribe_audio[{seconds}s]"
+        results[key] = _time(lambda: transcribe_audio(path), repeat)
+        print(f"  {key:<40} {results[key]['median']:10.3f} s")
+    return results
+
+
+# ── Baselines ─────────────────────────────────────────────────────────────────
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return the benchmarks whose median regressed past the threshold."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        ratio = current["median"] / base["median"] if base["median"] else 1.0
+        marker = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"  {key:<40} {ratio:6.2f}x baseline {marker}")
+        if marker:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--sizes', type=int, nargs='+', default=TRANSCRIPT_SIZES)
+    parser.add_argument('--clips', type=int, nargs='+', default=CLIP_SECONDS)
+    parser.add_argument('--skip-transcribe', action='store_true')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown vs baseline before failing (0.25 = 25%%)")
+    parser.add_argument('--save', action='store_true', help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    print("Analyzer / scorer:")
+    results = bench_analyzer(args.sizes, args.repeat)
+    if not args.skip_transcribe:
+        print("Transcriber:")
+        results.update(bench_transcriber(args.clips, max(1, args.repeat // 2)))
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform()},
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    print(f"Compared to baseline (threshold {args.threshold:.0%}):")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import os
+import math
+import wave
+import random
+
+import numpy as np
+
+from backend.analyzer import HYPE_KEYWORDS, DISCLAIMER_PHRASES
+
+SAMPLE_RATE = 16000
+
+# Filler vocabulary for the non-hit parts of a transcript
+_FILLER = (
+    "the market stock price company earnings quarter revenue growth chart "
+    "today we are going to look at this index fund portfolio dividend yield "
+    "and that is why I think you should consider the long term trend here "
+    "interest rates inflation bond sector valuation analyst report guidance"
+).split()
+
+# Phrases that trip detect_exaggerated_claims
+_EXAGGERATIONS = [
+    "10x return", "50% profit", "$5,000 in one week", "double your money",
+    "never lose", "guaranteed returns", "quit your job", "retire early",
+    "passive income", "risk-free", "they don't want you to know",
+    "once in a lifetime",
+]
+
+
+# ── Transcripts ───────────────────────────────────────────────────────────────
+
+def make_transcript(n_words: int, hit_rate: float = 0.02, seed: int = 0) -> str:
+    """
+    Deterministic pseudo-transcript of roughly n_words words.
+
+    About hit_rate of the words start a lexicon hit (hype keyword,
+    exaggeration or disclaimer) so every detector has real work to do.
+    """
+    rng = random.Random(seed)
+    lexicon = HYPE_KEYWORDS + _EXAGGERATIONS + DISCLAIMER_PHRASES[:3]
+    words = []
+    while len(words) < n_words:
+        if rng.random() < hit_rate:
+            words.extend(rng.choice(lexicon).split())
+        else:
+            words.append(rng.choice(_FILLER))
+        if rng.random() < 0.08:
+            words[-1] += "."
+    return ' '.join(words[:n_words])
+
+
+# ── Audio clips ───────────────────────────────────────────────────────────────
+
+def _syllable(rng: np.random.Generator, seconds: float) -> np.ndarray:
+    """A voiced, vowel-like burst: harmonic source shaped by two formants."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = rng.uniform(100, 220)
+    f1, f2 = rng.uniform(300, 900), rng.uniform(900, 2500)
+    signal = np.zeros_like(t)
+    for h in range(1, 20):
+        freq = f0 * h
+        gain = math.exp(-((freq - f1) / 200) ** 2) + 0.6 * math.exp(-((freq - f2) / 300) ** 2) + 0.02
+        signal += gain * np.sin(2 * np.pi * freq * t)
+    envelope = np.sin(np.pi * t / seconds) ** 2
+    return signal * envelope
+
+
+def make_speech_clip(seconds: float, path: str, seed: int = 0) -> str:
+    """
+    Write a deterministic speech-like 16 kHz mono WAV of the given length.
+
+    Clips are generated on demand and reused, so the repo does not carry
+    binary fixtures.
+    """
+    if os.path.exists(path):
+        return path
+
+    rng = np.random.default_rng(seed)
+    n_samples = int(seconds * SAMPLE_RATE)
+    parts, filled = [], 0
+    while filled < n_samples:
+        syl = _syllable(rng, rng.uniform(0.12, 0.3))
+        gap = np.zeros(int(rng.uniform(0.03, 0.25) * SAMPLE_RATE))
+        parts.extend([syl, gap])
+        filled += len(syl) + len(gap)
+
+    audio = np.concatenate(parts)[:n_samples]
+    audio += rng.normal(0, 0.005, n_samples)
+    audio = audio / np.max(np.abs(audio)) * 0.6
+    pcm = (audio * 32767).astype(np.int16)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(pcm.tobytes())
+    return path
@@ -1,10 +1,17 @@
 import streamlit as st
 import requests
 import plotly.graph_objects as go
-import time
+import re
+import html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-API_URL = "http://127.0.0.1:8000/analyze"
-CHAT_URL = "http://127.0.0.1:8000/api/chat"
+API_BASE = "http://127.0.0.1:8000"
+JOBS_URL = f"{API_BASE}/jobs"
+RESULTS_URL = f"{API_BASE}/results"
+CHAT_URL = f"{API_BASE}/api/chat"
+
+POLL_INTERVAL_SECONDS = 1.0
 
 st.set_page_config(
     page_title="SENTINEL — Finfluencer Risk Intelligence",
@@ -108,6 +115,10 @@ html, body, [data-testid="stAppViewContainer"] {
 .kw-tag { display: inline-block; padding: 3px 10px; margin: 3px; border: 1px solid var(--danger); color: var(--danger); font-family: 'Share Tech Mono', monospace; font-size: 0.65rem; letter-spacing: 1px; background: rgba(255,45,85,0.08); }
 
 .transcript-box { background: #030a10; border: 1px solid var(--border); border-radius: 2px; padding: 1.2rem; font-family: 'Share Tech Mono', monospace; font-size: 0.75rem; line-height: 1.8; color: var(--text); max-height: 200px; overflow-y: auto; }
+.transcript-box mark { padding: 1px 3px; border-radius: 2px; }
+.transcript-box mark.hl-hype       { background: rgba(255,45,85,0.3);  color: var(--danger); }
+.transcript-box mark.hl-claim      { background: rgba(255,184,0,0.25); color: var(--warn); }
+.transcript-box mark.hl-disclaimer { background: rgba(0,255,136,0.15); color: var(--accent2); }
 .transcript-box::-webkit-scrollbar { width: 4px; }
 .transcript-box::-webkit-scrollbar-track { background: var(--panel); }
 .transcript-box::-webkit-scrollbar-thumb { background: var(--border); }
@@ -188,6 +199,64 @@ if "chat_history" not in st.session_state:
     st.session_state.chat_history = [
         {"role": "assistant", "content": "Online. Ask me how the app works, what the risk score means, or finance safety tips."}
     ]
+if "results" not in st.session_state:
+    st.session_state.results = {}          # video_id → analysis result
+if "current_video" not in st.session_state:
+    st.session_state.current_video = None
+if "active_job" not in st.session_state:
+    st.session_state.active_job = None
+if "job_error" not in st.session_state:
+    st.session_state.job_error = None
+
+
+# ─────────────────────────────────────────────
+# API CLIENT
+# ─────────────────────────────────────────────
+@st.cache_resource
+def http_session():
+    """One pooled, keep-alive session shared by every browser session."""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+_VIDEO_ID = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})')
+
+def video_id_from_url(url):
+    match = _VIDEO_ID.search(url)
+    return match.group(1) if match else None
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def fetch_stored_result(video_id):
+    # Raises on 404 so "not analyzed yet" is never cached
+    resp = http_session().get(f"{RESULTS_URL}/{video_id}", timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+def lookup_result(video_id):
+    """Result for a video from this session, the shared cache, or the API's store."""
+    if video_id in st.session_state.results:
+        return st.session_state.results[video_id]
+    try:
+        return fetch_stored_result(video_id)
+    except requests.exceptions.RequestException:
+        return None
+
+def remember_result(result):
+    video_id = result.get('video_id')
+    st.session_state.results[video_id] = result
+    st.session_state.current_video = video_id
+
+def show_connection_error():
+    st.markdown("""
+    <div class="panel panel-danger">
+        <div class="panel-label">CONNECTION ERROR</div>
+        <div style="font-family:'Share Tech Mono',monospace;color:#ff2d55;">
+        ❌ Cannot reach API at 127.0.0.1:8000 — ensure FastAPI is running
+        </div>
+    </div>""", unsafe_allow_html=True)
 
 
 # ─────────────────────────────────────────────
@@ -287,14 +356,23 @@ def make_bar_chart(data):
     )
     return fig
 
-def highlight_transcript(text, keywords):
-    if not keywords: return text
-    import re
-    for kw_obj in keywords:
-        kw = kw_obj['keyword']
-        highlighted = f'<mark style="background:rgba(255,45,85,0.3);color:#ff2d55;padding:1px 3px;border-radius:2px;">{kw}</mark>'
-        text = re.sub(re.escape(kw), highlighted, text, flags=re.IGNORECASE)
-    return text
+def highlight_transcript(text, spans):
+    """
+    Escape text and wrap detector hits in <mark>, in one pass.
+
+    spans are the API's sorted, non-overlapping [start, end, kind] offsets
+    into the transcript; any past the end of text (e.g. a preview) are ignored.
+    """
+    parts, pos = [], 0
+    for start, end, kind in spans or []:
+        if start >= len(text):
+            break
+        end = min(end, len(text))
+        parts.append(html.escape(text[pos:start]))
+        parts.append(f'<mark class="hl-{kind}">{html.escape(text[start:end])}</mark>')
+        pos = end
+    parts.append(html.escape(text[pos:]))
+    return ''.join(parts)
 
 def derive_subscores(data):
     hype_unique = len(data.get('hype_keywords_found', []))
@@ -373,49 +451,97 @@ with col_btn:
 # ─────────────────────────────────────────────
 # ANALYSIS PIPELINE
 # ─────────────────────────────────────────────
-if analyze_btn and url:
-    pipeline_placeholder = st.empty()
-    steps = ["DOWNLOAD", "EXTRACT AUDIO", "WHISPER ASR", "FINBERT NLP", "RISK SCORE", "COMPLETE"]
-
-    for i in range(len(steps)):
-        html = '<div class="pipeline">'
-        for j, step in enumerate(steps):
-            if j < i:    html += f'<span class="pipe-step done">✓ {step}</span>'
-            elif j == i: html += f'<span class="pipe-step active">⟳ {step}</span>'
-            else:        html += f'<span class="pipe-step">{step}</span>'
-            if j < len(steps)-1: html += '<span class="pipe-arrow">▶</span>'
-        html += '</div>'
-        pipeline_placeholder.markdown(html, unsafe_allow_html=True)
-        time.sleep(0.3)
-
-    with st.spinner(""):
-        try:
-            response = requests.post(API_URL, json={"url": url}, timeout=300)
-            data = response.json()
-        except requests.exceptions.ConnectionError:
-            st.markdown("""
-            <div class="panel panel-danger">
-                <div class="panel-label">CONNECTION ERROR</div>
-                <div style="font-family:'Share Tech Mono',monospace;color:#ff2d55;">
-                ❌ Cannot reach API at 127.0.0.1:8000 — ensure FastAPI is running
-                </div>
-            </div>""", unsafe_allow_html=True)
-            st.stop()
-        except Exception as e:
-            st.error(f"Error: {str(e)}")
-            st.stop()
-
-    if response.status_code != 200:
-        st.error(f"API Error: {data.get('detail', 'Unknown')}")
-        st.stop()
+PIPELINE_STEPS = ["METADATA", "QUEUED", "FETCH AUDIO", "WHISPER ASR", "FINBERT NLP", "RISK SCORE", "COMPLETE"]
+STAGE_STEP = {
+    "metadata": 0, "queued": 1, "captions": 2, "download": 2,
+    "transcribe": 3, "analyze": 4, "scoring": 5, "done": 6,
+}
 
-    # Complete pipeline
+def render_pipeline(placeholder, current):
     html = '<div class="pipeline">'
-    for j, step in enumerate(steps):
-        html += f'<span class="pipe-step done">✓ {step}</span>'
-        if j < len(steps)-1: html += '<span class="pipe-arrow">▶</span>'
+    for j, step in enumerate(PIPELINE_STEPS):
+        if j < current or current == len(PIPELINE_STEPS) - 1:
+            html += f'<span class="pipe-step done">✓ {step}</span>'
+        elif j == current:
+            html += f'<span class="pipe-step active">⟳ {step}</span>'
+        else:
+            html += f'<span class="pipe-step">{step}</span>'
+        if j < len(PIPELINE_STEPS)-1: html += '<span class="pipe-arrow">▶</span>'
     html += '</div>'
-    pipeline_placeholder.markdown(html, unsafe_allow_html=True)
+    placeholder.markdown(html, unsafe_allow_html=True)
+
+def submit_job(url):
+    """Start an analysis; returns immediately with a job to poll (or a finished one)."""
+    try:
+        resp = http_session().post(JOBS_URL, json={"url": url}, timeout=60)
+        job = resp.json()
+    except requests.exceptions.ConnectionError:
+        show_connection_error()
+        st.stop()
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+        st.stop()
+
+    if resp.status_code not in (200, 202):
+        st.error(f"API Error: {job.get('detail', 'Unknown')}")
+        st.stop()
+
+    if job['status'] == 'done':
+        remember_result(job['result'])
+    else:
+        st.session_state.active_job = job['job_id']
+
+@st.fragment(run_every=POLL_INTERVAL_SECONDS)
+def job_progress():
+    """Polls the running job without blocking the rest of the page."""
+    job_id = st.session_state.active_job
+    if not job_id:
+        return
+    placeholder = st.empty()
+    try:
+        resp = http_session().get(f"{JOBS_URL}/{job_id}", timeout=10)
+    except requests.exceptions.RequestException:
+        st.caption("Waiting for the API…")
+        return
+
+    if resp.status_code == 404:
+        st.session_state.active_job = None
+        st.session_state.job_error = "Analysis job expired — please submit the video again"
+        st.rerun()
+
+    job = resp.json()
+    render_pipeline(placeholder, STAGE_STEP.get(job['stage'], 0))
+    eta = job.get('estimated_seconds')
+    st.caption(f"{job['stage'].upper()} · {job['elapsed_seconds']:.0f}s elapsed" + (f" · ~{eta:.0f}s estimated" if eta else ""))
+
+    if job['status'] == 'done':
+        remember_result(job['result'])
+        st.session_state.active_job = None
+        st.rerun()
+    elif job['status'] == 'failed':
+        st.session_state.active_job = None
+        st.session_state.job_error = job.get('error') or 'Unknown'
+        st.rerun()
+
+if analyze_btn and url:
+    video_id = video_id_from_url(url)
+    cached = lookup_result(video_id) if video_id else None
+    if cached:
+        remember_result(cached)
+    else:
+        submit_job(url)
+
+if st.session_state.active_job:
+    job_progress()
+
+if st.session_state.job_error:
+    st.error(f"API Error: {st.session_state.job_error}")
+    st.session_state.job_error = None
+
+data = None if st.session_state.active_job else st.session_state.results.get(st.session_state.current_video)
+
+if data:
+    render_pipeline(st.empty(), len(PIPELINE_STEPS) - 1)
 
     score     = data['risk_score']
     subscores = derive_subscores(data)
@@ -536,8 +662,7 @@ if analyze_btn and url:
 
     with col7:
         st.markdown('<div class="panel-label">TRANSCRIPT INTELLIGENCE — RISKY PHRASES HIGHLIGHTED</div>', unsafe_allow_html=True)
-        raw         = data.get('transcript_preview', '') + '...'
-        highlighted = highlight_transcript(raw, data.get('hype_keywords_found', []))
+        highlighted = highlight_transcript(data.get('transcript_preview', ''), data.get('highlights')) + '...'
         st.markdown(f'<div class="transcript-box">{highlighted}</div>', unsafe_allow_html=True)
 
     # ── FOOTER ──
@@ -550,7 +675,7 @@ if analyze_btn and url:
         <span>FOR EDUCATIONAL USE ONLY — NOT FINANCIAL ADVICE</span>
     </div>""", unsafe_allow_html=True)
 
-elif not analyze_btn:
+elif not st.session_state.active_job:
     st.markdown("""
     <div style="text-align:center;padding:4rem 2rem;">
         <div style="font-family:'Orbitron',monospace;font-size:3rem;color:rgba(0,212,255,0.15);letter-spacing:8px;margin-bottom:1rem;">AWAITING TARGET</div>
@@ -590,8 +715,9 @@ with chat_container:
     for msg in st.session_state.chat_history:
         with st.chat_message(msg["role"]):
             text_color = "#a8c8e0" if msg["role"] == "assistant" else "#00d4ff"
+            content    = html.escape(msg["content"]).replace("\n", "<br>")
             st.markdown(
-                f'<span style="font-family:\'Share Tech Mono\',monospace;font-size:0.75rem;color:{text_color};">{msg["content"]}</span>',
+                f'<span style="font-family:\'Share Tech Mono\',monospace;font-size:0.75rem;color:{text_color};">{content}</span>',
                 unsafe_allow_html=True
             )
 
@@ -604,9 +730,9 @@ with chat_col:
         # Try Gemini API first, fall back to local answers
         reply = None
         try:
-            resp = requests.post(
+            resp = http_session().post(
                 CHAT_URL,
-                json={"messages": st.session_state.chat_history},
+                json={"messages": st.session_state.chat_history, "video_id": st.session_state.current_video},
                 timeout=15
             )
             if resp.status_code == 200:
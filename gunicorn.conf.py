@@ -0,0 +1,37 @@
+# Multi-worker API serving with models shared across workers (see backend/serving.py).
+#
+#     gunicorn backend.main:app                                              # one worker
+#     QUEUE_URL=sqlite:///data/queue.db WEB_CONCURRENCY=8 gunicorn backend.main:app
+#
+# With QUEUE_URL, queued YouTube jobs run in `python -m backend.worker
+# --processes N`, which shares its models across its own processes; the models
+# loaded here serve uploads, local files and profiled requests.
+#
+# Run the channel watcher (WATCH_CHANNELS) in a single separate process, not
+# here: every worker would otherwise poll the same channels.
+import os
+
+from backend import serving
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# More than one worker requires QUEUE_URL, so job state is shared between them
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))
+graceful_timeout = 60
+
+serving.check_worker_count(workers)
+serving.prepare_metrics_dir()
+
+
+def on_starting(server):
+    serving.preload_models()
+
+
+def post_fork(server, worker):
+    serving.configure_worker(workers)
+
+
+def child_exit(server, worker):
+    serving.worker_exited(worker.pid)
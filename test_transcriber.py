@@ -1,4 +1,5 @@
 from backend.utils import download_audio
+from backend.spool import spool
 from backend.transcriber import transcribe_audio
 from backend.analyzer import analyze_transcript
 from backend.scorer import calculate_risk_score
@@ -6,11 +7,12 @@ from backend.scorer import calculate_risk_score
 TEST_URL = "https://www.youtube.com/watch?v=2T0OUIW89II"
 
 print("Step 1: Downloading audio...")
-audio_path, title, duration = download_audio(TEST_URL)
-print(f"Downloaded: {title}")
+with spool.job("download") as job_dir:
+    audio_path, title, duration = download_audio(TEST_URL, job_dir)
+    print(f"Downloaded: {title}")
 
-print("\nStep 2: Transcribing...")
-transcript = transcribe_audio(audio_path)
+    print("\nStep 2: Transcribing...")
+    transcript = transcribe_audio(audio_path)
 print(f"Language: {transcript['language']}")
 print(f"Words: {len(transcript['text'].split())}")
 
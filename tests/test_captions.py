@@ -0,0 +1,152 @@
+import os
+import json
+
+import pytest
+
+from backend import captions
+from backend.captions import (
+    MIN_WORDS, MIN_WORDS_PER_MINUTE, _is_good, _pick_track, fetch_caption_transcript, parse_json3, parse_vtt,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "captions")
+
+
+def fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+# ── Parsers ───────────────────────────────────────────────────────────────────
+
+def test_json3_keeps_overlapping_cues_and_drops_empty_ones():
+    segments = parse_json3(fixture("overlapping.json3"))
+    assert segments == [
+        {"id": 0, "start": 1.2, "end": 4.2, "text": "Buy now & hold"},
+        {"id": 1, "start": 3.5, "end": 6.0, "text": "this coin will 10x"},
+        {"id": 2, "start": 8.0, "end": 8.0, "text": "Not financial advice."},
+    ]
+
+
+def test_json3_without_text_is_empty():
+    assert parse_json3(fixture("empty.json3")) == []
+    assert parse_json3('{}') == []
+
+
+def test_vtt_keeps_overlapping_cues_and_drops_empty_ones():
+    segments = parse_vtt(fixture("overlapping.vtt"))
+    assert segments == [
+        {"id": 0, "start": 1.2, "end": 4.2, "text": "Buy now & hold"},
+        {"id": 1, "start": 3.5, "end": 6.0, "text": "this coin will 10x"},
+        {"id": 2, "start": 3723.456, "end": 3725.0, "text": "Not financial advice."},
+    ]
+
+
+def test_vtt_short_timestamps_and_crlf():
+    assert parse_vtt(fixture("crlf.vtt")) == [
+        {"id": 0, "start": 0.0, "end": 2.5, "text": "Short form, no hours"},
+    ]
+
+
+def test_vtt_without_cues_is_empty():
+    assert parse_vtt("WEBVTT\n\nNOTE nothing here\n") == []
+    assert parse_vtt("") == []
+
+
+# ── Track selection ───────────────────────────────────────────────────────────
+
+def track(ext: str, url: str = "https://example.com/t") -> dict:
+    return {"ext": ext, "url": url}
+
+
+def test_pick_track_prefers_the_video_language_then_english():
+    info = {
+        "language": "de",
+        "subtitles": {"fr": [track("vtt")], "en-US": [track("vtt")], "de-DE": [track("vtt")]},
+    }
+    assert _pick_track(info)[0] == "de-DE"
+    assert _pick_track({**info, "language": None})[0] == "en-US"
+    assert _pick_track({"subtitles": {"fr": [track("vtt")], "es": [track("vtt")]}})[0] == "fr"
+
+
+def test_pick_track_prefers_json3_over_vtt():
+    info = {"subtitles": {"en": [track("srv3"), track("vtt", "v"), track("json3", "j")]}}
+    assert _pick_track(info) == ("en", track("json3", "j"))
+
+
+@pytest.mark.parametrize("subtitles", [
+    None,
+    {},
+    {"en": []},
+    {"live_chat": [track("json3")]},
+    {"en": [track("srv3"), track("ttml")]},
+    {"en": [{"ext": "vtt"}]},
+])
+def test_pick_track_without_a_usable_track(subtitles):
+    info = {"subtitles": subtitles, "automatic_captions": {"en": [track("json3")]}}
+    assert _pick_track(info) is None
+    assert not captions.has_manual_captions(info)
+
+
+# ── Density thresholds ────────────────────────────────────────────────────────
+
+def words(n: int) -> list:
+    return [{"text": ' '.join(["word"] * n)}]
+
+
+def test_is_good_needs_min_words():
+    assert not _is_good(words(MIN_WORDS - 1), 0)
+    assert _is_good(words(MIN_WORDS), 0)
+    assert not _is_good([], 0)
+
+
+def test_is_good_needs_min_words_per_minute():
+    n = MIN_WORDS * 2
+    minutes_at_threshold = n / MIN_WORDS_PER_MINUTE
+    assert _is_good(words(n), minutes_at_threshold * 60)
+    assert not _is_good(words(n), minutes_at_threshold * 60 + 1)
+
+
+# ── Fetch ─────────────────────────────────────────────────────────────────────
+
+class FakeYDL:
+    body = b""
+
+    def __init__(self, opts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def urlopen(self, url):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self
+
+    def read(self):
+        return self.body
+
+
+@pytest.fixture
+def ydl(monkeypatch):
+    monkeypatch.setattr(captions.yt_dlp, "YoutubeDL", FakeYDL)
+    return FakeYDL
+
+
+def test_fetch_builds_a_transcript_from_captions(ydl):
+    cues = [{"tStartMs": i * 2000, "dDurationMs": 2000, "segs": [{"utf8": "one two three four five"}]}
+            for i in range(12)]
+    ydl.body = json.dumps({"events": cues}).encode()
+    transcript = fetch_caption_transcript({"duration": 24, "subtitles": {"en-GB": [track("json3")]}})
+    assert transcript["source"] == "captions"
+    assert transcript["language"] == "en"
+    assert len(transcript["text"].split()) == 60
+    assert len(transcript["segments"]) == 12
+
+
+@pytest.mark.parametrize("body", [fixture("overlapping.vtt").encode(), OSError("HTTP Error 404")])
+def test_fetch_falls_back_on_sparse_or_missing_captions(ydl, body):
+    ydl.body = body
+    assert fetch_caption_transcript({"duration": 600, "subtitles": {"en": [track("vtt")]}}) is None
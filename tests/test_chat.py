@@ -0,0 +1,52 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+
+
+@pytest.fixture
+def client(monkeypatch):
+    asked = []
+
+    def answer(video_id, question):
+        asked.append((video_id, question))
+        return {"reply": f"about {question}"} if video_id == "known" else None
+
+    monkeypatch.setattr(main, "answer", answer)
+    client = TestClient(main.app)
+    client.asked = asked
+    return client
+
+
+def test_chat_answers_the_latest_user_message(client):
+    response = client.post("/api/chat", json={"video_id": "known", "messages": [
+        {"role": "assistant", "content": "Online."},
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "reply"},
+        {"role": "user", "content": "second"},
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {"reply": "about second"}
+    assert client.asked == [("known", "second")]
+
+
+@pytest.mark.parametrize("messages", [
+    ["not a message"],
+    [{"role": "user"}],
+    [{"role": "robot", "content": "hi"}],
+    [{"role": "user", "content": ["a", "list"]}],
+])
+def test_malformed_messages_are_rejected(client, messages):
+    response = client.post("/api/chat", json={"video_id": "known", "messages": messages})
+    assert response.status_code == 422
+    assert client.asked == []
+
+
+@pytest.mark.parametrize("body, status", [
+    ({"messages": [{"role": "user", "content": "hi"}]}, 400),
+    ({"video_id": "known", "messages": [{"role": "assistant", "content": "hi"}]}, 400),
+    ({"video_id": "known", "messages": [{"role": "user", "content": "   "}]}, 400),
+    ({"video_id": "unknown", "messages": [{"role": "user", "content": "hi"}]}, 404),
+])
+def test_chat_errors(client, body, status):
+    assert client.post("/api/chat", json=body).status_code == status
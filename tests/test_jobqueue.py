@@ -0,0 +1,203 @@
+import pytest
+
+from backend import jobqueue
+from backend.jobqueue import RedisQueue, SQLiteQueue, backoff_seconds
+
+
+class Clock:
+    """Stands in for the time module inside backend.jobqueue."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(jobqueue, "time", clock)
+    # Backoff without jitter, so retry times are exact
+    monkeypatch.setattr(jobqueue.random, "uniform", lambda a, b: 1.0)
+    return clock
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request, tmp_path, clock):
+    if request.param == "sqlite":
+        return SQLiteQueue(str(tmp_path / "queue.db"))
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return RedisQueue("redis://", client=fakeredis.FakeRedis(decode_responses=True))
+
+
+def test_lease_takes_lowest_priority_first(queue):
+    slow = queue.enqueue({"url": "slow"}, priority=300)
+    fast = queue.enqueue({"url": "fast"}, priority=5)
+
+    job = queue.lease("w1", lease_seconds=60)
+    assert job["job_id"] == fast
+    assert job["payload"] == {"url": "fast"}
+    assert job["state"] == "leased"
+    assert job["attempts"] == 1
+    assert queue.lease("w2", lease_seconds=60)["job_id"] == slow
+    assert queue.lease("w3", lease_seconds=60) is None
+    assert queue.depth() == 0
+
+
+def test_dedupe_key_collapses_unfinished_jobs(queue):
+    first = queue.enqueue({"url": "a"}, dedupe_key="vid")
+    assert queue.enqueue({"url": "a"}, dedupe_key="vid") == first
+
+    queue.lease("w1", lease_seconds=60)
+    assert queue.enqueue({"url": "a"}, dedupe_key="vid") == first
+
+    queue.complete(first, "w1", {"result": {"video_id": "vid"}})
+    again = queue.enqueue({"url": "a"}, dedupe_key="vid")
+    assert again != first
+    assert queue.enqueue({"url": "b"}) != queue.enqueue({"url": "b"})
+
+
+def test_heartbeat_extends_only_the_owners_lease(queue, clock):
+    job_id = queue.enqueue({"url": "a"})
+    queue.lease("w1", lease_seconds=60)
+
+    clock.now += 50
+    assert queue.heartbeat(job_id, "w1", lease_seconds=60)
+    assert not queue.heartbeat(job_id, "w2", lease_seconds=60)
+
+    # 100 s after leasing, but only 50 s after the heartbeat: still held
+    clock.now += 50
+    assert queue.lease("w2", lease_seconds=60) is None
+    assert queue.get(job_id)["lease_owner"] == "w1"
+
+
+def test_expired_lease_is_requeued_then_failed(queue, clock):
+    job_id = queue.enqueue({"url": "a"}, max_attempts=2)
+    queue.lease("w1", lease_seconds=60)
+
+    clock.now += 61
+    job = queue.lease("w2", lease_seconds=60)
+    assert job["job_id"] == job_id
+    assert job["attempts"] == 2
+    assert not queue.heartbeat(job_id, "w1", lease_seconds=60)
+    assert not queue.complete(job_id, "w1", {"result": {}})
+
+    clock.now += 61
+    assert queue.lease("w3", lease_seconds=60) is None
+    job = queue.get(job_id)
+    assert job["state"] == "failed"
+    assert job["error"] == "lease expired"
+
+
+def test_failure_retries_with_backoff(queue, clock):
+    job_id = queue.enqueue({"url": "a"}, max_attempts=3)
+    queue.lease("w1", lease_seconds=60)
+    assert queue.fail(job_id, "w1", "boom")
+
+    job = queue.get(job_id)
+    assert job["state"] == "queued"
+    assert job["error"] == "boom"
+    assert queue.depth() == 1
+
+    # First retry waits RETRY_BASE_SECONDS, the second twice that
+    clock.now += jobqueue.RETRY_BASE_SECONDS - 1
+    assert queue.lease("w1", lease_seconds=60) is None
+    clock.now += 1
+    assert queue.lease("w1", lease_seconds=60)["attempts"] == 2
+    queue.fail(job_id, "w1", "boom")
+
+    clock.now += 2 * jobqueue.RETRY_BASE_SECONDS - 1
+    assert queue.lease("w1", lease_seconds=60) is None
+    clock.now += 1
+    assert queue.lease("w1", lease_seconds=60)["attempts"] == 3
+
+    # Attempts used up: no further retry
+    queue.fail(job_id, "w1", "boom")
+    assert queue.get(job_id)["state"] == "failed"
+    assert queue.depth() == 0
+
+
+def test_failure_without_retry_is_final(queue):
+    job_id = queue.enqueue({"url": "a"}, dedupe_key="vid")
+    queue.lease("w1", lease_seconds=60)
+    assert not queue.fail(job_id, "w2", "not the owner")
+    assert queue.fail(job_id, "w1", "rejected", retry=False)
+
+    job = queue.get(job_id)
+    assert job["state"] == "failed"
+    assert job["error"] == "rejected"
+    assert queue.enqueue({"url": "a"}, dedupe_key="vid") != job_id
+
+
+def test_completed_result_is_claimed_once(queue):
+    job_id = queue.enqueue({"url": "a"})
+    queue.lease("w1", lease_seconds=60)
+    queue.set_stage(job_id, "w1", "transcribe")
+    assert queue.get(job_id)["stage"] == "transcribe"
+    assert queue.unclaimed() == []
+
+    assert queue.complete(job_id, "w1", {"result": {"video_id": "a"}})
+    job = queue.get(job_id)
+    assert job["state"] == "done"
+    assert job["result"] == {"result": {"video_id": "a"}}
+
+    assert queue.unclaimed() == [job_id]
+    assert queue.claim_result(job_id)
+    assert not queue.claim_result(job_id)
+    assert queue.unclaimed() == []
+
+
+def test_recorded_job_is_done_and_never_leased(queue):
+    job_id = queue.record({"url": "a"}, {"result": {"video_id": "a"}})
+    job = queue.get(job_id)
+    assert job["state"] == "done"
+    assert job["result"] == {"result": {"video_id": "a"}}
+    assert queue.lease("w1", lease_seconds=60) is None
+    assert queue.unclaimed() == []
+    assert queue.depth() == 0
+
+
+def test_wait_returns_when_the_job_finishes(queue, clock):
+    job_id = queue.enqueue({"url": "a"})
+    assert queue.wait(job_id, timeout=3)["state"] == "queued"
+    queue.lease("w1", lease_seconds=60)
+    queue.complete(job_id, "w1", {})
+    assert queue.wait(job_id, timeout=3)["state"] == "done"
+    assert queue.wait("missing", timeout=3) is None
+
+
+def test_backoff_is_capped_and_jittered():
+    assert backoff_seconds(1) == pytest.approx(jobqueue.RETRY_BASE_SECONDS, rel=0.25)
+    for attempts in range(1, 20):
+        assert 0.75 * jobqueue.RETRY_BASE_SECONDS <= backoff_seconds(attempts) <= 1.25 * jobqueue.RETRY_MAX_SECONDS
+
+
+def test_queue_interface_is_abstract():
+    with pytest.raises(TypeError):
+        jobqueue.JobQueue()
+
+
+def test_defer_requeues_without_using_an_attempt(queue, clock):
+    job_id = queue.enqueue({"url": "a"}, max_attempts=1)
+    queue.lease("w1", lease_seconds=60)
+    assert not queue.defer(job_id, "w2", 30, "spool full")
+    assert queue.defer(job_id, "w1", 30, "spool full")
+
+    job = queue.get(job_id)
+    assert job["state"] == "queued"
+    assert job["attempts"] == 0
+    assert job["error"] == "spool full"
+
+    clock.now += 29
+    assert queue.lease("w1", lease_seconds=60) is None
+    clock.now += 1
+    # Still has its single attempt after any number of deferrals
+    assert queue.lease("w1", lease_seconds=60)["attempts"] == 1
@@ -0,0 +1,7 @@
+from backend.pipeline import _preview_spans
+
+
+def test_highlights_are_clipped_to_the_preview():
+    spans = [[0, 5, "hype"], [290, 310, "disclaimer"], [300, 320, "hype"], [5000, 5010, "hype"]]
+    assert _preview_spans(spans, 300) == [[0, 5, "hype"], [290, 300, "disclaimer"]]
+    assert _preview_spans([], 300) == []
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from backend.profiling import ProfilerBusyError, exclusive_profile
+
+
+def test_only_one_profiled_run_at_a_time():
+    with exclusive_profile():
+        with pytest.raises(ProfilerBusyError):
+            with exclusive_profile():
+                pass
+    # Released on exit, including after an error
+    with pytest.raises(RuntimeError):
+        with exclusive_profile():
+            raise RuntimeError("run failed")
+    with exclusive_profile():
+        pass
+
+
+def test_second_profiled_request_gets_409(monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend import main
+
+    running, finish = threading.Event(), threading.Event()
+
+    def analyze_here(request, fields):
+        running.set()
+        finish.wait(5)
+        return {"video_id": "x"}
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(main, "_analyze_here", analyze_here)
+    client = TestClient(main.app)
+    body = {"url": "https://www.youtube.com/watch?v=aaaaaaaaaaa", "profile": True}
+    headers = {"X-Admin-Token": "secret"}
+
+    first = []
+    thread = threading.Thread(target=lambda: first.append(client.post("/analyze", json=body, headers=headers)))
+    thread.start()
+    assert running.wait(5)
+    second = client.post("/analyze", json=body, headers=headers)
+    finish.set()
+    thread.join(5)
+
+    assert second.status_code == 409
+    assert first[0].status_code == 200
+    assert client.post("/analyze", json=body, headers=headers).status_code == 200
@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.jobqueue import SQLiteQueue
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def test_expired_queue_record_is_a_504(tmp_path, monkeypatch):
+    queue = SQLiteQueue(str(tmp_path / "queue.db"))
+    monkeypatch.setattr(queue, "wait", lambda job_id, timeout: None)
+    monkeypatch.setattr(main, "job_queue", queue)
+    monkeypatch.setattr(
+        main, "_preflight_or_raise",
+        lambda url, check_spool=True: ({"id": "dQw4w9WgXcQ"}, {"estimated_seconds": 60}),
+    )
+
+    response = TestClient(main.app).post("/analyze", json={"url": URL})
+    assert response.status_code == 504
+    assert "/results/dQw4w9WgXcQ" in response.json()["detail"]
+
+
+def test_api_hosts_spool_does_not_gate_queued_jobs(tmp_path, monkeypatch):
+    from backend import admission
+    from backend.spool import SpoolFullError
+
+    def full(nbytes):
+        raise SpoolFullError(nbytes, 0)
+
+    info = {"id": "dQw4w9WgXcQ", "duration": 600, "availability": "public", "live_status": "not_live"}
+    monkeypatch.setattr(main, "extract_metadata", lambda url: info)
+    monkeypatch.setattr(admission.spool, "check", full)
+    client = TestClient(main.app)
+
+    monkeypatch.setattr(main, "job_queue", None)
+    local = client.post("/preflight", json={"url": URL})
+    assert local.status_code == 507
+    assert local.headers["Retry-After"]
+
+    queue = SQLiteQueue(str(tmp_path / "queue.db"))
+    monkeypatch.setattr(main, "job_queue", queue)
+    assert client.post("/preflight", json={"url": URL}).status_code == 200
+    assert client.post("/jobs", json={"url": URL}).status_code == 202
+    assert queue.depth() == 1
@@ -0,0 +1,47 @@
+import pytest
+
+from backend.rescoring import (
+    FEATURE_DTYPE, VIDEO_ID_BYTES, append_feature_record, append_features, extract_features, load_features,
+)
+
+ANALYSIS = {
+    "hype_analysis": {"unique_matches": 3, "total_matches": 7},
+    "disclaimer_analysis": {"has_disclaimer": False},
+    "exaggeration_analysis": {"total_exaggerations": 2},
+    "finbert_analysis": {"positive_ratio": 0.5, "total_chunks": 4, "negative_chunks": 1, "neutral_chunks": 1},
+}
+# local_file_info() IDs: exactly the old 16-byte field width
+FILE_ID = "f-0123456789abcd"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "features.bin")
+
+
+def test_ids_are_kept_whole(path):
+    append_features(FILE_ID, ANALYSIS, path)
+    append_features(FILE_ID + "-and-more", ANALYSIS, path)
+    features = load_features(path)
+    assert sorted(features["video_id"].tolist()) == [FILE_ID.encode(), (FILE_ID + "-and-more").encode()]
+    assert features["unique_hype"].tolist() == [3, 3]
+    assert features["negative_ratio"].tolist() == [0.25, 0.25]
+
+
+def test_ids_too_long_for_the_field_are_rejected(path):
+    with pytest.raises(ValueError):
+        extract_features("x" * (VIDEO_ID_BYTES + 1), ANALYSIS)
+    assert extract_features("é" * (VIDEO_ID_BYTES // 2), ANALYSIS)["video_id"][0].decode() == "é" * (VIDEO_ID_BYTES // 2)
+
+
+def test_latest_record_per_video_wins(path):
+    for unique in (1, 2, 3):
+        record = extract_features("dQw4w9WgXcQ", ANALYSIS)
+        record["unique_hype"] = unique
+        append_feature_record(record, path)
+    append_features("other", ANALYSIS, path)
+    features = load_features(path)
+    assert dict(zip(features["video_id"].tolist(), features["unique_hype"].tolist())) == {
+        b"dQw4w9WgXcQ": 3, b"other": 3,
+    }
+    assert load_features(str(path) + ".missing")["video_id"].dtype == FEATURE_DTYPE["video_id"]
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from backend.segments import SCORE_FIELDS, SegmentTable, as_table
+
+SEGMENTS = [
+    {"start": 0.0, "end": 2.0, "text": " Buy Bitcoin now ", "tokens": [1, 2, 3], "avg_logprob": -0.2},
+    {"start": 1.5, "end": 6.0, "text": "Ça va monter 🚀🚀", "tokens": [4], "no_speech_prob": 0.1},
+    {"start": 3.0, "end": 4.0, "text": "株は上がる", "tokens": []},
+    {"start": 6.5, "end": 9.0, "text": "", "tokens": [5, 6]},
+    {"start": 9.0, "end": 12.0, "text": "Not financial advice — Ωmega", "tokens": [7, 8, 9, 10],
+     "compression_ratio": 1.5},
+]
+
+
+@pytest.fixture
+def table():
+    return SegmentTable.from_segments(SEGMENTS, keep_tokens=True)
+
+
+def assert_same(a: SegmentTable, b: SegmentTable):
+    assert len(a) == len(b)
+    assert a.to_dicts() == b.to_dicts()
+    for name in SCORE_FIELDS:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+    assert (a.tokens is None) == (b.tokens is None)
+    for i in range(len(a)):
+        np.testing.assert_array_equal(a.tokens_at(i), b.tokens_at(i))
+
+
+def test_from_segments(table):
+    assert table.texts() == ["Buy Bitcoin now", "Ça va monter 🚀🚀", "株は上がる", "", "Not financial advice — Ωmega"]
+    assert table[1] == {"id": 1, "start": 1.5, "end": 6.0, "text": "Ça va monter 🚀🚀"}
+    assert table[-1]["text"] == "Not financial advice — Ωmega"
+    assert table.tokens_at(0).tolist() == [1, 2, 3]
+    assert table.tokens_at(2).tolist() == []
+    assert table.avg_logprob[0] == np.float32(-0.2)
+    assert np.isnan(table.avg_logprob[1])
+    assert table.duration == 12.0
+    with pytest.raises(IndexError):
+        table[len(SEGMENTS)]
+    assert SegmentTable.from_segments(SEGMENTS).tokens is None
+
+
+def test_round_trip_with_non_ascii_text_and_tokens(table):
+    data = table.to_bytes()
+    loaded = SegmentTable.from_bytes(data)
+    assert_same(loaded, table)
+    # Arrays are read-only views over the buffer, not copies
+    assert not loaded.start.flags.writeable
+    assert SegmentTable.from_bytes(loaded.to_bytes()).to_dicts() == table.to_dicts()
+
+
+def test_round_trip_without_tokens_and_empty():
+    table = SegmentTable.from_segments(SEGMENTS)
+    assert_same(SegmentTable.from_bytes(table.to_bytes()), table)
+    empty = SegmentTable.from_bytes(SegmentTable.empty().to_bytes())
+    assert len(empty) == 0
+    assert empty.to_dicts() == []
+    assert empty.duration == 0.0
+
+
+def test_views_share_buffers_and_serialize_compactly(table):
+    view = table[1:4]
+    assert view.text is table.text
+    assert view.tokens is table.tokens
+    assert view.texts() == table.texts()[1:4]
+    assert [view.tokens_at(i).tolist() for i in range(len(view))] == [[4], [], [5, 6]]
+
+    # A view writes only its own segments, and reloads as a compact table
+    data = view.to_bytes()
+    assert len(data) < len(table.to_bytes())
+    loaded = SegmentTable.from_bytes(data)
+    assert_same(loaded, view)
+    assert loaded.text == "Ça va monter 🚀🚀株は上がる"
+    assert loaded.text_offsets[0] == 0
+    assert loaded.tokens.tolist() == [4, 5, 6]
+
+    # Views of views keep absolute offsets
+    inner = view[1:]
+    assert inner.texts() == ["株は上がる", ""]
+    assert_same(SegmentTable.from_bytes(inner.to_bytes()), inner)
+    assert len(table[3:1]) == 0
+    with pytest.raises(ValueError):
+        table[::2]
+
+
+def test_span_handles_overlapping_cues(table):
+    # The second cue runs to 6.0, so it overlaps [4.5, 5) even though the third ended at 4.0
+    assert table.span(4.5, 5.0) == (1, 3)
+    assert table.between(4.5, 5.0).texts() == ["Ça va monter 🚀🚀", "株は上がる"]
+    assert table.span() == (0, 5)
+    assert table.span(start=9.0) == (4, 5)
+    assert table.span(end=0.0) == (0, 0)
+    assert table.span(6.1, 6.4) == (3, 3)
+    assert table.span(12.0) == (5, 5)
+    assert len(table.between(13.0, 20.0)) == 0
+
+
+def test_concat_rebuilds_one_compact_table(table):
+    joined = SegmentTable.concat([table[:2], SegmentTable.empty(), table[2:]])
+    assert_same(joined, table)
+    assert joined.text == table.text
+    assert SegmentTable.concat([table[:2], SegmentTable.from_segments(SEGMENTS[2:])]).tokens is None
+    assert len(SegmentTable.concat([])) == 0
+
+
+def test_bad_bytes_are_rejected(table):
+    data = bytearray(table.to_bytes())
+    data[:4] = b"NOPE"
+    with pytest.raises(ValueError):
+        SegmentTable.from_bytes(bytes(data))
+
+
+def test_as_table(table):
+    assert as_table(table) is table
+    assert as_table(None).to_dicts() == []
+    assert as_table(SEGMENTS[:1]).texts() == ["Buy Bitcoin now"]
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from backend import spool as spool_module
+from backend.spool import NODE_ID, SpoolFullError, SpoolManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return SpoolManager(root=str(tmp_path / "spool"), quota_bytes=1000, min_free_bytes=0)
+
+
+def test_reservations_keep_a_running_total(manager):
+    first = manager.create("upload", 600)
+    assert manager.usage() == 600
+    with pytest.raises(SpoolFullError) as e:
+        manager.create("upload", 600)
+    assert e.value.retry_after == spool_module.SPOOL_RETRY_AFTER_SECONDS
+    assert manager.usage() == 600
+
+    manager.release(first)
+    assert not os.path.exists(first)
+    assert manager.usage() == 0
+    with manager.job("download", 1000) as path:
+        assert os.path.isdir(path)
+        assert manager.usage() == 1000
+    assert manager.usage() == 0
+
+
+def test_free_space_is_checked(manager):
+    manager.min_free_bytes = 1 << 62
+    with pytest.raises(SpoolFullError):
+        manager.create("upload", 1)
+
+
+def test_gc_only_reaps_dead_pids_on_this_node(manager, monkeypatch):
+    monkeypatch.setattr(spool_module, "_pid_alive", lambda pid: pid == 42)
+    os.makedirs(manager.root)
+
+    def job_dir(name):
+        path = os.path.join(manager.root, name)
+        os.makedirs(path)
+        return path
+
+    dead = job_dir(f"download-{NODE_ID}-99999-abc")
+    alive = job_dir(f"download-{NODE_ID}-42-abc")
+    mine = manager.create("upload")
+    other_node = job_dir("download-0123456789ab-99999-abc")
+    unknown = job_dir("something-else")
+
+    assert manager.collect_garbage() == 1
+    assert not os.path.exists(dead)
+    for path in (alive, mine, other_node, unknown):
+        assert os.path.exists(path)
+
+    # Past the age limit, anything goes
+    for path in (alive, other_node, unknown):
+        os.utime(path, (0, 0))
+    assert manager.collect_garbage() == 3
+    assert os.path.exists(mine)
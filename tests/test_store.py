@@ -0,0 +1,29 @@
+from backend.segments import SegmentTable
+from backend.store import get_segments, get_transcript_page, get_transcript_table, save_transcript
+
+SEGMENTS = [
+    {"start": 0.0, "end": 2.0, "text": "Buy now"},
+    {"start": 1.5, "end": 6.0, "text": "Ça va monter 🚀"},
+    {"start": 6.0, "end": 8.0, "text": "Not financial advice"},
+]
+
+
+def test_transcript_is_stored_as_one_table(tmp_path):
+    path = str(tmp_path / "results.db")
+    assert get_transcript_table("vid", path) is None
+    assert get_transcript_page("vid", path=path) is None
+
+    save_transcript("vid", {"language": "en", "source": "captions", "segments": SEGMENTS}, path)
+    assert get_transcript_table("vid", path).texts() == [s["text"] for s in SEGMENTS]
+
+    page = get_transcript_page("vid", limit=2, path=path)
+    assert page["total_segments"] == 3
+    assert [s["idx"] for s in page["segments"]] == [0, 1]
+    assert page["next_offset"] == 2
+    assert [s["idx"] for s in get_transcript_page("vid", start=5.0, end=7.0, path=path)["segments"]] == [1, 2]
+    assert get_segments("vid", [2, 9], path) == {2: {"idx": 2, "start": 6.0, "end": 8.0, "text": "Not financial advice"}}
+
+    # Re-saving replaces the table; an empty transcript still exists
+    save_transcript("vid", {"language": "en", "source": "whisper", "segments": SegmentTable.empty()}, path)
+    assert len(get_transcript_table("vid", path)) == 0
+    assert get_transcript_page("vid", path=path)["segments"] == []
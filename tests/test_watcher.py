@@ -0,0 +1,177 @@
+import pytest
+
+from backend import watcher
+from backend.watcher import (
+    INITIAL_BACKFILL, JITTER, ChannelWatcher, add_channel, get_channel, list_channels, poll_channel,
+    remove_channel,
+)
+
+CHANNEL = "https://www.youtube.com/@SomeChannel"
+
+
+class Listing:
+    """Stands in for the flat yt-dlp listing: newest-first IDs, no network."""
+
+    def __init__(self, *video_ids):
+        self.video_ids = list(video_ids)
+        self.calls = 0
+
+    def __call__(self, channel_url, limit=watcher.LISTING_LIMIT):
+        self.calls += 1
+        if isinstance(self.video_ids, Exception):
+            raise self.video_ids
+        return self.video_ids[:limit]
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "watcher.db")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(watcher.time, "time", lambda: now[0])
+    return now
+
+
+def submitted_to(urls):
+    def submit(url):
+        urls.append(url)
+        return True
+    return submit
+
+
+def test_channel_urls_point_at_the_uploads_tab(db):
+    channel = add_channel(CHANNEL + "/", 7200, path=db)
+    assert channel["channel_url"] == CHANNEL + "/videos"
+    assert channel["interval_seconds"] == 7200
+    assert get_channel(CHANNEL, path=db)["channel_url"] == CHANNEL + "/videos"
+    assert watcher.normalize_channel_url("https://www.youtube.com/playlist?list=PL1") == \
+        "https://www.youtube.com/playlist?list=PL1"
+
+    # Intervals below the floor are raised to it
+    assert add_channel(CHANNEL, 60, min_interval_seconds=600, path=db)["interval_seconds"] == 600
+    assert len(list_channels(db)) == 1
+    assert remove_channel(CHANNEL, path=db)
+    assert not remove_channel(CHANNEL, path=db)
+    assert get_channel(CHANNEL, path=db) is None
+
+
+def test_first_poll_backfills_only_the_newest_uploads(db, clock):
+    channel_url = add_channel(CHANNEL, path=db)["channel_url"]
+    urls = []
+    listing = Listing("v6", "v5", "v4", "v3", "v2", "v1")
+
+    handled = poll_channel(channel_url, submitted_to(urls), listing, db)
+    assert handled == ["v4", "v5", "v6"][-INITIAL_BACKFILL:]
+    assert urls == [watcher.video_url(v) for v in handled]
+    assert get_channel(channel_url, db)["seen_videos"] == 6
+
+    # Only the upload the channel has not produced before is submitted next time
+    listing.video_ids.insert(0, "v7")
+    clock[0] += 3600
+    assert poll_channel(channel_url, submitted_to(urls), listing, db) == ["v7"]
+    assert poll_channel(channel_url, submitted_to(urls), listing, db, force=True) == []
+
+
+def test_min_interval_skips_the_listing_unless_forced(db, clock):
+    channel_url = add_channel(CHANNEL, 3600, min_interval_seconds=600, path=db)["channel_url"]
+    listing = Listing("v1")
+    poll_channel(channel_url, submitted_to([]), listing, db)
+
+    clock[0] += 599
+    assert poll_channel(channel_url, submitted_to([]), listing, db) == []
+    assert listing.calls == 1
+    poll_channel(channel_url, submitted_to([]), listing, db, force=True)
+    assert listing.calls == 2
+
+
+def test_refused_submission_is_retried_next_poll(db, clock):
+    channel_url = add_channel(CHANNEL, path=db)["channel_url"]
+    listing = Listing("v2", "v1")
+    offered = []
+
+    def refuse_v2(url):
+        offered.append(url)
+        return not url.endswith("v2")
+
+    # Oldest first, and a refusal stops the poll so order is kept
+    assert poll_channel(channel_url, refuse_v2, listing, db) == ["v1"]
+    clock[0] += 3600
+    assert poll_channel(channel_url, submitted_to([]), listing, db) == ["v2"]
+    assert offered == [watcher.video_url("v1"), watcher.video_url("v2")]
+
+
+def test_listing_error_is_recorded_and_rescheduled(db, clock):
+    channel_url = add_channel(CHANNEL, path=db)["channel_url"]
+    listing = Listing()
+    listing.video_ids = RuntimeError("HTTP Error 429")
+
+    assert poll_channel(channel_url, submitted_to([]), listing, db) == []
+    channel = get_channel(channel_url, db)
+    assert channel["last_error"] == "HTTP Error 429"
+    assert channel["last_poll"] == clock[0]
+    assert channel["next_poll"] > clock[0]
+
+
+@pytest.mark.parametrize("draw", [1 - JITTER, 1.0, 1 + JITTER])
+def test_next_poll_is_jittered_around_the_interval(db, clock, monkeypatch, draw):
+    calls = []
+
+    def uniform(a, b):
+        calls.append((a, b))
+        return draw
+
+    monkeypatch.setattr(watcher.random, "uniform", uniform)
+    channel_url = add_channel(CHANNEL, 3600, path=db)["channel_url"]
+    poll_channel(channel_url, submitted_to([]), Listing(), db)
+
+    assert calls == [(1 - JITTER, 1 + JITTER)]
+    assert get_channel(channel_url, db)["next_poll"] == pytest.approx(clock[0] + 3600 * draw)
+
+
+def test_jitter_spreads_channels_added_together(db, clock, monkeypatch):
+    monkeypatch.setattr(watcher, "POLL_SPACING_SECONDS", 0)
+    for n in range(20):
+        add_channel(f"{CHANNEL}{n}", 3600, path=db)
+    channel_watcher = ChannelWatcher(submitted_to([]), Listing(), db)
+    assert channel_watcher.run_due() == 20
+
+    next_polls = [c["next_poll"] - clock[0] for c in list_channels(db)]
+    assert all(3600 * (1 - JITTER) <= t <= 3600 * (1 + JITTER) for t in next_polls)
+    assert len(set(next_polls)) == len(next_polls)
+    # Nothing is due again until the earliest of them
+    assert channel_watcher.run_due() == 0
+
+
+def test_readding_a_channel_keeps_its_schedule(db, clock):
+    channel_url = add_channel(CHANNEL, 3600, path=db)["channel_url"]
+    poll_channel(channel_url, submitted_to([]), Listing("v1"), db)
+    before = get_channel(channel_url, db)
+
+    after = add_channel(CHANNEL, 7200, path=db)
+    assert after["interval_seconds"] == 7200
+    assert after["last_poll"] == before["last_poll"]
+    assert after["next_poll"] == before["next_poll"]
+    assert after["seen_videos"] == 1
+
+
+def test_poll_endpoint_keeps_a_watched_channels_intervals(db, clock, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend import main
+
+    monkeypatch.setattr(watcher, "WATCHER_DB", db)
+    monkeypatch.setattr(main, "poll_channel", lambda url, submit: poll_channel(url, submit, Listing(), db))
+    add_channel(CHANNEL, 7200, min_interval_seconds=1800, path=db)
+
+    client = TestClient(main.app)
+    response = client.post("/watch/channels/poll", json={"channel_url": CHANNEL})
+    assert response.status_code == 200
+    channel = get_channel(CHANNEL, db)
+    assert channel["interval_seconds"] == 7200
+    assert channel["min_interval_seconds"] == 1800
+
+    # An unknown channel is added with the request's intervals
+    client.post("/watch/channels/poll", json={"channel_url": CHANNEL + "2", "interval_seconds": 5400})
+    assert get_channel(CHANNEL + "2", db)["interval_seconds"] == 5400